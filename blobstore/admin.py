@@ -0,0 +1,17 @@
+from django.contrib import admin
+from .models import Blob, BlobReference
+
+
+@admin.register(Blob)
+class BlobAdmin(admin.ModelAdmin):
+    list_display = ['digest', 'size', 'ref_count', 'created_at']
+    search_fields = ['digest']
+    ordering = ['-created_at']
+
+
+@admin.register(BlobReference)
+class BlobReferenceAdmin(admin.ModelAdmin):
+    list_display = ['name', 'blob', 'created_at']
+    search_fields = ['name', 'blob__digest']
+    ordering = ['-created_at']
+    raw_id_fields = ['blob']
@@ -0,0 +1,26 @@
+import os
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from blobstore.storage import BLOB_DIR, DeduplicatingFileSystemStorage
+
+
+class Command(BaseCommand):
+    help = 'Chuyển các file media có sẵn sang lưu theo nội dung (khử trùng lặp)'
+
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, DeduplicatingFileSystemStorage):
+            raise CommandError('Storage mặc định không phải DeduplicatingFileSystemStorage')
+
+        root = default_storage.location
+        files = saved = 0
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d != BLOB_DIR]
+            for filename in filenames:
+                name = os.path.relpath(os.path.join(dirpath, filename), root).replace(os.sep, '/')
+                saved += default_storage.adopt(name)
+                files += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Đã xử lý {files} file, tiết kiệm {saved / 1024 / 1024:.1f} MB'
+        ))
@@ -0,0 +1,22 @@
+from django.db import models
+
+
+class Blob(models.Model):
+    """Nội dung file, lưu một lần theo SHA-256"""
+    digest = models.CharField(max_length=64, unique=True)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.digest[:12]} ({self.ref_count})"
+
+
+class BlobReference(models.Model):
+    """Tên file (giá trị của FileField) trỏ tới một Blob"""
+    name = models.CharField(max_length=255, unique=True)
+    blob = models.ForeignKey(Blob, on_delete=models.PROTECT, related_name='references')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,133 @@
+"""
+Storage lưu file theo nội dung (content-addressed) và khử trùng lặp.
+
+Khi lưu, nội dung được băm SHA-256 trong lúc ghi ra file tạm. Mỗi nội dung chỉ
+được giữ một bản trong MEDIA_ROOT/.blobs/ab/cd/<digest>; đường dẫn mà FileField
+lưu (ví dụ submissions/bai.pdf) là hard link tới bản đó. Vì vậy url(), open(),
+exists() và cách nginx phục vụ /media/ không đổi, nhưng 300 bài nộp cùng một
+file chỉ chiếm dung lượng một lần.
+
+Số tham chiếu của mỗi blob được lưu trong bảng Blob; blob chỉ bị xóa khi
+tham chiếu cuối cùng bị xóa.
+"""
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+
+from .models import Blob, BlobReference
+
+BLOB_DIR = '.blobs'
+READ_SIZE = 64 * 1024
+
+
+class DeduplicatingFileSystemStorage(FileSystemStorage):
+
+    def blob_path(self, digest):
+        return os.path.join(self.location, BLOB_DIR, digest[:2], digest[2:4], digest)
+
+    def _save(self, name, content):
+        tmp_dir = os.path.join(self.location, BLOB_DIR, 'tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    tmp.write(chunk)
+                    size += len(chunk)
+            digest = digest.hexdigest()
+
+            with transaction.atomic():
+                blob, _ = Blob.objects.select_for_update().get_or_create(
+                    digest=digest, defaults={'size': size},
+                )
+                path = self.blob_path(digest)
+                if not os.path.exists(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    if self.file_permissions_mode is not None:
+                        os.chmod(tmp_path, self.file_permissions_mode)
+                    os.replace(tmp_path, path)
+
+                name = self._link(path, name)
+                BlobReference.objects.create(name=name, blob=blob)
+                Blob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return name
+
+    def _link(self, blob_path, name):
+        """Tạo hard link tại `name`, đổi tên nếu bị trùng, trả về tên cuối cùng"""
+        while True:
+            full_path = self.path(name)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            try:
+                os.link(blob_path, full_path)
+                return name
+            except FileExistsError:
+                name = self.get_available_name(name)
+
+    def delete(self, name):
+        if not name:
+            raise ValueError('The name must be given to delete().')
+        with transaction.atomic():
+            reference = BlobReference.objects.select_related('blob').filter(name=name).first()
+            if reference is None:
+                # File lưu trước khi dùng storage này
+                return super().delete(name)
+            blob = Blob.objects.select_for_update().get(pk=reference.blob_id)
+            reference.delete()
+            super().delete(name)
+            if blob.ref_count <= 1:
+                blob.delete()
+                transaction.on_commit(lambda: self._remove_blob_file(blob.digest))
+            else:
+                Blob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') - 1)
+
+    def _remove_blob_file(self, digest):
+        try:
+            os.remove(self.blob_path(digest))
+        except FileNotFoundError:
+            pass
+
+    def adopt(self, name):
+        """
+        Chuyển một file đã có trong MEDIA_ROOT (lưu trước khi bật storage này)
+        thành hard link tới blob. Trả về số byte tiết kiệm được.
+        """
+        if BlobReference.objects.filter(name=name).exists():
+            return 0
+        full_path = self.path(name)
+        digest = hashlib.sha256()
+        with open(full_path, 'rb') as source:
+            for chunk in iter(lambda: source.read(READ_SIZE), b''):
+                digest.update(chunk)
+        digest = digest.hexdigest()
+        size = os.path.getsize(full_path)
+
+        with transaction.atomic():
+            blob, _ = Blob.objects.select_for_update().get_or_create(
+                digest=digest, defaults={'size': size},
+            )
+            path = self.blob_path(digest)
+            saved = 0
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.link(full_path, path)
+            elif not os.path.samefile(path, full_path):
+                tmp_path = f'{full_path}.dedupe'
+                os.link(path, tmp_path)
+                os.replace(tmp_path, full_path)
+                saved = size
+            BlobReference.objects.create(name=name, blob=blob)
+            Blob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+        return saved
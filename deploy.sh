@@ -19,6 +19,7 @@ DOMAIN="lms-vn.com"
 NGINX_SITES="/etc/nginx/sites-available"
 NGINX_ENABLED="/etc/nginx/sites-enabled"
 SERVICE_FILE="/etc/systemd/system/lms-gunicorn.service"
+WORKER_SERVICE_FILE="/etc/systemd/system/lms-worker.service"
 
 # Function to print colored output
 print_status() {
@@ -142,6 +143,12 @@ sudo cp lms-gunicorn.service $SERVICE_FILE
 sudo systemctl daemon-reload
 sudo systemctl enable lms-gunicorn
 
+# Configure background job worker
+print_status "Configuring job worker service..."
+sudo cp lms-worker.service $WORKER_SERVICE_FILE
+sudo systemctl daemon-reload
+sudo systemctl enable lms-worker
+
 # Set proper permissions
 print_status "Setting permissions..."
 sudo chown -R www-data:www-data $PROJECT_DIR
@@ -158,6 +165,7 @@ sudo nginx -t
 # Start services
 print_status "Starting services..."
 sudo systemctl start lms-gunicorn
+sudo systemctl start lms-worker
 sudo systemctl restart nginx
 
 # Setup SSL with Let's Encrypt
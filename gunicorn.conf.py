@@ -42,6 +42,7 @@ preload_app = True
 # Environment variables
 raw_env = [
     'DJANGO_SETTINGS_MODULE=lms_project.settings',
+    'PROMETHEUS_MULTIPROC_DIR=/dev/shm/lms_metrics',
 ]
 
 # Security
@@ -51,3 +52,20 @@ limit_request_field_size = 8190
 
 # Performance tuning
 worker_tmp_dir = "/dev/shm"
+
+# Metrics Prometheus (monitoring.metrics): mỗi worker ghi file riêng trong
+# PROMETHEUS_MULTIPROC_DIR, xóa khi khởi động để không cộng dồn số liệu của
+# lần chạy trước
+METRICS_DIR = '/dev/shm/lms_metrics'
+
+
+def on_starting(server):
+    import os
+    import shutil
+    shutil.rmtree(METRICS_DIR, ignore_errors=True)
+    os.makedirs(METRICS_DIR, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid, METRICS_DIR)
@@ -0,0 +1,71 @@
+# Gunicorn configuration file for LMS, ASGI mode (uvicorn workers)
+# Run with: gunicorn -c gunicorn_asgi.conf.py lms_project.asgi:application
+#
+# Khác với gunicorn.conf.py (worker sync): mỗi worker là một event loop,
+# home/course_list/course_detail/lesson_detail chạy bản async
+# (lms_courses.async_views) nên một truy vấn chậm không chặn cả worker.
+
+# Server socket
+bind = "127.0.0.1:8001"
+backlog = 2048
+
+# Worker processes
+workers = 4
+worker_class = "lms_project.workers.LMSUvicornWorker"
+# Số request đồng thời tối đa mỗi worker, mỗi request giữ một kết nối MySQL:
+# workers * worker_connections phải nhỏ hơn max_connections (mặc định 151)
+worker_connections = 35
+timeout = 30
+keepalive = 2
+
+# Restart workers after this many requests, to prevent memory leaks
+max_requests = 1000
+max_requests_jitter = 50
+
+# Logging
+accesslog = "/var/log/gunicorn/lms-access.log"
+errorlog = "/var/log/gunicorn/lms-error.log"
+loglevel = "info"
+
+# Process naming
+proc_name = "lms_gunicorn"
+
+# Server mechanics
+daemon = False
+pidfile = "/var/run/gunicorn/lms.pid"
+user = "www-data"
+group = "www-data"
+tmp_upload_dir = None
+
+# Preload app for better performance
+preload_app = True
+
+# Environment variables
+raw_env = [
+    'DJANGO_SETTINGS_MODULE=lms_project.settings',
+    'LMS_ASYNC_VIEWS=1',
+    'PROMETHEUS_MULTIPROC_DIR=/dev/shm/lms_metrics',
+]
+
+# Security
+limit_request_line = 4094
+limit_request_fields = 100
+limit_request_field_size = 8190
+
+# Performance tuning
+worker_tmp_dir = "/dev/shm"
+
+# Metrics Prometheus (monitoring.metrics), giống gunicorn.conf.py
+METRICS_DIR = '/dev/shm/lms_metrics'
+
+
+def on_starting(server):
+    import os
+    import shutil
+    shutil.rmtree(METRICS_DIR, ignore_errors=True)
+    os.makedirs(METRICS_DIR, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid, METRICS_DIR)
@@ -0,0 +1,19 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'attempts', 'run_at', 'finished_at', 'created_at']
+    list_filter = ['status', 'name']
+    search_fields = ['name', 'last_error']
+    ordering = ['-created_at']
+    actions = ['retry_selected']
+
+    @admin.action(description='Chạy lại các việc đã chọn')
+    def retry_selected(self, request, queryset):
+        count = queryset.exclude(status='running').update(
+            status='queued', attempts=0, run_at=timezone.now(), last_error='', finished_at=None,
+        )
+        self.message_user(request, f'Đã đưa {count} việc vào hàng đợi')
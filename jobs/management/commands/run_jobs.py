@@ -0,0 +1,86 @@
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jobs.queue import HEARTBEAT_INTERVAL, REQUEUE_INTERVAL, claim_jobs, heartbeat, requeue_stale_jobs, run_job
+from jobs.signals import worker_started
+
+
+class Command(BaseCommand):
+    help = 'Chạy worker xử lý hàng đợi công việc nền'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument('--once', action='store_true', help='Xử lý hết việc đến hạn rồi thoát')
+
+    def handle(self, *args, **options):
+        concurrency = options['concurrency']
+        worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        stopping = threading.Event()
+        slots = threading.Semaphore(concurrency)
+
+        def stop(signum, frame):
+            stopping.set()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        running = set()
+        running_lock = threading.Lock()
+
+        def execute(job):
+            try:
+                close_old_connections()
+                run_job(job)
+            finally:
+                close_old_connections()
+                with running_lock:
+                    running.discard(job.pk)
+                slots.release()
+
+        def running_ids():
+            with running_lock:
+                return list(running)
+
+        worker_started.send(sender=worker_id)
+        self.stdout.write(f'Worker {worker_id} bắt đầu ({concurrency} luồng)')
+        next_heartbeat = next_requeue = time.monotonic()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            while not stopping.is_set():
+                now = time.monotonic()
+                if now >= next_heartbeat:
+                    heartbeat(worker_id, running_ids())
+                    next_heartbeat = now + HEARTBEAT_INTERVAL.total_seconds()
+                if now >= next_requeue:
+                    requeue_stale_jobs()
+                    next_requeue = now + REQUEUE_INTERVAL.total_seconds()
+
+                free = 0
+                while slots.acquire(blocking=False):
+                    free += 1
+                jobs = claim_jobs(worker_id, free) if free else []
+                for _ in range(free - len(jobs)):
+                    slots.release()
+                with running_lock:
+                    running.update(job.pk for job in jobs)
+                for job in jobs:
+                    pool.submit(execute, job)
+                if not jobs:
+                    if options['once'] and free == concurrency:
+                        break
+                    stopping.wait(options['poll_interval'])
+
+            # Chờ các việc đang chạy xong, vẫn gửi heartbeat để không bị worker khác nhận lại
+            while running_ids():
+                if time.monotonic() >= next_heartbeat:
+                    heartbeat(worker_id, running_ids())
+                    next_heartbeat = time.monotonic() + HEARTBEAT_INTERVAL.total_seconds()
+                time.sleep(0.5)
+        self.stdout.write('Worker đã dừng')
@@ -0,0 +1,31 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """Công việc chạy nền"""
+    STATUS_CHOICES = [
+        ('queued', 'Đang chờ'),
+        ('running', 'Đang chạy'),
+        ('done', 'Hoàn thành'),
+        ('failed', 'Thất bại'),
+    ]
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
@@ -0,0 +1,114 @@
+"""
+Hàng đợi công việc dùng chính database của ứng dụng.
+
+Worker nhận việc bằng SELECT ... FOR UPDATE SKIP LOCKED (MySQL 8+ /
+PostgreSQL) nên nhiều worker có thể chạy song song mà không nhận trùng.
+Việc lỗi được thử lại với thời gian chờ tăng dần cho đến max_attempts.
+
+Trong lúc chạy, worker cập nhật locked_at của các việc đang giữ mỗi
+HEARTBEAT_INTERVAL. Việc running không có heartbeat quá STALE_AFTER (worker
+bị kill hoặc mất kết nối) được worker bất kỳ trả về hàng đợi, tính là một
+lần thử.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+from .registry import get_job_function
+
+logger = logging.getLogger(__name__)
+
+RETRY_BASE_SECONDS = 30
+HEARTBEAT_INTERVAL = timedelta(seconds=30)
+# Phải lớn hơn nhiều lần HEARTBEAT_INTERVAL để việc đang chạy không bị nhận trùng
+STALE_AFTER = timedelta(minutes=5)
+REQUEUE_INTERVAL = timedelta(minutes=1)
+
+
+def enqueue(name, payload=None, run_at=None, max_attempts=3):
+    """Thêm việc vào hàng đợi (trong transaction hiện tại, worker chỉ thấy sau khi commit)"""
+    get_job_function(name)
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts,
+    )
+
+
+def claim_jobs(worker_id, limit):
+    """Nhận tối đa `limit` việc đến hạn, đánh dấu running và trả về danh sách"""
+    now = timezone.now()
+    with transaction.atomic():
+        queryset = Job.objects.filter(status='queued', run_at__lte=now).order_by('run_at', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        ids = list(queryset.values_list('id', flat=True)[:limit])
+        if not ids:
+            return []
+        Job.objects.filter(id__in=ids, status='queued').update(
+            status='running', locked_by=worker_id, locked_at=now,
+        )
+    return list(Job.objects.filter(id__in=ids, locked_by=worker_id, status='running'))
+
+
+def run_job(job):
+    """Chạy một việc đã nhận, ghi kết quả và lên lịch thử lại nếu lỗi"""
+    job.attempts += 1
+    try:
+        func = get_job_function(job.name)
+        func(**job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception('Job %s #%s lỗi (lần %s)', job.name, job.pk, job.attempts)
+        job.last_error = error
+        job.locked_by = ''
+        job.locked_at = None
+        if job.attempts >= job.max_attempts:
+            job.status = 'failed'
+            job.finished_at = timezone.now()
+        else:
+            job.status = 'queued'
+            job.run_at = timezone.now() + timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (job.attempts - 1))
+        job.save(update_fields=['attempts', 'status', 'run_at', 'last_error', 'locked_by', 'locked_at', 'finished_at'])
+        return False
+
+    job.status = 'done'
+    job.finished_at = timezone.now()
+    job.save(update_fields=['attempts', 'status', 'finished_at'])
+    return True
+
+
+def heartbeat(worker_id, job_ids):
+    """Báo các việc `job_ids` vẫn đang chạy trên worker này"""
+    if not job_ids:
+        return 0
+    return Job.objects.filter(id__in=job_ids, status='running', locked_by=worker_id).update(
+        locked_at=timezone.now(),
+    )
+
+
+def requeue_stale_jobs(stale_after=STALE_AFTER):
+    """
+    Trả về hàng đợi các việc running không còn heartbeat (worker bị dừng giữa
+    chừng). Mỗi lần như vậy tính là một lần thử, nên việc làm chết worker
+    dừng ở failed sau max_attempts thay vì lặp mãi.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(status='running', locked_at__lt=now - stale_after)
+    error = f'Worker dừng khi đang chạy (không có heartbeat trong {stale_after})'
+    failed = stale.filter(max_attempts__lte=F('attempts') + 1).update(
+        status='failed', attempts=F('attempts') + 1, last_error=error,
+        locked_by='', locked_at=None, finished_at=now,
+    )
+    requeued = stale.update(
+        status='queued', attempts=F('attempts') + 1, last_error=error, locked_by='', locked_at=None,
+    )
+    if failed or requeued:
+        logger.warning('Trả về hàng đợi %s việc, đánh dấu failed %s việc của worker đã dừng', requeued, failed)
+    return requeued + failed
@@ -0,0 +1,40 @@
+"""
+Đăng ký các hàm có thể chạy nền.
+
+    from jobs.registry import job
+
+    @job('lms_courses.grade_quiz')
+    def grade_quiz(quiz_id):
+        ...
+
+    grade_quiz.delay(quiz_id=1)
+"""
+_registry = {}
+
+
+class UnknownJob(Exception):
+    pass
+
+
+def job(name, max_attempts=3):
+    def decorator(func):
+        def delay(run_at=None, **payload):
+            from .queue import enqueue
+            return enqueue(name, payload, run_at=run_at, max_attempts=max_attempts)
+
+        func.job_name = name
+        func.delay = delay
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def get_job_function(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise UnknownJob(name)
+
+
+def registered_jobs():
+    return sorted(_registry)
@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Gửi từ luồng chính của run_jobs trước khi nhận việc (sender là worker_id).
+# App cần tài nguyên dùng chung cho job (ví dụ process pool) khởi tạo ở đây,
+# không phải lười trong luồng chạy job.
+worker_started = Signal()
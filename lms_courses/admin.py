@@ -1,7 +1,16 @@
+import io
+
+from django import forms
 from django.contrib import admin
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from .importers import import_enrollments
+from .tasks import grade_attempts_job
 from .models import (
     Category, Course, Enrollment, Lesson, Assignment, 
-    Submission, Quiz, Question, Answer, QuizAttempt, QuizResponse
+    Submission, Quiz, Question, Answer, QuizAttempt, QuizResponse, CourseDailyStats,
+    ChunkedUpload,
 )
 
 
@@ -21,6 +30,11 @@ class CourseAdmin(admin.ModelAdmin):
     raw_id_fields = ['instructor']
 
 
+class EnrollmentImportForm(forms.Form):
+    csv_file = forms.FileField(label='File CSV (username,course_id)')
+    status = forms.ChoiceField(choices=Enrollment.STATUS_CHOICES, initial='active')
+
+
 @admin.register(Enrollment)
 class EnrollmentAdmin(admin.ModelAdmin):
     list_display = ['student', 'course', 'status', 'enrolled_at']
@@ -28,6 +42,43 @@ class EnrollmentAdmin(admin.ModelAdmin):
     search_fields = ['student__username', 'course__title']
     ordering = ['-enrolled_at']
     raw_id_fields = ['student', 'course']
+    change_list_template = 'admin/lms_courses/enrollment/change_list.html'
+
+    def get_urls(self):
+        urls = [
+            path(
+                'import-csv/',
+                self.admin_site.admin_view(self.import_csv_view),
+                name='lms_courses_enrollment_import_csv',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def import_csv_view(self, request):
+        """Nhập đăng ký hàng loạt từ CSV"""
+        if not self.has_add_permission(request):
+            return redirect('admin:lms_courses_enrollment_changelist')
+
+        form = EnrollmentImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            upload = form.cleaned_data['csv_file']
+            lines = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+            result = import_enrollments(lines, status=form.cleaned_data['status'])
+            self.message_user(
+                request,
+                f'Thêm {result.attempted} đăng ký mới, bỏ qua {result.skipped} (đã có), lỗi {result.invalid}',
+            )
+            for error in result.errors:
+                self.message_user(request, error, level='warning')
+            return redirect('admin:lms_courses_enrollment_changelist')
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'form': form,
+            'title': 'Nhập đăng ký từ CSV',
+        }
+        return TemplateResponse(request, 'admin/lms_courses/enrollment/import_csv.html', context)
 
 
 @admin.register(Lesson)
@@ -91,6 +142,13 @@ class QuizAttemptAdmin(admin.ModelAdmin):
     search_fields = ['student__username', 'quiz__title']
     ordering = ['-started_at']
     raw_id_fields = ['student', 'quiz']
+    actions = ['grade_selected']
+
+    @admin.action(description='Chấm điểm các lần làm bài đã chọn')
+    def grade_selected(self, request, queryset):
+        attempt_ids = list(queryset.values_list('id', flat=True))
+        grade_attempts_job.delay(attempt_ids=attempt_ids)
+        self.message_user(request, f'Đã đưa {len(attempt_ids)} lần làm bài vào hàng đợi chấm điểm')
 
 
 @admin.register(QuizResponse)
@@ -98,4 +156,23 @@ class QuizResponseAdmin(admin.ModelAdmin):
     list_display = ['attempt', 'question', 'is_correct']
     list_filter = ['is_correct', 'question__quiz']
     search_fields = ['attempt__student__username', 'question__text']
-    raw_id_fields = ['attempt', 'question', 'answer']
\ No newline at end of file
+    raw_id_fields = ['attempt', 'question', 'answer']
+
+
+@admin.register(CourseDailyStats)
+class CourseDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ['course', 'date', 'new_enrollments', 'completions', 'drops', 'submissions', 'graded_attempts']
+    list_filter = ['date']
+    search_fields = ['course__title', 'instructor__username']
+    ordering = ['-date']
+    raw_id_fields = ['course', 'instructor']
+
+
+
+@admin.register(ChunkedUpload)
+class ChunkedUploadAdmin(admin.ModelAdmin):
+    list_display = ['user', 'assignment', 'filename', 'offset', 'total_size', 'status', 'updated_at']
+    list_filter = ['status', 'updated_at']
+    search_fields = ['user__username', 'filename']
+    ordering = ['-updated_at']
+    raw_id_fields = ['user', 'assignment']
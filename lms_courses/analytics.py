@@ -0,0 +1,168 @@
+"""
+Thống kê theo ngày cho dashboard giảng viên (bảng CourseDailyStats).
+
+Đăng ký mới, hoàn thành, bỏ học và bài nộp được cộng dồn theo sự kiện
+(signals, import hàng loạt). Điểm quiz được cộng phần chênh lệch giữa điểm cũ
+và điểm mới sau mỗi lần chấm (kể cả chấm lại), với số truy vấn cố định cho cả
+lô. Dashboard chỉ cần đọc bảng này bằng một truy vấn.
+
+Ngày là ngày theo TIME_ZONE, luôn tính bằng Python (timezone.localdate):
+không dùng TruncDate/__date vì trên MySQL chúng cần CONVERT_TZ, trả về NULL
+nếu server chưa nạp bảng múi giờ.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Q, Sum, Value, When
+from django.utils import timezone
+
+from .models import Course, CourseDailyStats, Enrollment, QuizAttempt, Submission
+
+EVENT_FIELDS = ('new_enrollments', 'completions', 'drops', 'submissions')
+
+
+def _stats_row(course_id, day):
+    """Lấy (hoặc tạo) dòng thống kê của khóa học trong ngày"""
+    row = CourseDailyStats.objects.filter(course_id=course_id, date=day).first()
+    if row is not None:
+        return row
+    instructor_id = Course.objects.filter(pk=course_id).values_list('instructor_id', flat=True).first()
+    if instructor_id is None:
+        return None
+    try:
+        with transaction.atomic():
+            return CourseDailyStats.objects.create(course_id=course_id, instructor_id=instructor_id, date=day)
+    except IntegrityError:
+        return CourseDailyStats.objects.get(course_id=course_id, date=day)
+
+
+def record_event(course_id, when=None, **increments):
+    """Cộng dồn các bộ đếm sự kiện, ví dụ record_event(1, new_enrollments=1)"""
+    day = timezone.localdate(when) if when else timezone.localdate()
+    row = _stats_row(course_id, day)
+    if row is None:
+        return
+    CourseDailyStats.objects.filter(pk=row.pk).update(
+        **{name: F(name) + value for name, value in increments.items() if name in EVENT_FIELDS}
+    )
+
+
+def record_quiz_scores(changes):
+    """
+    Cộng điểm quiz theo các lần chấm. `changes` là iterable
+    (course_id, completed_at, điểm cũ hoặc None, điểm mới). Bốn truy vấn
+    bất kể số attempt.
+    """
+    deltas = defaultdict(Counter)
+    for course_id, completed_at, old_score, new_score in changes:
+        counts = deltas[course_id, timezone.localdate(completed_at)]
+        counts['graded_attempts'] += (new_score is not None) - (old_score is not None)
+        counts['quiz_score_total'] += (new_score or 0) - (old_score or 0)
+    _add_to_days(deltas)
+
+
+def _add_to_days(deltas):
+    """Cộng {(course_id, ngày): {trường: delta}} bằng một INSERT và một UPDATE"""
+    deltas = {key: counts for key, counts in deltas.items() if any(counts.values())}
+    if not deltas:
+        return
+    instructors = dict(
+        Course.objects.filter(pk__in={course_id for course_id, _ in deltas}).values_list('id', 'instructor_id')
+    )
+    # Dòng chưa có được tạo trước (dòng đã có bị bỏ qua), rồi mọi dòng cùng được cộng
+    CourseDailyStats.objects.bulk_create(
+        [
+            CourseDailyStats(course_id=course_id, instructor_id=instructors[course_id], date=day)
+            for course_id, day in deltas if course_id in instructors
+        ],
+        ignore_conflicts=True,
+    )
+
+    def match(key):
+        return Q(course_id=key[0], date=key[1])
+
+    changes = {}
+    for name in {name for counts in deltas.values() for name in counts}:
+        whens = []
+        for key, counts in deltas.items():
+            delta = counts[name]
+            if delta > 0:
+                whens.append(When(match(key), then=F(name) + delta))
+            elif delta < 0:
+                # Không xuống dưới 0 (cột unsigned trên MySQL)
+                whens.append(When(match(key) & Q(**{f'{name}__gte': -delta}), then=F(name) - (-delta)))
+                whens.append(When(match(key), then=Value(0)))
+        if whens:
+            changes[name] = Case(*whens, default=F(name), output_field=CourseDailyStats._meta.get_field(name))
+    CourseDailyStats.objects.filter(reduce(or_, map(match, deltas))).update(**changes)
+
+
+def rebuild(course_ids=None):
+    """
+    Dựng lại thống kê từ dữ liệu gốc. Số lượt bỏ học không có mốc thời gian
+    trong dữ liệu gốc nên được giữ nguyên giá trị đã ghi nhận.
+    """
+    courses = Course.objects.all()
+    if course_ids:
+        courses = courses.filter(pk__in=course_ids)
+    for course_id, instructor_id in courses.values_list('id', 'instructor_id').iterator():
+        days = defaultdict(Counter)
+
+        def add(queryset, date_field, name, value_field=None):
+            # Gom theo ngày địa phương trong Python, chỉ đọc hai cột
+            for when, value in queryset.values_list(date_field, value_field or 'id').iterator():
+                days[timezone.localdate(when)][name] += value if value_field else 1
+
+        add(Enrollment.objects.filter(course_id=course_id), 'enrolled_at', 'new_enrollments')
+        add(Enrollment.objects.filter(course_id=course_id, completed_at__isnull=False),
+            'completed_at', 'completions')
+        add(Submission.objects.filter(assignment__course_id=course_id), 'submitted_at', 'submissions')
+        graded = QuizAttempt.objects.filter(
+            quiz__course_id=course_id, completed_at__isnull=False, score__isnull=False,
+        )
+        add(graded, 'completed_at', 'graded_attempts')
+        add(graded, 'completed_at', 'quiz_score_total', 'score')
+
+        drops = dict(
+            CourseDailyStats.objects.filter(course_id=course_id).values_list('date', 'drops')
+        )
+        with transaction.atomic():
+            CourseDailyStats.objects.filter(course_id=course_id).delete()
+            CourseDailyStats.objects.bulk_create([
+                CourseDailyStats(
+                    course_id=course_id, instructor_id=instructor_id, date=day,
+                    drops=drops.get(day, 0), **values,
+                )
+                for day, values in days.items()
+            ] + [
+                CourseDailyStats(course_id=course_id, instructor_id=instructor_id, date=day, drops=count)
+                for day, count in drops.items() if day not in days and count
+            ])
+
+
+def instructor_course_summary(instructor, days=30):
+    """
+    Tổng hợp N ngày gần nhất theo từng khóa học của giảng viên (một truy vấn).
+    Trả về dict {course_id: {...}}.
+    """
+    since = timezone.localdate() - timedelta(days=days - 1)
+    rows = CourseDailyStats.objects.filter(
+        instructor=instructor, date__gte=since,
+    ).values('course_id').annotate(
+        new_enrollments=Sum('new_enrollments'),
+        completions=Sum('completions'),
+        drops=Sum('drops'),
+        submissions=Sum('submissions'),
+        graded_attempts=Sum('graded_attempts'),
+        quiz_score_total=Sum('quiz_score_total'),
+    )
+    summary = {}
+    for row in rows:
+        row['average_quiz_score'] = (
+            row['quiz_score_total'] / row['graded_attempts'] if row['graded_attempts'] else None
+        )
+        summary[row.pop('course_id')] = row
+    return summary
@@ -0,0 +1,201 @@
+"""
+Đáp án đã biên dịch của quiz.
+
+CompiledAnswerKey lưu đáp án dưới dạng mảng gọn (array) thay vì đồ thị model
+Question/Answer: question_ids đã sắp xếp để tra bằng bisect, điểm và loại câu
+hỏi theo cùng chỉ số, đáp án đúng theo kiểu CSR (offsets + answer_ids).
+
+Mỗi bản biên dịch gắn với version = Quiz.updated_at; signals của Question và
+Answer cập nhật Quiz.updated_at nên bản cũ tự hết hiệu lực. Bản biên dịch
+được giữ trong LRU của process và trong cache dùng chung.
+"""
+import re
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Answer, Question, Quiz
+
+CACHE_TIMEOUT = 24 * 60 * 60
+LOCAL_CACHE_SIZE = 256
+
+TYPE_CODES = {
+    'multiple_choice': 'm',
+    'true_false': 't',
+    'short_answer': 's',
+}
+TEXT_MATCH_TYPES = ('t', 's')
+
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_answer(text):
+    """Chuẩn hóa câu trả lời ngắn: NFC, chữ thường, bỏ dấu câu và khoảng trắng thừa"""
+    text = unicodedata.normalize('NFC', text or '').casefold()
+    text = _PUNCTUATION_RE.sub(' ', text)
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
+def quiz_version(updated_at):
+    return int(updated_at.timestamp() * 1000000)
+
+
+class CompiledAnswerKey:
+    __slots__ = (
+        'quiz_id', 'version', 'question_ids', 'points', 'question_types',
+        'answer_offsets', 'answer_ids', 'correct_texts',
+    )
+
+    def __init__(self, quiz_id, version, question_ids, points, question_types,
+                 answer_offsets, answer_ids, correct_texts):
+        self.quiz_id = quiz_id
+        self.version = version
+        self.question_ids = question_ids
+        self.points = points
+        self.question_types = question_types
+        self.answer_offsets = answer_offsets
+        self.answer_ids = answer_ids
+        self.correct_texts = correct_texts
+
+    @classmethod
+    def compile(cls, quiz_id, version):
+        """Biên dịch đáp án của quiz bằng hai truy vấn"""
+        questions = list(
+            Question.objects.filter(quiz_id=quiz_id).order_by('id').values_list('id', 'question_type', 'points')
+        )
+        correct = {}
+        texts = {}
+        answers = Answer.objects.filter(question__quiz_id=quiz_id, is_correct=True).order_by('question_id', 'id')
+        for answer_id, question_id, text in answers.values_list('id', 'question_id', 'text'):
+            correct.setdefault(question_id, []).append(answer_id)
+            texts.setdefault(question_id, set()).add(normalize_answer(text))
+
+        answer_offsets = array('I', [0])
+        answer_ids = array('q')
+        correct_texts = {}
+        for question_id, question_type, _ in questions:
+            answer_ids.extend(correct.get(question_id, ()))
+            answer_offsets.append(len(answer_ids))
+            if TYPE_CODES.get(question_type) in TEXT_MATCH_TYPES and question_id in texts:
+                correct_texts[question_id] = frozenset(texts[question_id])
+
+        return cls(
+            quiz_id=quiz_id,
+            version=version,
+            question_ids=array('q', [q[0] for q in questions]),
+            points=array('I', [q[2] for q in questions]),
+            question_types=''.join(TYPE_CODES.get(q[1], 'm') for q in questions),
+            answer_offsets=answer_offsets,
+            answer_ids=answer_ids,
+            correct_texts=correct_texts,
+        )
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    @property
+    def max_score(self):
+        return sum(self.points)
+
+    def index_of(self, question_id):
+        index = bisect_left(self.question_ids, question_id)
+        if index < len(self.question_ids) and self.question_ids[index] == question_id:
+            return index
+        return None
+
+    def points_for(self, question_id):
+        index = self.index_of(question_id)
+        return 0 if index is None else self.points[index]
+
+    def correct_answer_ids(self, question_id):
+        index = self.index_of(question_id)
+        if index is None:
+            return ()
+        return self.answer_ids[self.answer_offsets[index]:self.answer_offsets[index + 1]]
+
+    def is_correct(self, question_id, answer_id, text_response):
+        index = self.index_of(question_id)
+        if index is None:
+            return False
+        if answer_id is not None:
+            start, end = self.answer_offsets[index], self.answer_offsets[index + 1]
+            if answer_id in self.answer_ids[start:end]:
+                return True
+        if self.question_types[index] in TEXT_MATCH_TYPES and text_response:
+            return normalize_answer(text_response) in self.correct_texts.get(question_id, ())
+        return False
+
+
+class _LocalLRU:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_local_keys = _LocalLRU(LOCAL_CACHE_SIZE)
+
+
+def _cache_key(quiz_id, version):
+    return f'lms:answer_key:{quiz_id}:{version}'
+
+
+def get_answer_key(quiz_id, version=None):
+    """
+    Lấy đáp án đã biên dịch của quiz. Nếu không truyền `version`
+    (quiz_version(quiz.updated_at)) thì tốn thêm một truy vấn để đọc nó.
+    """
+    if version is None:
+        updated_at = Quiz.objects.filter(pk=quiz_id).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            raise Quiz.DoesNotExist(quiz_id)
+        version = quiz_version(updated_at)
+
+    key = _local_keys.get(quiz_id)
+    if key is not None and key.version == version:
+        return key
+
+    key = cache.get(_cache_key(quiz_id, version))
+    if key is None:
+        key = CompiledAnswerKey.compile(quiz_id, version)
+        cache.set(_cache_key(quiz_id, version), key, CACHE_TIMEOUT)
+    _local_keys.set(quiz_id, key)
+    return key
+
+
+def get_answer_keys(quiz_ids):
+    """Lấy đáp án cho nhiều quiz, đọc version của tất cả bằng một truy vấn"""
+    versions = Quiz.objects.filter(pk__in=quiz_ids).values_list('id', 'updated_at')
+    return {
+        quiz_id: get_answer_key(quiz_id, quiz_version(updated_at))
+        for quiz_id, updated_at in versions
+    }
+
+
+def touch_quiz(quiz_id):
+    """Đánh dấu đáp án của quiz đã thay đổi"""
+    Quiz.objects.filter(pk=quiz_id).update(updated_at=timezone.now())
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class LmsCoursesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'lms_courses'
+
+    def ready(self):
+        from thumbnails.pipeline import register
+        from . import signals  # noqa: F401
+        from .models import Course
+
+        register(Course, 'thumbnail', 'thumbnail_variants', widths=(320, 640, 960, 1280))
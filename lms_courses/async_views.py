@@ -0,0 +1,178 @@
+"""
+Bản async của các trang chỉ đọc (home, course_list, course_detail,
+lesson_detail), dùng khi chạy dưới ASGI (settings.ASYNC_VIEWS, xem
+lms_project/asgi.py và gunicorn_asgi.conf.py).
+
+Truy vấn dùng async ORM nên trong lúc chờ database worker vẫn nhận request
+khác. Hai việc vẫn phải chạy đồng bộ (trong thread qua sync_to_async):
+
+- tải request.user từ session (AuthenticationMiddleware của Django 4.2 chỉ
+  có bản đồng bộ),
+- render template: template engine của Django chỉ có bản đồng bộ (render
+  không truy vấn database: user.profile mà base.html đọc đã được tải cùng
+  request.user, xem users/user_cache.py).
+
+Ngữ nghĩa, template và ngân sách truy vấn giống hệt bản đồng bộ trong views.py.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.contrib.auth.views import redirect_to_login
+from django.http import Http404
+from django.shortcuts import redirect, render
+
+from monitoring.query_budget import query_budget
+from replicas.routing import replica_reads
+from .conditional import add_validators, course_detail_parts, not_modified, page_etag
+from .enrollments import aget_enrollment_status
+from .models import Category, Course, Lesson
+from .pagination import CursorPaginator
+from .rendering import highlight_css
+from .search import search_courses
+from .syllabus import aget_outline, lesson_navigation
+
+arender = sync_to_async(render)
+
+
+def _load_user(request):
+    # Buộc SimpleLazyObject tải user (và session) ngay, sau đó đọc
+    # request.user trong async không còn chạm database
+    request.user.is_authenticated
+    return request.user
+
+
+async def _auser(request):
+    return await sync_to_async(_load_user)(request)
+
+
+async def _aget_or_404(queryset, **kwargs):
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+
+
+@replica_reads
+@query_budget(5)
+async def home(request):
+    """Trang chủ"""
+    featured_courses = [c async for c in Course.objects.filter(status='published')[:6]]
+    categories = [c async for c in Category.objects.all()[:8]]
+
+    context = {
+        'featured_courses': featured_courses,
+        'categories': categories,
+    }
+    return await arender(request, 'lms_courses/home.html', context)
+
+
+@replica_reads
+@query_budget(5)
+async def course_list(request):
+    """Danh sách khóa học"""
+    courses = Course.objects.filter(status='published').select_related('category')
+    categories = [c async for c in Category.objects.all()]
+
+    # Lọc theo danh mục
+    category_id = request.GET.get('category')
+    if category_id:
+        courses = courses.filter(category_id=category_id)
+
+    # Tìm kiếm
+    search_query = request.GET.get('search')
+    ordering = ('created_at', 'id')
+    if search_query:
+        courses = search_courses(courses, search_query)
+        ordering = ('search_score', 'created_at', 'id')
+
+    # Phân trang theo con trỏ
+    paginator = CursorPaginator(courses, 12, ordering=ordering)
+    courses = await paginator.aget_page(request.GET.get('cursor'))
+
+    query_params = request.GET.copy()
+    query_params.pop('cursor', None)
+    query_params.pop('page', None)
+
+    context = {
+        'courses': courses,
+        'categories': categories,
+        'current_category': category_id,
+        'search_query': search_query,
+        'query_string': query_params.urlencode(),
+    }
+    return await arender(request, 'lms_courses/course_list.html', context)
+
+
+@replica_reads
+@query_budget(7)
+async def course_detail(request, course_id):
+    """Chi tiết khóa học"""
+    course = await _aget_or_404(
+        Course.objects.select_related('instructor', 'category'), id=course_id, status='published'
+    )
+    outline = await aget_outline(course.id)
+
+    # Kiểm tra xem user đã đăng ký chưa
+    user = await _auser(request)
+    enrollment_status = await aget_enrollment_status(user, course.id)
+
+    # Trình duyệt đã có đúng trang này thì trả 304, không render
+    etag = page_etag(request, course_detail_parts(course), outline['version'], enrollment_status)
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
+
+    context = {
+        'course': course,
+        'lessons': outline['lessons'],
+        'assignments': outline['assignments'],
+        'quizzes': outline['quizzes'],
+        'is_enrolled': enrollment_status is not None,
+        'enrollment_status': enrollment_status,
+    }
+    response = await arender(request, 'lms_courses/course_detail.html', context)
+    return add_validators(response, etag, course.updated_at)
+
+
+@replica_reads
+@query_budget(7)
+async def lesson_detail(request, course_id, lesson_id):
+    """Chi tiết bài học"""
+    # login_required của Django 4.2 chưa hỗ trợ view async
+    user = await _auser(request)
+    if not user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+
+    course = await _aget_or_404(Course.objects.all(), id=course_id)
+    lesson = await _aget_or_404(Lesson.objects.all(), id=lesson_id, course=course)
+
+    # Kiểm tra xem user có đăng ký khóa học này không
+    enrollment_status = await aget_enrollment_status(user, course.id)
+    if enrollment_status is None:
+        messages.error(request, 'Bạn chưa đăng ký khóa học này')
+        return redirect('course_detail', course_id=course_id)
+
+    # Lấy bài học trước và sau từ đề cương đã cache
+    outline = await aget_outline(course.id)
+
+    etag = page_etag(
+        request, course.pk, course.updated_at, lesson.pk, lesson.updated_at, lesson.content_hash,
+        outline['version'], enrollment_status,
+    )
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
+    previous_lesson, next_lesson, lesson_position, lesson_total = lesson_navigation(outline, lesson)
+
+    context = {
+        'course': course,
+        'lesson': lesson,
+        'lessons': outline['lessons'],
+        'enrollment_status': enrollment_status,
+        'previous_lesson': previous_lesson,
+        'next_lesson': next_lesson,
+        'lesson_position': lesson_position,
+        'lesson_total': lesson_total,
+        'highlight_css': highlight_css(),
+    }
+    response = await arender(request, 'lms_courses/lesson_detail.html', context)
+    return add_validators(response, etag, max(course.updated_at, lesson.updated_at))
@@ -0,0 +1,94 @@
+"""
+Conditional GET cho trang khóa học và bài học.
+
+View tải dữ liệu như bình thường (khóa học, bài học, đề cương và trạng thái
+đăng ký đều đã có sẵn trong cache hoặc một truy vấn), tính ETag từ đúng
+những giá trị mà template hiển thị, và trả 304 trước khi render nếu
+If-None-Match khớp:
+
+    etag = page_etag(request, course.pk, course.updated_at, outline['version'], status)
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
+    ...
+    return add_validators(render(...), etag, course.updated_at)
+
+ETag là weak (W/"...") để nginx vẫn giữ khi gzip. Response có
+`Cache-Control: private, no-cache` vì trang phụ thuộc user: trình duyệt lưu
+và hỏi lại mỗi lần, proxy dùng chung (nginx proxy_cache) không lưu.
+
+Last-Modified chỉ để tham khảo: timestamp không đổi khi đề cương, bộ đếm hay
+trạng thái đăng ký đổi, nên 304 chỉ dựa vào ETag. Request chỉ gửi
+If-Modified-Since luôn nhận trang đầy đủ.
+"""
+import hashlib
+import os
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+@lru_cache(maxsize=None)
+def _templates_version():
+    """Đổi khi template được deploy lại, để trang cũ không còn được coi là mới"""
+    stamps = []
+    for directory in settings.TEMPLATES[0]['DIRS']:
+        for root, _, files in os.walk(directory):
+            stamps.extend(os.stat(os.path.join(root, name)).st_mtime_ns for name in files)
+    return max(stamps, default=0)
+
+
+def page_etag(request, *parts):
+    """
+    ETag của trang từ `parts` và trạng thái user (menu trong base.html).
+    None nếu trang phải render lại (có message đang chờ hiển thị).
+    """
+    if len(get_messages(request)):
+        return None
+    user = request.user
+    user_state = None
+    if user.is_authenticated:
+        profile = getattr(user, 'profile', None)
+        user_state = (user.pk, user.username, profile.user_type if profile else None)
+    key = repr((_templates_version(), user_state, parts))
+    return 'W/' + quote_etag(hashlib.sha1(key.encode()).hexdigest()[:20])
+
+
+def course_detail_parts(course):
+    """Giá trị của Course hiển thị ở course_detail nhưng không làm đổi updated_at"""
+    instructor = course.instructor
+    return (
+        course.pk, course.updated_at, course.thumbnail_variants,
+        course.lesson_count, course.assignment_count, course.quiz_count, course.enrollment_count,
+        instructor.username, instructor.first_name, instructor.last_name,
+        course.category.name if course.category else None,
+    )
+
+
+def not_modified(request, etag):
+    """Response 304 nếu If-None-Match khớp `etag`, ngược lại None"""
+    if etag is None:
+        return None
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        _set_headers(response, etag)
+    return response
+
+
+def add_validators(response, etag, last_modified=None):
+    """Gắn ETag (và Last-Modified để tham khảo) vào trang vừa render"""
+    if etag is None:
+        return response
+    _set_headers(response, etag)
+    if last_modified is not None:
+        response.headers.setdefault('Last-Modified', http_date(last_modified.timestamp()))
+    return response
+
+
+def _set_headers(response, etag):
+    response.headers['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Cookie',))
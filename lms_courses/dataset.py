@@ -0,0 +1,635 @@
+"""
+Sinh dữ liệu giả lập với khối lượng giống production để kiểm thử hiệu năng.
+
+Dữ liệu được chia thành các đơn vị (một dải user, một dải khóa học, một dải
+học viên); mỗi đơn vị tự sinh bằng random.Random seed theo (seed, loại, chỉ
+số) nên kết quả chỉ phụ thuộc seed, không phụ thuộc số process hay thứ tự
+chạy. Các đơn vị được ghi bằng bulk_create theo lô; với MySQL/PostgreSQL có
+thể chạy song song trên nhiều process.
+
+Id của Course/Quiz/Question/Answer/QuizAttempt được tính trước (bắt đầu từ id
+lớn nhất hiện có) để các đơn vị sau tham chiếu được mà không cần đọc lại.
+Question/Answer/QuizAttempt dùng id theo bước cố định nên có khoảng trống.
+
+Phân phối:
+- độ phổ biến khóa học theo Zipf (một số ít khóa học có phần lớn học viên),
+  số khóa học của mỗi giảng viên lệch về một nhóm nhỏ;
+- số khóa học mỗi học viên đăng ký theo phân phối mũ;
+- điểm quiz theo năng lực của từng học viên (phân phối beta).
+
+signals không chạy với bulk_create, nên chỉ mục tìm kiếm, thống kê lưu sẵn và
+CourseDailyStats được dựng lại ở bước cuối (có thể bỏ qua).
+"""
+import multiprocessing
+import random
+from bisect import bisect
+from collections import namedtuple
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from datetime import timedelta
+from functools import lru_cache
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from users.models import Profile
+
+from . import analytics
+from .models import (
+    Answer, Assignment, Category, Course, Enrollment, Lesson, Question, Quiz, QuizAttempt, QuizResponse,
+)
+from .rendering import content_hash, render_content
+from .search import rebuild_index
+from .stats import refresh_course_stats
+
+MAX_QUIZZES_PER_COURSE = 4
+MAX_QUESTIONS_PER_QUIZ = 20
+ANSWERS_PER_QUESTION = 4
+MAX_ATTEMPTS_PER_STUDENT = 64
+MAX_ENROLLMENTS_PER_STUDENT = 200
+HISTORY_DAYS = 730
+DEFAULT_PASSWORD = 'password123'
+
+USERS_PER_UNIT = 10000
+COURSES_PER_UNIT = 200
+STUDENTS_PER_UNIT = 1000
+
+
+@dataclass
+class DatasetConfig:
+    users: int = 2000
+    courses: int = 100
+    enrollments: int = 10000
+    quiz_responses: int = 50000
+    instructor_ratio: float = 0.02
+    seed: int = 42
+    batch_size: int = 5000
+    workers: int = 1
+
+
+PRESETS = {
+    'dev': DatasetConfig(),
+    'load': DatasetConfig(users=1000000, courses=50000, enrollments=5000000, quiz_responses=20000000),
+}
+
+CATEGORIES = [
+    ('Lập trình', 'Các khóa học về lập trình và phát triển phần mềm'),
+    ('Thiết kế', 'Thiết kế đồ họa, UI/UX, web design'),
+    ('Marketing', 'Digital marketing, SEO, social media'),
+    ('Kinh doanh', 'Khởi nghiệp, quản lý, tài chính'),
+    ('Ngoại ngữ', 'Tiếng Anh, tiếng Nhật, tiếng Hàn'),
+]
+
+# Tài khoản demo (username, họ, tên, loại), mật khẩu DEFAULT_PASSWORD
+DEMO_USERS = [
+    ('instructor1', 'Nguyễn', 'Văn A', 'instructor'),
+    ('instructor2', 'Trần', 'Thị B', 'instructor'),
+    ('student1', 'Lê', 'Văn C', 'student'),
+    ('student2', 'Phạm', 'Thị D', 'student'),
+]
+
+LAST_NAMES = [
+    ('Nguyễn', 38), ('Trần', 11), ('Lê', 9), ('Phạm', 7), ('Hoàng', 5), ('Huỳnh', 5), ('Phan', 4),
+    ('Vũ', 4), ('Võ', 3), ('Đặng', 2), ('Bùi', 2), ('Đỗ', 2), ('Hồ', 2), ('Ngô', 2), ('Dương', 1), ('Lý', 1),
+]
+MIDDLE_NAMES = ['Văn', 'Thị', 'Minh', 'Thanh', 'Ngọc', 'Đức', 'Hữu', 'Quang', 'Thu', 'Gia', 'Bảo', 'Anh']
+FIRST_NAMES = [
+    'An', 'Anh', 'Bình', 'Chi', 'Dũng', 'Duy', 'Giang', 'Hà', 'Hải', 'Hạnh', 'Hiếu', 'Hoa', 'Hùng', 'Huy',
+    'Hương', 'Khánh', 'Lan', 'Linh', 'Long', 'Mai', 'Minh', 'Nam', 'Nga', 'Ngọc', 'Nhung', 'Phong', 'Phúc',
+    'Quân', 'Quỳnh', 'Sơn', 'Tâm', 'Thảo', 'Thắng', 'Trang', 'Trung', 'Tú', 'Tuấn', 'Vân', 'Việt', 'Yến',
+]
+
+TOPICS = [
+    'Lập trình Python', 'Django Web Development', 'JavaScript hiện đại', 'ReactJS', 'Cơ sở dữ liệu MySQL',
+    'Cấu trúc dữ liệu và giải thuật', 'Machine Learning', 'Phân tích dữ liệu với Pandas', 'DevOps với Docker',
+    'Thiết kế UI/UX', 'Photoshop', 'Figma', 'Digital Marketing', 'SEO', 'Quảng cáo Facebook',
+    'Khởi nghiệp', 'Quản trị dự án', 'Kế toán doanh nghiệp', 'Tài chính cá nhân',
+    'Tiếng Anh giao tiếp', 'IELTS', 'Tiếng Nhật N5', 'Tiếng Hàn sơ cấp',
+]
+TITLE_SUFFIXES = ['cơ bản', 'nâng cao', 'cho người mới bắt đầu', 'thực chiến', 'từ A đến Z', 'chuyên sâu']
+DIFFICULTIES = [('beginner', 5), ('intermediate', 3), ('advanced', 2)]
+COURSE_STATUSES = [('published', 85), ('draft', 10), ('archived', 5)]
+ENROLLMENT_STATUSES = [('active', 70), ('completed', 20), ('dropped', 10)]
+QUESTION_TYPES = [('multiple_choice', 75), ('true_false', 15), ('short_answer', 10)]
+QUIZ_COUNTS = [(0, 15), (1, 40), (2, 30), (3, 10), (4, 5)]
+
+LESSON_TEMPLATE = """## {title}
+
+Trong bài này chúng ta tìm hiểu **{topic}** qua ví dụ thực tế.
+
+1. Khái niệm cơ bản
+2. Ví dụ minh họa
+3. Bài tập vận dụng
+
+```python
+def bai_{n}(du_lieu):
+    return [x * {n} for x in du_lieu if x % 2 == 0]
+```
+
+| Nội dung | Thời lượng |
+|----------|-----------|
+| Lý thuyết | {n} phút |
+| Thực hành | {m} phút |
+"""
+LESSON_VARIANTS = 24
+
+CourseLayout = namedtuple('CourseLayout', [
+    'status', 'created_at', 'instructor_index', 'category_id', 'title', 'difficulty',
+    'lessons', 'assignments', 'quizzes',
+])
+# quizzes: tuple các QuizLayout
+QuizLayout = namedtuple('QuizLayout', ['max_attempts', 'question_types'])
+
+
+@dataclass
+class Plan:
+    """Tham số chung của mọi đơn vị, tính một lần trước khi sinh"""
+    config: DatasetConfig
+    now: object
+    password_hash: str
+    category_ids: list
+    user_base: int
+    course_base: int
+    quiz_base: int
+    question_base: int
+    answer_base: int
+    attempt_base: int
+    instructor_ids: list = field(default_factory=list)
+    demo_student_ids: list = field(default_factory=list)
+    attempt_probability: float = 1.0
+
+    @property
+    def n_instructors(self):
+        return int(self.config.users * self.config.instructor_ratio) if self.config.users else 0
+
+    @property
+    def n_students(self):
+        return len(self.demo_student_ids) + self.config.users - self.n_instructors
+
+    def student_id(self, index):
+        if index < len(self.demo_student_ids):
+            return self.demo_student_ids[index]
+        return self.user_base + self.n_instructors + index - len(self.demo_student_ids)
+
+    def instructor_id(self, index):
+        if index < len(self.instructor_ids):
+            return self.instructor_ids[index]
+        return self.user_base + index - len(self.instructor_ids)
+
+    @property
+    def instructor_count(self):
+        return len(self.instructor_ids) + self.n_instructors
+
+    def quiz_id(self, course_index, k):
+        return self.quiz_base + course_index * MAX_QUIZZES_PER_COURSE + k
+
+    def question_index(self, course_index, k, n):
+        return (course_index * MAX_QUIZZES_PER_COURSE + k) * MAX_QUESTIONS_PER_QUIZ + n
+
+
+# Plan của process hiện tại (đặt bởi _init_worker)
+_plan = None
+
+
+def _rng(kind, index):
+    return random.Random(f'{_plan.config.seed}:{kind}:{index}')
+
+
+def _weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+def _ago(rng, skew=1.0):
+    """Thời điểm ngẫu nhiên trong HISTORY_DAYS ngày qua, skew > 1 lệch về gần đây"""
+    return _plan.now - timedelta(days=HISTORY_DAYS * rng.random() ** skew)
+
+
+def _between(rng, start, end):
+    return start + (end - start) * rng.random()
+
+
+@lru_cache(maxsize=None)
+def course_layout(course_index):
+    rng = _rng('course', course_index)
+    topic = rng.choice(TOPICS)
+    quizzes = []
+    for _ in range(_weighted(rng, QUIZ_COUNTS)):
+        question_types = tuple(
+            _weighted(rng, QUESTION_TYPES) for _ in range(rng.randint(5, MAX_QUESTIONS_PER_QUIZ // 2 + 5))
+        )
+        quizzes.append(QuizLayout(rng.choice((1, 1, 3)), question_types))
+    return CourseLayout(
+        status=_weighted(rng, COURSE_STATUSES),
+        created_at=_ago(rng, skew=1.5),
+        # Lệch về các giảng viên đầu danh sách: số ít giảng viên dạy nhiều khóa học
+        instructor_index=int(_plan.instructor_count * rng.random() ** 3),
+        category_id=rng.choice(_plan.category_ids),
+        title=f'{topic} {rng.choice(TITLE_SUFFIXES)}',
+        difficulty=_weighted(rng, DIFFICULTIES),
+        lessons=min(80, max(3, int(rng.lognormvariate(2.7, 0.5)))),
+        assignments=rng.choice((0, 1, 1, 2, 3)),
+        quizzes=tuple(quizzes),
+    )
+
+
+@lru_cache(maxsize=None)
+def _popularity():
+    """(chỉ số khóa học đã xuất bản, cum_weights) theo phân phối Zipf"""
+    published = [i for i in range(_plan.config.courses) if course_layout(i).status == 'published']
+    random.Random(f'{_plan.config.seed}:popularity').shuffle(published)
+    weights = [1 / (rank + 1) ** 1.07 for rank in range(len(published))]
+    return published, list(accumulate(weights))
+
+
+@lru_cache(maxsize=None)
+def _lesson_content(variant):
+    """(content, content_html, content_hash) của mẫu bài học, render một lần mỗi process"""
+    topic = TOPICS[variant % len(TOPICS)]
+    content = LESSON_TEMPLATE.format(title=topic, topic=topic.lower(), n=variant + 5, m=variant * 2 + 10)
+    return content, render_content(content), content_hash(content)
+
+
+def _correct_index(question_index, question_type):
+    return question_index % (2 if question_type == 'true_false' else ANSWERS_PER_QUESTION)
+
+
+def _short_answer(question_index):
+    return f'đáp án {question_index % 97}'
+
+
+# Các đơn vị sinh dữ liệu -----------------------------------------------------
+
+def _bulk(model, objs):
+    model.objects.bulk_create(objs, batch_size=_plan.config.batch_size)
+    return len(objs)
+
+
+def generate_users(start, end):
+    """Sinh user (và Profile) có chỉ số [start, end)"""
+    users, profiles = [], []
+    for i in range(start, end):
+        rng = _rng('user', i)
+        user_id = _plan.user_base + i
+        joined = _ago(rng, skew=1.3)
+        users.append(User(
+            id=user_id,
+            username=f'u{user_id}',
+            email=f'u{user_id}@example.com',
+            first_name=f'{rng.choice(MIDDLE_NAMES)} {rng.choice(FIRST_NAMES)}',
+            last_name=_weighted(rng, LAST_NAMES),
+            password=_plan.password_hash,
+            date_joined=joined,
+            last_login=_between(rng, joined, _plan.now) if rng.random() < 0.8 else None,
+        ))
+        profiles.append(Profile(
+            user_id=user_id,
+            user_type='instructor' if i < _plan.n_instructors else 'student',
+            created_at=joined,
+            updated_at=joined,
+        ))
+    with transaction.atomic():
+        _bulk(User, users)
+        _bulk(Profile, profiles)
+    return {'users': len(users)}
+
+
+def generate_courses(start, end):
+    """Sinh khóa học có chỉ số [start, end) cùng bài học, bài tập, quiz, câu hỏi và đáp án"""
+    courses, lessons, assignments, quizzes, questions, answers = [], [], [], [], [], []
+    for ci in range(start, end):
+        layout = course_layout(ci)
+        rng = _rng('course-content', ci)
+        course_id = _plan.course_base + ci
+        created = layout.created_at
+        courses.append(Course(
+            id=course_id,
+            title=layout.title,
+            description=f'Khóa học {layout.title.lower()} với {layout.lessons} bài học và bài tập thực hành.',
+            instructor_id=_plan.instructor_id(layout.instructor_index),
+            category_id=layout.category_id,
+            price=rng.choice((0, 199000, 299000, 499000, 799000, 1299000)),
+            duration_hours=max(1, layout.lessons // 2),
+            difficulty_level=layout.difficulty,
+            status=layout.status,
+            created_at=created,
+            updated_at=_between(rng, created, _plan.now),
+        ))
+        for n in range(layout.lessons):
+            content, html, digest = _lesson_content(rng.randrange(LESSON_VARIANTS))
+            lessons.append(Lesson(
+                course_id=course_id,
+                title=f'Bài {n + 1}: {layout.title}',
+                content=content,
+                content_html=html,
+                content_hash=digest,
+                duration_minutes=rng.randint(5, 60),
+                order=n + 1,
+                is_free=n < 2,
+                created_at=created,
+                updated_at=created,
+            ))
+        for n in range(layout.assignments):
+            assignments.append(Assignment(
+                course_id=course_id,
+                title=f'Bài tập {n + 1}',
+                description='Hoàn thành bài tập và nộp file kết quả.',
+                due_date=created + timedelta(days=14 * (n + 1)),
+                created_at=created,
+                updated_at=created,
+            ))
+        for k, quiz_layout in enumerate(layout.quizzes):
+            quiz_id = _plan.quiz_id(ci, k)
+            quizzes.append(Quiz(
+                id=quiz_id,
+                course_id=course_id,
+                title=f'Kiểm tra {k + 1}',
+                max_attempts=quiz_layout.max_attempts,
+                created_at=created,
+                updated_at=created,
+            ))
+            for n, question_type in enumerate(quiz_layout.question_types):
+                qi = _plan.question_index(ci, k, n)
+                question_id = _plan.question_base + qi
+                questions.append(Question(
+                    id=question_id,
+                    quiz_id=quiz_id,
+                    text=f'Câu hỏi {n + 1} về {layout.title.lower()}?',
+                    question_type=question_type,
+                    points=1,
+                    order=n + 1,
+                ))
+                answers.extend(_answers(qi, question_id, question_type))
+    with transaction.atomic():
+        _bulk(Course, courses)
+        _bulk(Lesson, lessons)
+        _bulk(Assignment, assignments)
+        _bulk(Quiz, quizzes)
+        _bulk(Question, questions)
+        _bulk(Answer, answers)
+    return {'courses': len(courses), 'lessons': len(lessons), 'quizzes': len(quizzes), 'questions': len(questions)}
+
+
+def _answer_id(question_index, j):
+    return _plan.answer_base + question_index * ANSWERS_PER_QUESTION + j
+
+
+def _answers(question_index, question_id, question_type):
+    if question_type == 'short_answer':
+        return [Answer(
+            id=_answer_id(question_index, 0), question_id=question_id,
+            text=_short_answer(question_index), is_correct=True, order=1,
+        )]
+    correct = _correct_index(question_index, question_type)
+    if question_type == 'true_false':
+        texts = ['Đúng', 'Sai']
+    else:
+        texts = [f'Phương án {chr(65 + j)}' for j in range(ANSWERS_PER_QUESTION)]
+    return [
+        Answer(id=_answer_id(question_index, j), question_id=question_id,
+               text=text, is_correct=j == correct, order=j + 1)
+        for j, text in enumerate(texts)
+    ]
+
+
+def _pick_courses(rng, count):
+    published, cum_weights = _popularity()
+    count = min(count, len(published), MAX_ENROLLMENTS_PER_STUDENT)
+    if count * 2 > len(published):
+        return rng.sample(published, count)
+    total = cum_weights[-1]
+    chosen = set()
+    while len(chosen) < count:
+        chosen.add(published[bisect(cum_weights, rng.random() * total)])
+    return sorted(chosen)
+
+
+def generate_students(start, end):
+    """Sinh đăng ký, lần làm quiz và câu trả lời của học viên có chỉ số [start, end)"""
+    enrollments, attempts, responses = [], [], []
+    mean = _plan.config.enrollments / max(1, _plan.n_students)
+    for si in range(start, end):
+        rng = _rng('student', si)
+        student_id = _plan.student_id(si)
+        skill = rng.betavariate(5, 2)
+        attempt_count = 0
+        for ci in _pick_courses(rng, int(rng.expovariate(1 / mean) + 0.5) if mean else 0):
+            layout = course_layout(ci)
+            enrolled_at = _between(rng, layout.created_at, _plan.now)
+            status = _weighted(rng, ENROLLMENT_STATUSES)
+            enrollments.append(Enrollment(
+                student_id=student_id,
+                course_id=_plan.course_base + ci,
+                enrolled_at=enrolled_at,
+                status=status,
+                completed_at=_between(rng, enrolled_at, _plan.now) if status == 'completed' else None,
+            ))
+            for k, quiz_layout in enumerate(layout.quizzes):
+                if rng.random() >= _plan.attempt_probability:
+                    continue
+                tries = rng.randint(1, quiz_layout.max_attempts)
+                for _ in range(tries):
+                    if attempt_count >= MAX_ATTEMPTS_PER_STUDENT:
+                        break
+                    attempt_id = _plan.attempt_base + si * MAX_ATTEMPTS_PER_STUDENT + attempt_count
+                    attempt_count += 1
+                    started = _between(rng, enrolled_at, _plan.now)
+                    score = 0
+                    for n, question_type in enumerate(quiz_layout.question_types):
+                        qi = _plan.question_index(ci, k, n)
+                        correct = rng.random() < skill
+                        responses.append(_response(rng, attempt_id, qi, question_type, correct))
+                        score += correct
+                    attempts.append(QuizAttempt(
+                        id=attempt_id,
+                        quiz_id=_plan.quiz_id(ci, k),
+                        student_id=student_id,
+                        started_at=started,
+                        completed_at=started + timedelta(minutes=rng.randint(3, 30)),
+                        score=score,
+                    ))
+    with transaction.atomic():
+        _bulk(Enrollment, enrollments)
+        _bulk(QuizAttempt, attempts)
+        _bulk(QuizResponse, responses)
+    return {'enrollments': len(enrollments), 'attempts': len(attempts), 'quiz_responses': len(responses)}
+
+
+def _response(rng, attempt_id, question_index, question_type, correct):
+    question_id = _plan.question_base + question_index
+    if question_type == 'short_answer':
+        text = _short_answer(question_index) if correct else 'không biết'
+        return QuizResponse(attempt_id=attempt_id, question_id=question_id,
+                            text_response=text, is_correct=correct)
+    right = _correct_index(question_index, question_type)
+    if correct:
+        choice = right
+    else:
+        options = 2 if question_type == 'true_false' else ANSWERS_PER_QUESTION
+        choice = (right + rng.randrange(1, options)) % options
+    return QuizResponse(attempt_id=attempt_id, question_id=question_id,
+                        answer_id=_answer_id(question_index, choice), is_correct=correct)
+
+
+def rebuild_derived(start, end):
+    """Dựng lại chỉ mục tìm kiếm, thống kê lưu sẵn và CourseDailyStats cho khóa học [start, end)"""
+    course_ids = list(range(_plan.course_base + start, _plan.course_base + end))
+    rebuild_index(Course.objects.filter(pk__in=course_ids))
+    for course_id in course_ids:
+        refresh_course_stats(course_id)
+    analytics.rebuild(course_ids)
+    return {'derived': len(course_ids)}
+
+
+# Điều phối -------------------------------------------------------------------
+
+def _init_worker(plan):
+    global _plan
+    _plan = plan
+    course_layout.cache_clear()
+    _popularity.cache_clear()
+    # Không dùng chung kết nối database với process cha
+    for conn in connections.all():
+        conn.close()
+
+
+def _run_unit(args):
+    func, start, end = args
+    return func(start, end)
+
+
+def _units(func, total, size):
+    return [(func, start, min(start + size, total)) for start in range(0, total, size)]
+
+
+def _next_id(model):
+    return (model.objects.aggregate(value=Max('id'))['value'] or 0) + 1
+
+
+def _ensure_demo_data():
+    category_ids = [
+        Category.objects.get_or_create(name=name, defaults={'description': description})[0].pk
+        for name, description in CATEGORIES
+    ]
+    instructor_ids, student_ids = [], []
+    for username, last_name, first_name, user_type in DEMO_USERS:
+        user, created = User.objects.get_or_create(
+            username=username,
+            defaults={'email': f'{username}@example.com', 'first_name': first_name, 'last_name': last_name},
+        )
+        if created:
+            user.set_password(DEFAULT_PASSWORD)
+            user.save()
+        Profile.objects.get_or_create(user=user, defaults={'user_type': user_type})
+        (instructor_ids if user_type == 'instructor' else student_ids).append(user.pk)
+    return category_ids, instructor_ids, student_ids
+
+
+def _attempt_probability(plan):
+    """Xác suất làm mỗi quiz để tổng số câu trả lời xấp xỉ config.quiz_responses"""
+    published, cum_weights = _popularity()
+    if not published or not plan.config.enrollments:
+        return 0.0
+    expected = 0.0
+    previous = 0.0
+    for ci, cum in zip(published, cum_weights):
+        layout = course_layout(ci)
+        per_enrollment = sum(len(q.question_types) * (1 + q.max_attempts) / 2 for q in layout.quizzes)
+        expected += per_enrollment * (cum - previous)
+        previous = cum
+    expected /= cum_weights[-1]
+    if not expected:
+        return 0.0
+    return min(1.0, plan.config.quiz_responses / (plan.config.enrollments * expected))
+
+
+@contextmanager
+def explicit_timestamps(models):
+    """Tạm tắt auto_now/auto_now_add để ghi được mốc thời gian trong quá khứ"""
+    fields = [
+        f for model in models for f in model._meta.concrete_fields
+        if getattr(f, 'auto_now', False) or getattr(f, 'auto_now_add', False)
+    ]
+    saved = [(f, f.auto_now, f.auto_now_add) for f in fields]
+    for f in fields:
+        f.auto_now = f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, auto_now, auto_now_add in saved:
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+def generate_dataset(config, skip_derived=False, progress=None):
+    """
+    Sinh toàn bộ dữ liệu theo `config`. `progress(phase, result)` được gọi sau
+    mỗi đơn vị. Trả về dict tổng số bản ghi đã tạo.
+    """
+    if connection.vendor not in ('mysql', 'postgresql'):
+        # SQLite chỉ cho một writer tại một thời điểm
+        config = replace(config, workers=1)
+
+    category_ids, instructor_ids, student_ids = _ensure_demo_data()
+    plan = Plan(
+        config=config,
+        now=timezone.now(),
+        password_hash=make_password(DEFAULT_PASSWORD),
+        category_ids=category_ids,
+        user_base=_next_id(User),
+        course_base=_next_id(Course),
+        quiz_base=_next_id(Quiz),
+        question_base=_next_id(Question),
+        answer_base=_next_id(Answer),
+        attempt_base=_next_id(QuizAttempt),
+        instructor_ids=instructor_ids,
+        demo_student_ids=student_ids,
+    )
+    _init_worker(plan)
+    plan.attempt_probability = _attempt_probability(plan)
+
+    phases = [
+        ('users', _units(generate_users, config.users, USERS_PER_UNIT)),
+        ('courses', _units(generate_courses, config.courses, COURSES_PER_UNIT)),
+        ('students', _units(generate_students, plan.n_students, STUDENTS_PER_UNIT)),
+    ]
+    if not skip_derived:
+        phases.append(('derived', _units(rebuild_derived, config.courses, COURSES_PER_UNIT)))
+
+    totals = {}
+    models = [User, Profile, Course, Lesson, Assignment, Quiz, Enrollment, QuizAttempt]
+    with explicit_timestamps(models):
+        pool = None
+        if config.workers > 1:
+            connections.close_all()
+            pool = multiprocessing.get_context('fork').Pool(
+                config.workers, initializer=_init_worker, initargs=(plan,),
+            )
+        try:
+            for phase, units in phases:
+                results = pool.imap_unordered(_run_unit, units) if pool else map(_run_unit, units)
+                for result in results:
+                    for key, value in result.items():
+                        totals[key] = totals.get(key, 0) + value
+                    if progress:
+                        progress(phase, result)
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+
+    _reset_sequences([User, Course, Quiz, Question, Answer, QuizAttempt])
+    return totals
+
+
+def _reset_sequences(models):
+    """Đặt lại sequence sau khi ghi id tường minh (chỉ cần với PostgreSQL)"""
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
@@ -0,0 +1,76 @@
+"""
+Cache danh sách khóa học đã đăng ký của từng user.
+
+Một truy vấn lấy toàn bộ (course_id, status) của user, lưu vào cache dùng
+chung với TTL ngắn. course_detail, course_learning và lesson_detail hỏi qua
+get_enrollment_status() thay vì Enrollment.objects.get() mỗi request.
+Signals của Enrollment xóa cache của user tương ứng.
+"""
+from django.core.cache import cache
+from django.db import transaction
+
+from replicas.routing import primary
+
+from .models import Enrollment
+
+CACHE_TIMEOUT = 15 * 60
+
+
+def _cache_key(user_id):
+    return f'lms:enrollments:{user_id}'
+
+
+def get_enrollment_map(user):
+    """Trả về dict {course_id: status} của user (rỗng nếu chưa đăng nhập)"""
+    if not user.is_authenticated:
+        return {}
+    key = _cache_key(user.pk)
+    enrollments = cache.get(key)
+    if enrollments is None:
+        with primary():
+            enrollments = dict(
+                Enrollment.objects.filter(student_id=user.pk).values_list('course_id', 'status')
+            )
+        cache.set(key, enrollments, CACHE_TIMEOUT)
+    return enrollments
+
+
+def get_enrollment_status(user, course_id):
+    """Trạng thái đăng ký của user với khóa học, None nếu chưa đăng ký"""
+    return get_enrollment_map(user).get(course_id)
+
+
+async def aget_enrollment_map(user):
+    """
+    Bản async của get_enrollment_map(). `user` phải đã được tải (không phải
+    request.user còn lazy) vì việc tải user từ session là truy vấn đồng bộ.
+    """
+    if not user.is_authenticated:
+        return {}
+    key = _cache_key(user.pk)
+    enrollments = await cache.aget(key)
+    if enrollments is None:
+        with primary():
+            enrollments = {
+                course_id: status async for course_id, status in
+                Enrollment.objects.filter(student_id=user.pk).values_list('course_id', 'status')
+            }
+        await cache.aset(key, enrollments, CACHE_TIMEOUT)
+    return enrollments
+
+
+async def aget_enrollment_status(user, course_id):
+    return (await aget_enrollment_map(user)).get(course_id)
+
+
+def is_enrolled(user, course_id):
+    return get_enrollment_status(user, course_id) is not None
+
+
+def invalidate_enrollments(*user_ids):
+    """Xóa cache của các user (một lần gọi cache cho cả danh sách)"""
+    keys = [_cache_key(user_id) for user_id in user_ids]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
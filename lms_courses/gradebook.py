@@ -0,0 +1,104 @@
+"""
+Xuất bảng điểm khóa học dạng CSV.
+
+Các dòng được sinh dần theo từng chunk (pagination.iter_keyset: mỗi chunk
+một truy vấn riêng, theo từng bài tập / quiz) nên có thể stream qua
+StreamingHttpResponse: bộ nhớ không đổi theo số bài nộp và byte đầu tiên được
+gửi ngay.
+
+Truy vấn của phần stream chạy sau khi view đã trả response, ngoài phạm vi
+của ReplicaMiddleware, nên database được chọn trong view và truyền vào bằng
+`using`.
+"""
+import csv
+
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .answer_keys import get_answer_key, quiz_version
+from .models import Assignment, Quiz, QuizAttempt, Submission
+from .pagination import iter_keyset
+
+CHUNK_SIZE = 2000
+
+HEADER = [
+    'loai', 'bai', 'username', 'ho_ten', 'diem', 'diem_toi_da', 'thoi_gian_nop', 'thoi_gian_cham',
+]
+
+
+class Echo:
+    """Đối tượng giả file, trả lại chuỗi vừa ghi cho csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def gradebook_filename(course):
+    return f'bang-diem-{slugify(course.title) or course.id}.csv'
+
+
+def _format_datetime(value):
+    if value is None:
+        return ''
+    return timezone.localtime(value).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _student_name(student):
+    return student.get_full_name() or student.username
+
+
+def iter_gradebook_rows(course, using=None):
+    yield HEADER
+
+    assignment_ids = Assignment.objects.using(using).filter(course=course).order_by('id').values_list('id', flat=True)
+    for assignment_id in list(assignment_ids):
+        submissions = Submission.objects.using(using).filter(
+            assignment_id=assignment_id,
+        ).select_related('student', 'assignment').only(
+            'points', 'submitted_at', 'graded_at',
+            'student__username', 'student__first_name', 'student__last_name',
+            'assignment__title', 'assignment__max_points',
+        )
+        # (assignment, student) là unique nên student_id đủ làm khóa
+        for submission in iter_keyset(submissions, ['student_id'], CHUNK_SIZE):
+            yield [
+                'assignment',
+                submission.assignment.title,
+                submission.student.username,
+                _student_name(submission.student),
+                '' if submission.points is None else submission.points,
+                submission.assignment.max_points,
+                _format_datetime(submission.submitted_at),
+                _format_datetime(submission.graded_at),
+            ]
+
+    quizzes = {
+        quiz.id: (quiz.title, get_answer_key(quiz.id, quiz_version(quiz.updated_at)).max_score)
+        for quiz in Quiz.objects.using(using).filter(course=course).only('id', 'title', 'updated_at').order_by('id')
+    }
+    for quiz_id, (title, max_score) in quizzes.items():
+        attempts = QuizAttempt.objects.using(using).filter(
+            quiz_id=quiz_id,
+        ).select_related('student').only(
+            'quiz_id', 'score', 'started_at', 'completed_at',
+            'student__username', 'student__first_name', 'student__last_name',
+        )
+        for attempt in iter_keyset(attempts, ['student_id', 'started_at', 'id'], CHUNK_SIZE):
+            yield [
+                'quiz',
+                title,
+                attempt.student.username,
+                _student_name(attempt.student),
+                '' if attempt.score is None else attempt.score,
+                max_score,
+                _format_datetime(attempt.completed_at),
+                '',
+            ]
+
+
+def iter_gradebook_csv(course, using=None):
+    """Sinh từng dòng CSV; dòng đầu có BOM để Excel nhận đúng UTF-8"""
+    writer = csv.writer(Echo())
+    yield '\ufeff'
+    for row in iter_gradebook_rows(course, using):
+        yield writer.writerow(row)
@@ -0,0 +1,77 @@
+"""
+Chấm điểm tự động cho QuizAttempt.
+
+Đáp án của các quiz liên quan lấy từ lms_courses.answer_keys (đã biên dịch và
+cache), câu trả lời của tất cả attempt được tải bằng một truy vấn, kết quả
+được ghi lại bằng bulk_update. Số truy vấn không phụ thuộc vào số attempt.
+"""
+from django.db import transaction
+
+from .analytics import record_quiz_scores
+from .answer_keys import get_answer_key, get_answer_keys
+from .models import QuizAttempt, QuizResponse
+
+BATCH_SIZE = 1000
+
+
+def grade_attempts(attempts, answer_keys=None):
+    """
+    Chấm điểm danh sách (hoặc queryset) QuizAttempt.
+    Ghi QuizResponse.is_correct và QuizAttempt.score, trả về số attempt đã chấm.
+    """
+    attempts = list(attempts)
+    if not attempts:
+        return 0
+    if answer_keys is None:
+        answer_keys = get_answer_keys({attempt.quiz_id for attempt in attempts})
+
+    scores = {attempt.pk: 0 for attempt in attempts}
+    quiz_of_attempt = {attempt.pk: attempt.quiz_id for attempt in attempts}
+    responses = QuizResponse.objects.filter(attempt_id__in=scores).only(
+        'id', 'attempt_id', 'question_id', 'answer_id', 'text_response', 'is_correct'
+    )
+    changed = []
+    for response in responses.iterator(chunk_size=BATCH_SIZE):
+        key = answer_keys[quiz_of_attempt[response.attempt_id]]
+        correct = key.is_correct(response.question_id, response.answer_id, response.text_response)
+        if correct:
+            scores[response.attempt_id] += key.points_for(response.question_id)
+        if response.is_correct != correct:
+            response.is_correct = correct
+            changed.append(response)
+
+    for attempt in attempts:
+        attempt.score = scores[attempt.pk]
+    with transaction.atomic():
+        # Điểm cũ đọc từ database (không tin bản trong bộ nhớ) để cộng đúng phần chênh lệch
+        previous = list(
+            QuizAttempt.objects.filter(pk__in=scores, completed_at__isnull=False)
+            .values_list('pk', 'quiz__course_id', 'completed_at', 'score')
+        )
+        QuizResponse.objects.bulk_update(changed, ['is_correct'], batch_size=BATCH_SIZE)
+        QuizAttempt.objects.bulk_update(attempts, ['score'], batch_size=BATCH_SIZE)
+        record_quiz_scores(
+            (course_id, completed_at, old_score, scores[pk])
+            for pk, course_id, completed_at, old_score in previous
+        )
+    return len(attempts)
+
+
+def grade_attempt(attempt):
+    """Chấm điểm một attempt, trả về điểm"""
+    grade_attempts([attempt])
+    return attempt.score
+
+
+def grade_quiz(quiz_id, only_ungraded=False, batch_size=BATCH_SIZE):
+    """Chấm toàn bộ attempt đã nộp của một quiz theo từng lô"""
+    answer_keys = {quiz_id: get_answer_key(quiz_id)}
+    attempts = QuizAttempt.objects.filter(quiz_id=quiz_id, completed_at__isnull=False)
+    if only_ungraded:
+        attempts = attempts.filter(score__isnull=True)
+    attempt_ids = list(attempts.values_list('id', flat=True))
+    total = 0
+    for start in range(0, len(attempt_ids), batch_size):
+        batch = QuizAttempt.objects.filter(id__in=attempt_ids[start:start + batch_size])
+        total += grade_attempts(batch.only('id', 'quiz_id', 'score'), answer_keys)
+    return total
@@ -0,0 +1,129 @@
+"""
+Nhập đăng ký khóa học hàng loạt từ CSV.
+
+File được đọc từng dòng và xử lý theo lô: mỗi lô tra username và course_id
+bằng một truy vấn, bỏ qua các cặp (student, course) đã có rồi bulk_create với
+ignore_conflicts. Bộ nhớ chỉ phụ thuộc kích thước lô, không phụ thuộc file.
+
+CSV có dạng `username,course_id` (dòng tiêu đề là tùy chọn).
+"""
+import csv
+from collections import Counter
+from dataclasses import dataclass, field
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .analytics import record_event
+from .enrollments import invalidate_enrollments
+from .models import Course, Enrollment
+from .stats import refresh_enrollment_stats
+
+CHUNK_SIZE = 5000
+
+
+@dataclass
+class ImportResult:
+    # Số cặp chưa có lúc kiểm tra và được gửi đi chèn. bulk_create với
+    # ignore_conflicts không cho biết dòng nào thực sự được chèn: đăng ký do
+    # request khác tạo cùng lúc vẫn nằm trong số này (học viên vẫn được đăng ký).
+    attempted: int = 0
+    skipped: int = 0
+    invalid: int = 0
+    errors: list = field(default_factory=list)
+
+    MAX_ERRORS = 20
+
+    def add_error(self, line_number, message):
+        self.invalid += 1
+        if len(self.errors) < self.MAX_ERRORS:
+            self.errors.append(f'Dòng {line_number}: {message}')
+
+
+def _read_rows(lines):
+    """Sinh (số dòng, username, course_id) từ file CSV"""
+    reader = csv.reader(lines)
+    columns = (0, 1)
+    for row in reader:
+        line_number = reader.line_num
+        if not row or not any(cell.strip() for cell in row):
+            continue
+        cells = [cell.strip() for cell in row]
+        if line_number == 1 and 'username' in cells and 'course_id' in cells:
+            columns = (cells.index('username'), cells.index('course_id'))
+            continue
+        if len(cells) <= max(columns):
+            yield line_number, None, None
+            continue
+        yield line_number, cells[columns[0]], cells[columns[1]]
+
+
+def import_enrollments(lines, status='active', chunk_size=CHUNK_SIZE):
+    """Nhập đăng ký từ iterable các dòng CSV (str), trả về ImportResult"""
+    result = ImportResult()
+    touched_courses = set()
+    chunk = []
+    for row in _read_rows(lines):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            _import_chunk(chunk, status, result, touched_courses)
+            chunk = []
+    if chunk:
+        _import_chunk(chunk, status, result, touched_courses)
+
+    for course_id in touched_courses:
+        refresh_enrollment_stats(course_id)
+    return result
+
+
+def _import_chunk(rows, status, result, touched_courses):
+    usernames = {username for _, username, _ in rows if username}
+    course_ids = set()
+    for _, _, course_id in rows:
+        if course_id and course_id.isdigit():
+            course_ids.add(int(course_id))
+
+    user_ids = dict(User.objects.filter(username__in=usernames).values_list('username', 'id'))
+    existing_courses = set(Course.objects.filter(id__in=course_ids).values_list('id', flat=True))
+
+    pairs = {}
+    for line_number, username, course_id in rows:
+        if username is None:
+            result.add_error(line_number, 'thiếu cột')
+            continue
+        if username not in user_ids:
+            result.add_error(line_number, f'không tìm thấy user "{username}"')
+            continue
+        if not course_id.isdigit() or int(course_id) not in existing_courses:
+            result.add_error(line_number, f'không tìm thấy khóa học "{course_id}"')
+            continue
+        pair = (user_ids[username], int(course_id))
+        if pair in pairs:
+            result.skipped += 1
+            continue
+        pairs[pair] = line_number
+
+    if not pairs:
+        return
+    student_ids = {student_id for student_id, _ in pairs}
+    already = set(
+        Enrollment.objects.filter(
+            student_id__in=student_ids, course_id__in={course_id for _, course_id in pairs}
+        ).values_list('student_id', 'course_id')
+    )
+    new_pairs = [pair for pair in pairs if pair not in already]
+    result.skipped += len(pairs) - len(new_pairs)
+
+    with transaction.atomic():
+        Enrollment.objects.bulk_create(
+            [Enrollment(student_id=s, course_id=c, status=status) for s, c in new_pairs],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+    result.attempted += len(new_pairs)
+
+    per_course = Counter(course_id for _, course_id in new_pairs)
+    for course_id, count in per_course.items():
+        touched_courses.add(course_id)
+        record_event(course_id, new_enrollments=count)
+    invalidate_enrollments(*{student_id for student_id, _ in new_pairs})
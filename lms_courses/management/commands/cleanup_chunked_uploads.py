@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from lms_courses.models import ChunkedUpload
+from lms_courses.uploads import discard_temp_file
+
+
+class Command(BaseCommand):
+    help = 'Xóa các phiên tải file theo phần bị bỏ dở'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-hours', type=int, default=24)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['older_than_hours'])
+        stale = ChunkedUpload.objects.filter(updated_at__lt=cutoff)
+        total = 0
+        for upload in stale.iterator():
+            discard_temp_file(upload)
+            upload.delete()
+            total += 1
+        self.stdout.write(self.style.SUCCESS(f'Đã xóa {total} phiên tải lên'))
@@ -0,0 +1,55 @@
+import os
+from dataclasses import replace
+
+from django.core.management.base import BaseCommand
+
+from lms_courses.dataset import PRESETS, generate_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        'Sinh dữ liệu giả lập (user, khóa học, đăng ký, câu trả lời quiz) để phát triển '
+        'và kiểm thử tải. Luôn tạo danh mục và tài khoản demo (instructor1, student1, ... / password123).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--preset', choices=sorted(PRESETS), default='dev')
+        parser.add_argument('--users', type=int)
+        parser.add_argument('--courses', type=int)
+        parser.add_argument('--enrollments', type=int)
+        parser.add_argument('--quiz-responses', type=int)
+        parser.add_argument('--instructor-ratio', type=float)
+        parser.add_argument('--seed', type=int)
+        parser.add_argument('--batch-size', type=int)
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help=f'Số process (chỉ MySQL/PostgreSQL), ví dụ {os.cpu_count()}',
+        )
+        parser.add_argument(
+            '--skip-derived', action='store_true',
+            help='Không dựng lại chỉ mục tìm kiếm và thống kê (chạy rebuild_* sau)',
+        )
+
+    def handle(self, *args, **options):
+        overrides = {
+            name: options[name]
+            for name in ('users', 'courses', 'enrollments', 'quiz_responses',
+                         'instructor_ratio', 'seed', 'batch_size', 'workers')
+            if options[name] is not None
+        }
+        config = replace(PRESETS[options['preset']], **overrides)
+        self.stdout.write(
+            f'Sinh {config.users} user, {config.courses} khóa học, ~{config.enrollments} đăng ký, '
+            f'~{config.quiz_responses} câu trả lời (seed {config.seed}, {config.workers} process)'
+        )
+
+        done = {}
+
+        def progress(phase, result):
+            done[phase] = done.get(phase, 0) + 1
+            if options['verbosity'] >= 2:
+                self.stdout.write(f'  {phase} #{done[phase]}: {result}')
+
+        totals = generate_dataset(config, skip_derived=options['skip_derived'], progress=progress)
+        summary = ', '.join(f'{name}: {count}' for name, count in totals.items())
+        self.stdout.write(self.style.SUCCESS(f'Xong. {summary}'))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from lms_courses.grading import BATCH_SIZE, grade_quiz
+from lms_courses.models import Quiz
+
+
+class Command(BaseCommand):
+    help = 'Chấm điểm tự động các lần làm bài đã nộp của quiz'
+
+    def add_arguments(self, parser):
+        parser.add_argument('quiz_ids', nargs='*', type=int)
+        parser.add_argument('--only-ungraded', action='store_true')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        quiz_ids = options['quiz_ids'] or Quiz.objects.values_list('id', flat=True)
+        total = 0
+        for quiz_id in quiz_ids:
+            total += grade_quiz(
+                quiz_id,
+                only_ungraded=options['only_ungraded'],
+                batch_size=options['batch_size'],
+            )
+        self.stdout.write(self.style.SUCCESS(f'Đã chấm {total} lần làm bài'))
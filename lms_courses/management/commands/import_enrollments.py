@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from lms_courses.importers import CHUNK_SIZE, import_enrollments
+from lms_courses.models import Enrollment
+
+
+class Command(BaseCommand):
+    help = 'Nhập đăng ký khóa học hàng loạt từ file CSV (username,course_id)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument(
+            '--status',
+            default='active',
+            choices=[value for value, _ in Enrollment.STATUS_CHOICES],
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['csv_file'], encoding='utf-8-sig', newline='') as lines:
+                result = import_enrollments(
+                    lines, status=options['status'], chunk_size=options['chunk_size']
+                )
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        for error in result.errors:
+            self.stderr.write(error)
+        self.stdout.write(self.style.SUCCESS(
+            f'Thêm {result.attempted} đăng ký mới, bỏ qua {result.skipped} (đã có), lỗi {result.invalid}'
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from lms_courses.models import Course
+from lms_courses.stats import refresh_course_stats
+
+
+class Command(BaseCommand):
+    help = 'Tính lại thống kê lưu sẵn (số bài học, học viên, ...) của khóa học'
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_ids', nargs='*', type=int)
+
+    def handle(self, *args, **options):
+        course_ids = options['course_ids'] or Course.objects.values_list('id', flat=True).iterator()
+        total = 0
+        for course_id in course_ids:
+            refresh_course_stats(course_id)
+            total += 1
+        self.stdout.write(self.style.SUCCESS(f'Đã cập nhật thống kê cho {total} khóa học'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from lms_courses.analytics import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Dựng lại bảng thống kê theo ngày (CourseDailyStats) từ dữ liệu gốc'
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_ids', nargs='*', type=int)
+
+    def handle(self, *args, **options):
+        rebuild(options['course_ids'] or None)
+        self.stdout.write(self.style.SUCCESS('Đã dựng lại thống kê giảng viên'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from lms_courses.models import Course
+from lms_courses.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Dựng lại chỉ mục tìm kiếm khóa học'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        total = rebuild_index(Course.objects.order_by('id'), batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Đã lập chỉ mục {total} khóa học'))
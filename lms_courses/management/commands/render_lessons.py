@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from lms_courses.models import Lesson
+from lms_courses.rendering import prerender_lesson
+
+
+class Command(BaseCommand):
+    help = 'Dựng lại HTML của bài học (sau khi đổi renderer hoặc nhập dữ liệu)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Dựng lại cả bài học chưa thay đổi')
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        lesson_ids = list(Lesson.objects.order_by('id').values_list('id', flat=True))
+        total = 0
+        for start in range(0, len(lesson_ids), batch_size):
+            lessons = Lesson.objects.filter(id__in=lesson_ids[start:start + batch_size]).only(
+                'id', 'content', 'content_html', 'content_hash',
+            )
+            changed = []
+            for lesson in lessons:
+                if options['force']:
+                    lesson.content_hash = ''
+                if prerender_lesson(lesson):
+                    changed.append(lesson)
+            Lesson.objects.bulk_update(changed, ['content_html', 'content_hash'])
+            total += len(changed)
+        self.stdout.write(self.style.SUCCESS(f'Đã dựng lại {total} bài học'))
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:01
+
+import re
+import unicodedata
+from collections import Counter
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Bản sao cố định của lms_courses.search lúc tạo migration: sửa search.py sau
+# này không được làm đổi kết quả của migration cũ.
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def _tokenize(text):
+    text = (text or '').lower().replace('đ', 'd')
+    decomposed = unicodedata.normalize('NFD', text)
+    text = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return [token[:64] for token in _TOKEN_RE.findall(text)]
+
+
+def build_terms(course):
+    weights = Counter()
+    for token in _tokenize(course.title):
+        weights[token] += 5
+    for token in _tokenize(course.description):
+        weights[token] += 1
+    return weights
+
+
+def build_search_index(apps, schema_editor):
+    Course = apps.get_model('lms_courses', 'Course')
+    CourseSearchTerm = apps.get_model('lms_courses', 'CourseSearchTerm')
+    rows = [
+        CourseSearchTerm(course_id=course.pk, term=term, weight=weight)
+        for course in Course.objects.only('id', 'title', 'description').iterator()
+        for term, weight in build_terms(course).items()
+    ]
+    CourseSearchTerm.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_courses', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveIntegerField(default=1)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='lms_courses.course')),
+            ],
+            options={
+                'unique_together': {('term', 'course')},
+            },
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:02
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def fill_course_stats(apps, schema_editor):
+    Course = apps.get_model('lms_courses', 'Course')
+    courses = Course.objects.annotate(
+        n_lessons=Count('lessons', distinct=True),
+        n_assignments=Count('assignments', distinct=True),
+        n_quizzes=Count('quizzes', distinct=True),
+    )
+    for course in courses.iterator():
+        lessons = course.lessons.aggregate(minutes=Sum('duration_minutes'))
+        enrollments = course.enrollments.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(status='active')),
+            completed=Count('id', filter=Q(status='completed')),
+            dropped=Count('id', filter=Q(status='dropped')),
+        )
+        Course.objects.filter(pk=course.pk).update(
+            lesson_count=course.n_lessons,
+            total_lesson_minutes=lessons['minutes'] or 0,
+            assignment_count=course.n_assignments,
+            quiz_count=course.n_quizzes,
+            enrollment_count=enrollments['total'],
+            active_enrollment_count=enrollments['active'],
+            completed_enrollment_count=enrollments['completed'],
+            dropped_enrollment_count=enrollments['dropped'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_courses', '0002_course_search_term'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='active_enrollment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='assignment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='completed_enrollment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='dropped_enrollment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='enrollment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='lesson_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='quiz_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='total_lesson_minutes',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_course_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_courses', '0003_course_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
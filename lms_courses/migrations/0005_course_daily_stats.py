@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:08
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('lms_courses', '0004_quiz_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('new_enrollments', models.PositiveIntegerField(default=0)),
+                ('completions', models.PositiveIntegerField(default=0)),
+                ('drops', models.PositiveIntegerField(default=0)),
+                ('submissions', models.PositiveIntegerField(default=0)),
+                ('graded_attempts', models.PositiveIntegerField(default=0)),
+                ('quiz_score_total', models.PositiveIntegerField(default=0)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='lms_courses.course')),
+                ('instructor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='course_daily_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['instructor', 'date'], name='lms_courses_instruc_ed2eb1_idx')],
+                'unique_together': {('course', 'date')},
+            },
+        ),
+    ]
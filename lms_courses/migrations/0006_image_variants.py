@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_courses', '0005_course_daily_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='thumbnail_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
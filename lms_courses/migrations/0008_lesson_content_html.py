@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_courses', '0007_chunked_upload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lesson',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='lesson',
+            name='content',
+            field=models.TextField(help_text='Markdown'),
+        ),
+    ]
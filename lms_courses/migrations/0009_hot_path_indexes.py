@@ -0,0 +1,49 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_courses', '0008_lesson_content_html'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='lms_courses_status_448ef1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['category', 'status', 'created_at'], name='lms_courses_categor_d19e99_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['student', 'status'], name='lms_courses_student_0ba758_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['course', 'status'], name='lms_courses_course__6e146d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['enrolled_at'], name='lms_courses_enrolle_e8d518_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['course', 'order', 'id'], name='lms_courses_course__bee395_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(fields=['quiz', 'completed_at'], name='lms_courses_quiz_id_d9485d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(fields=['started_at'], name='lms_courses_started_59fb27_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['submitted_at'], name='lms_courses_submitt_419cee_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms_courses', '0009_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(fields=['quiz', 'student', 'started_at'], name='lms_courses_quiz_id_826684_idx'),
+        ),
+    ]
@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
@@ -23,6 +25,7 @@ class Course(models.Model):
     instructor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='courses_taught')
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True)
     thumbnail = models.ImageField(upload_to='course_thumbnails/', blank=True, null=True)
+    thumbnail_variants = models.JSONField(default=dict, blank=True, editable=False)
     price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     duration_hours = models.PositiveIntegerField(default=0)
     difficulty_level = models.CharField(max_length=20, choices=[
@@ -38,9 +41,26 @@ class Course(models.Model):
     ]
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
     
+    # Thống kê lưu sẵn, được cập nhật bởi lms_courses.stats
+    lesson_count = models.PositiveIntegerField(default=0, editable=False)
+    total_lesson_minutes = models.PositiveIntegerField(default=0, editable=False)
+    assignment_count = models.PositiveIntegerField(default=0, editable=False)
+    quiz_count = models.PositiveIntegerField(default=0, editable=False)
+    enrollment_count = models.PositiveIntegerField(default=0, editable=False)
+    active_enrollment_count = models.PositiveIntegerField(default=0, editable=False)
+    completed_enrollment_count = models.PositiveIntegerField(default=0, editable=False)
+    dropped_enrollment_count = models.PositiveIntegerField(default=0, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            # course_list/home: lọc theo status, phân trang theo (created_at, id)
+            models.Index(fields=['status', 'created_at', 'id']),
+            models.Index(fields=['category', 'status', 'created_at']),
+        ]
+    
     def __str__(self):
         return self.title
 
@@ -61,6 +81,11 @@ class Enrollment(models.Model):
     
     class Meta:
         unique_together = ['student', 'course']
+        indexes = [
+            models.Index(fields=['student', 'status']),
+            models.Index(fields=['course', 'status']),
+            models.Index(fields=['enrolled_at']),
+        ]
     
     def __str__(self):
         return f"{self.student.username} - {self.course.title}"
@@ -70,7 +95,9 @@ class Lesson(models.Model):
     """Bài học"""
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='lessons')
     title = models.CharField(max_length=200)
-    content = models.TextField()
+    content = models.TextField(help_text='Markdown')
+    content_html = models.TextField(blank=True, editable=False)
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
     video_url = models.URLField(blank=True)
     duration_minutes = models.PositiveIntegerField(default=0)
     order = models.PositiveIntegerField(default=0)
@@ -80,6 +107,9 @@ class Lesson(models.Model):
     
     class Meta:
         ordering = ['order']
+        indexes = [
+            models.Index(fields=['course', 'order', 'id']),
+        ]
     
     def __str__(self):
         return f"{self.course.title} - {self.title}"
@@ -112,6 +142,9 @@ class Submission(models.Model):
     
     class Meta:
         unique_together = ['assignment', 'student']
+        indexes = [
+            models.Index(fields=['submitted_at']),
+        ]
     
     def __str__(self):
         return f"{self.student.username} - {self.assignment.title}"
@@ -125,6 +158,7 @@ class Quiz(models.Model):
     time_limit_minutes = models.PositiveIntegerField(default=30)
     max_attempts = models.PositiveIntegerField(default=1)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.course.title} - {self.title}"
@@ -171,6 +205,14 @@ class QuizAttempt(models.Model):
     completed_at = models.DateTimeField(null=True, blank=True)
     score = models.PositiveIntegerField(null=True, blank=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['quiz', 'completed_at']),
+            models.Index(fields=['started_at']),
+            # Xuất bảng điểm: duyệt attempt của một quiz theo (student, started_at)
+            models.Index(fields=['quiz', 'student', 'started_at']),
+        ]
+    
     def __str__(self):
         return f"{self.student.username} - {self.quiz.title}"
 
@@ -187,4 +229,67 @@ class QuizResponse(models.Model):
         unique_together = ['attempt', 'question']
     
     def __str__(self):
-        return f"{self.attempt.student.username} - {self.question.text[:30]}..."
\ No newline at end of file
+        return f"{self.attempt.student.username} - {self.question.text[:30]}..."
+
+class CourseSearchTerm(models.Model):
+    """Chỉ mục tìm kiếm (đã bỏ dấu) của khóa học"""
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='search_terms')
+    term = models.CharField(max_length=64)
+    weight = models.PositiveIntegerField(default=1)
+    
+    class Meta:
+        unique_together = ['term', 'course']
+    
+    def __str__(self):
+        return f"{self.term} - {self.course_id}"
+
+
+
+class CourseDailyStats(models.Model):
+    """Thống kê theo ngày của khóa học cho dashboard giảng viên"""
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='daily_stats')
+    instructor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='course_daily_stats')
+    date = models.DateField()
+    new_enrollments = models.PositiveIntegerField(default=0)
+    completions = models.PositiveIntegerField(default=0)
+    drops = models.PositiveIntegerField(default=0)
+    submissions = models.PositiveIntegerField(default=0)
+    graded_attempts = models.PositiveIntegerField(default=0)
+    quiz_score_total = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['course', 'date']
+        indexes = [
+            models.Index(fields=['instructor', 'date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.course_id} - {self.date}"
+    
+    @property
+    def average_quiz_score(self):
+        if not self.graded_attempts:
+            return None
+        return self.quiz_score_total / self.graded_attempts
+
+
+
+class ChunkedUpload(models.Model):
+    """File bài nộp đang được tải lên theo từng phần"""
+    STATUS_CHOICES = [
+        ('uploading', 'Đang tải lên'),
+        ('complete', 'Hoàn tất'),
+    ]
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='chunked_uploads')
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, related_name='chunked_uploads')
+    filename = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField()
+    checksum = models.CharField(max_length=64)
+    offset = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.filename} ({self.offset}/{self.total_size})"
@@ -0,0 +1,194 @@
+"""
+Phân trang theo con trỏ (keyset pagination).
+
+Thay vì OFFSET + COUNT(*), mỗi trang được lấy bằng điều kiện
+"nhỏ hơn khóa của dòng cuối trang trước" trên một thứ tự cố định, nên chi phí
+của trang thứ 1000 cũng giống trang đầu tiên. Con trỏ được mã hóa thành
+chuỗi opaque để đưa lên URL.
+"""
+import base64
+import datetime
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils import timezone
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(direction, values):
+    payload = json.dumps([direction, [_dump_value(v) for v in values]], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        direction, values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if direction not in (NEXT, PREVIOUS) or not isinstance(values, list):
+            raise InvalidCursor(token)
+        return direction, [_load_value(v) for v in values]
+    except (ValueError, TypeError):
+        raise InvalidCursor(token)
+
+
+def _dump_value(value):
+    if isinstance(value, datetime.datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+
+def _load_value(value):
+    if isinstance(value, dict):
+        if set(value) != {'dt'} or not isinstance(value['dt'], str):
+            raise InvalidCursor(value)
+        return datetime.datetime.fromisoformat(value['dt'])
+    return value
+
+
+def iter_keyset(queryset, ordering, chunk_size):
+    """
+    Duyệt hết queryset theo thứ tự tăng dần của `ordering` (trường cuối phải
+    duy nhất), mỗi chunk là một truy vấn "lớn hơn khóa của dòng cuối chunk
+    trước" LIMIT chunk_size. Khác .iterator(), bộ nhớ chỉ bằng một chunk kể
+    cả khi driver đệm toàn bộ kết quả phía client (PyMySQL).
+    """
+    paginator = CursorPaginator(queryset, chunk_size, ordering)
+    queryset = queryset.order_by(*ordering)
+    values = None
+    while True:
+        chunk = queryset if values is None else queryset.filter(paginator._seek(values, PREVIOUS))
+        rows = list(chunk[:chunk_size])
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        values = paginator._key(rows[-1])
+
+
+class CursorPage:
+    """Một trang kết quả, dùng được trong template như Page của Paginator"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Phân trang queryset theo danh sách trường `ordering` (giảm dần).
+    Trường cuối cùng phải là khóa duy nhất (thường là 'id').
+    """
+
+    def __init__(self, queryset, per_page, ordering=('created_at', 'id')):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = list(ordering)
+
+    def get_page(self, token=None):
+        queryset, direction, values = self._prepare(token)
+        return self._build_page(list(queryset[:self.per_page + 1]), direction, values)
+
+    async def aget_page(self, token=None):
+        """Bản async của get_page() cho view async"""
+        queryset, direction, values = self._prepare(token)
+        rows = [obj async for obj in queryset[:self.per_page + 1]]
+        return self._build_page(rows, direction, values)
+
+    def _prepare(self, token):
+        direction, values = NEXT, None
+        if token:
+            try:
+                direction, values = self._load_cursor(token)
+            except InvalidCursor:
+                # Con trỏ bị sửa hoặc đã cũ: quay về trang đầu thay vì lỗi 500
+                direction, values = NEXT, None
+
+        queryset = self.queryset
+        if direction == NEXT:
+            queryset = queryset.order_by(*['-' + f for f in self.ordering])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, direction))
+        return queryset, direction, values
+
+    def _load_cursor(self, token):
+        """Giải mã con trỏ và chuyển từng giá trị về kiểu của trường tương ứng"""
+        direction, values = decode_cursor(token)
+        if len(values) != len(self.ordering):
+            raise InvalidCursor(token)
+        try:
+            values = [
+                self._field(name).to_python(value)
+                for name, value in zip(self.ordering, values)
+            ]
+        except (ValidationError, ValueError, TypeError):
+            raise InvalidCursor(token)
+        for value in values:
+            if value is None:
+                raise InvalidCursor(token)
+            if isinstance(value, datetime.datetime) and settings.USE_TZ and timezone.is_naive(value):
+                raise InvalidCursor(token)
+        return direction, values
+
+    def _field(self, name):
+        """Field của trường hoặc annotation (ví dụ search_score) trong ordering"""
+        annotation = self.queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        return self.queryset.model._meta.get_field(name)
+
+    def _build_page(self, rows, direction, values):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == PREVIOUS:
+            rows.reverse()
+
+        if direction == NEXT:
+            has_next, has_previous = has_more, values is not None
+        else:
+            has_next, has_previous = values is not None, has_more
+
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = encode_cursor(NEXT, self._key(rows[-1]))
+        if rows and has_previous:
+            previous_cursor = encode_cursor(PREVIOUS, self._key(rows[0]))
+        return CursorPage(rows, next_cursor, previous_cursor)
+
+    def _key(self, obj):
+        return [getattr(obj, field) for field in self.ordering]
+
+    def _seek(self, values, direction):
+        """(a, b, c) < (x, y, z) viết lại bằng OR/AND để dùng được index"""
+        lookup = 'lt' if direction == NEXT else 'gt'
+        condition = Q()
+        for i, field in enumerate(self.ordering):
+            clause = Q(**{f'{field}__{lookup}': values[i]})
+            for prev_field, prev_value in zip(self.ordering[:i], values[:i]):
+                clause &= Q(**{prev_field: prev_value})
+            condition |= clause
+        return condition
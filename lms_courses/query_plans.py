@@ -0,0 +1,106 @@
+"""
+Kiểm tra kế hoạch thực thi (EXPLAIN) của các truy vấn nóng.
+
+Không chép tay truy vấn: capture_plans() ghi lại mọi SELECT mà code thật chạy
+trong khối `with` (view qua test client, trang admin, job chấm điểm...) rồi
+EXPLAIN từng câu, nên truy vấn được kiểm tra luôn giống hệt truy vấn của
+views/admin. QueryPlanTests (lms_courses/tests.py) dùng nó để báo lỗi khi một
+đường nóng quét toàn bộ bảng, ví dụ index bị thiếu hoặc bị bỏ qua sau khi
+thay đổi model/view.
+
+Trên MySQL/PostgreSQL kế hoạch phụ thuộc số dòng (bảng vài dòng thường được
+quét toàn bộ dù có index), nên kết quả chỉ có ý nghĩa trên dữ liệu có kích
+thước giống thật; planner của SQLite chọn index theo luật, không theo kích
+thước bảng.
+"""
+import json
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+_SQLITE_SCAN_RE = re.compile(r'\bSCAN (\S+)(?! USING)(?:\s|$)')
+_POSTGRES_SCAN_RE = re.compile(r'Seq Scan on (\S+)')
+_WHERE_RE = re.compile(r'\bWHERE\b')
+_ORDER_BY_RE = re.compile(r'\bORDER BY\b')
+_LIMIT_RE = re.compile(r'\bLIMIT\b')
+
+
+@dataclass
+class QueryPlan:
+    sql: str
+    plan: str
+    full_scans: list
+
+    @property
+    def reads_whole_table(self):
+        """
+        Câu không lọc và không lấy N dòng đầu theo thứ tự (danh sách danh mục,
+        lựa chọn của bộ lọc admin): quét bảng là chủ đích, index không giúp được
+        """
+        if _WHERE_RE.search(self.sql):
+            return False
+        return not (_ORDER_BY_RE.search(self.sql) and _LIMIT_RE.search(self.sql))
+
+
+def explain(sql, using=DEFAULT_DB_ALIAS):
+    """Chạy EXPLAIN cho câu SQL, trả về kế hoạch theo định dạng của database"""
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute('EXPLAIN FORMAT=JSON ' + sql)
+            return cursor.fetchone()[0]
+        if connection.vendor == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            return '\n'.join(row[-1] for row in cursor.fetchall())
+        cursor.execute('EXPLAIN ' + sql)
+        return '\n'.join(row[0] for row in cursor.fetchall())
+
+
+def full_scans(plan, vendor):
+    """Trả về danh sách bảng bị quét toàn bộ trong kế hoạch `plan`"""
+    if vendor == 'mysql':
+        tables = []
+        _walk_mysql_plan(json.loads(plan), tables)
+        return tables
+    if vendor == 'postgresql':
+        return _POSTGRES_SCAN_RE.findall(plan)
+    if vendor == 'sqlite':
+        return [
+            table for table in _SQLITE_SCAN_RE.findall(plan)
+            if table != 'CONSTANT'
+        ]
+    return []
+
+
+def _walk_mysql_plan(node, tables):
+    if isinstance(node, dict):
+        if node.get('access_type') == 'ALL':
+            tables.append(node.get('table_name', '?'))
+        for value in node.values():
+            _walk_mysql_plan(value, tables)
+    elif isinstance(node, list):
+        for item in node:
+            _walk_mysql_plan(item, tables)
+
+
+@contextmanager
+def capture_plans(using=DEFAULT_DB_ALIAS):
+    """
+    Ghi lại các SELECT chạy trong khối `with`; khi ra khỏi khối, list được
+    yield chứa QueryPlan của từng câu (mỗi câu SQL một lần).
+    """
+    connection = connections[using]
+    plans = []
+    with CaptureQueriesContext(connection) as queries:
+        yield plans
+    seen = set()
+    for query in queries.captured_queries:
+        sql = query['sql']
+        if not sql.lstrip().upper().startswith('SELECT') or sql in seen:
+            continue
+        seen.add(sql)
+        plan = explain(sql, using)
+        plans.append(QueryPlan(sql, plan, full_scans(plan, connection.vendor)))
@@ -0,0 +1,72 @@
+"""
+Dựng sẵn nội dung bài học (Markdown -> HTML đã lọc).
+
+Lesson.content được viết bằng Markdown (có tô sáng code). HTML được dựng một
+lần khi lưu bài học và lưu vào Lesson.content_html cùng với content_hash
+(băm của nội dung + RENDERER_VERSION), nên lesson_detail chỉ việc xuất ra.
+Khi đổi cách dựng, tăng RENDERER_VERSION rồi chạy `manage.py render_lessons`.
+"""
+import hashlib
+from functools import lru_cache
+
+import markdown
+import nh3
+from pygments.formatters import HtmlFormatter
+
+RENDERER_VERSION = '1'
+
+MARKDOWN_EXTENSIONS = ['fenced_code', 'codehilite', 'tables', 'nl2br', 'sane_lists']
+MARKDOWN_CONFIG = {
+    'codehilite': {'css_class': 'codehilite', 'guess_lang': False},
+}
+
+ALLOWED_TAGS = {
+    'p', 'br', 'hr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote',
+    'ul', 'ol', 'li', 'strong', 'em', 'code', 'pre', 'a', 'img', 'span', 'div',
+    'table', 'thead', 'tbody', 'tr', 'th', 'td',
+}
+ALLOWED_ATTRIBUTES = {
+    'a': {'href', 'title'},
+    'img': {'src', 'alt', 'title'},
+    'span': {'class'},
+    'div': {'class'},
+    'code': {'class'},
+    'th': {'align'},
+    'td': {'align'},
+}
+
+
+def content_hash(content):
+    return hashlib.sha256(f'{RENDERER_VERSION}:{content}'.encode()).hexdigest()
+
+
+def render_content(content):
+    """Chuyển Markdown thành HTML an toàn để hiển thị"""
+    html = markdown.markdown(
+        content or '',
+        extensions=MARKDOWN_EXTENSIONS,
+        extension_configs=MARKDOWN_CONFIG,
+        output_format='html',
+    )
+    return nh3.clean(
+        html,
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        url_schemes={'http', 'https', 'mailto'},
+        link_rel='noopener noreferrer nofollow',
+    )
+
+
+def prerender_lesson(lesson):
+    """Dựng lại content_html nếu nội dung hoặc renderer đã đổi; trả về True nếu có thay đổi"""
+    digest = content_hash(lesson.content)
+    if lesson.content_hash == digest and lesson.content_html:
+        return False
+    lesson.content_html = render_content(lesson.content)
+    lesson.content_hash = digest
+    return True
+
+
+@lru_cache(maxsize=1)
+def highlight_css():
+    return HtmlFormatter(style='default').get_style_defs('.codehilite')
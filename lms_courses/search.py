@@ -0,0 +1,120 @@
+"""
+Tìm kiếm khóa học không phân biệt dấu.
+
+Tiêu đề và mô tả được bỏ dấu, tách từ rồi lưu vào bảng CourseSearchTerm
+(chỉ mục ngược term -> course). Khi tìm kiếm chỉ cần tra các term trong
+chỉ mục thay vì quét LIKE toàn bộ bảng Course.
+
+Term cuối của từ khóa được so khớp theo tiền tố ("pyth" tìm được "Python")
+vì người dùng thường chưa gõ hết từ; tra tiền tố vẫn dùng index của term.
+Các term còn lại phải khớp nguyên từ.
+"""
+import re
+import unicodedata
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, IntegerField, Q, Sum, Value
+
+from .models import CourseSearchTerm
+
+TITLE_WEIGHT = 5
+DESCRIPTION_WEIGHT = 1
+MAX_TERM_LENGTH = 64
+# Term cuối ngắn hơn chừng này chỉ khớp nguyên từ (tiền tố 1 ký tự khớp quá nhiều term)
+MIN_PREFIX_LENGTH = 2
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def normalize_text(text):
+    """Chuyển về chữ thường và bỏ dấu tiếng Việt ("Lập trình" -> "lap trinh")"""
+    text = (text or '').lower().replace('đ', 'd')
+    decomposed = unicodedata.normalize('NFD', text)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text):
+    """Tách văn bản đã chuẩn hóa thành danh sách term"""
+    return [token[:MAX_TERM_LENGTH] for token in _TOKEN_RE.findall(normalize_text(text))]
+
+
+def build_terms(course):
+    """Tính trọng số của từng term cho một khóa học"""
+    weights = Counter()
+    for token in tokenize(course.title):
+        weights[token] += TITLE_WEIGHT
+    for token in tokenize(course.description):
+        weights[token] += DESCRIPTION_WEIGHT
+    return weights
+
+
+def index_course(course):
+    """Cập nhật chỉ mục của một khóa học"""
+    weights = build_terms(course)
+    with transaction.atomic():
+        CourseSearchTerm.objects.filter(course_id=course.pk).delete()
+        CourseSearchTerm.objects.bulk_create([
+            CourseSearchTerm(course_id=course.pk, term=term, weight=weight)
+            for term, weight in weights.items()
+        ])
+
+
+def rebuild_index(courses, batch_size=500):
+    """Dựng lại chỉ mục cho nhiều khóa học, trả về số khóa học đã xử lý"""
+    total = 0
+    batch = []
+    for course in courses.only('id', 'title', 'description').iterator(chunk_size=batch_size):
+        batch.append(course)
+        if len(batch) >= batch_size:
+            _index_batch(batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        _index_batch(batch)
+        total += len(batch)
+    return total
+
+
+def _index_batch(courses):
+    rows = [
+        CourseSearchTerm(course_id=course.pk, term=term, weight=weight)
+        for course in courses
+        for term, weight in build_terms(course).items()
+    ]
+    with transaction.atomic():
+        CourseSearchTerm.objects.filter(course_id__in=[c.pk for c in courses]).delete()
+        CourseSearchTerm.objects.bulk_create(rows, batch_size=1000)
+
+
+def search_courses(courses, query):
+    """
+    Lọc queryset `courses` theo từ khóa, sắp xếp theo độ liên quan.
+    Khóa học phải chứa tất cả các term của từ khóa (term cuối theo tiền tố).
+    Kết quả luôn có annotation search_score để view phân trang theo nó, kể cả
+    khi từ khóa không có term nào (chỉ dấu câu, khoảng trắng): khi đó rỗng.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms:
+        return courses.none().annotate(search_score=Value(0, output_field=IntegerField()))
+    prefix = terms.pop() if len(terms[-1]) >= MIN_PREFIX_LENGTH else None
+
+    conditions = {}
+    if terms:
+        conditions['matched_terms'] = (Q(search_terms__term__in=terms), len(terms))
+    if prefix:
+        # Term đã chuẩn hóa về chữ thường: istartswith (LIKE 'x%') dùng được
+        # index của term trên MySQL, còn startswith thành LIKE BINARY thì không
+        conditions['prefix_matches'] = (Q(search_terms__term__istartswith=prefix), 1)
+
+    matching = Q()
+    for condition, _ in conditions.values():
+        matching |= condition
+    courses = courses.filter(matching).annotate(
+        search_score=Sum('search_terms__weight'),
+        **{name: Count('search_terms__term', filter=condition, distinct=True)
+           for name, (condition, _) in conditions.items()},
+    )
+    for name, (_, required) in conditions.items():
+        courses = courses.filter(**{f'{name}__gte': required})
+    return courses.order_by('-search_score', '-created_at', '-id')
@@ -0,0 +1,119 @@
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from . import analytics, stats
+from .answer_keys import touch_quiz
+from .syllabus import invalidate_outline
+from .models import Answer, Assignment, Course, Enrollment, Lesson, Question, Quiz, Submission
+from .enrollments import invalidate_enrollments
+from .rendering import prerender_lesson
+from .search import index_course
+
+
+@receiver(post_save, sender=Course)
+def update_course_search_index(sender, instance, raw=False, **kwargs):
+    """Cập nhật chỉ mục tìm kiếm khi khóa học thay đổi"""
+    if raw:
+        return
+    index_course(instance)
+
+
+@receiver(pre_save, sender=Lesson)
+def render_lesson_content(sender, instance, raw=False, **kwargs):
+    """Dựng sẵn HTML của bài học trước khi lưu"""
+    if raw:
+        return
+    prerender_lesson(instance)
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def update_lesson_stats(sender, instance, signal, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    stats.apply_change(instance, created=created, deleted=signal is post_delete)
+    invalidate_outline(instance.course_id)
+
+
+@receiver(post_save, sender=Assignment)
+@receiver(post_delete, sender=Assignment)
+def update_assignment_stats(sender, instance, signal, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    stats.apply_change(instance, created=created, deleted=signal is post_delete)
+    invalidate_outline(instance.course_id)
+
+
+@receiver(post_save, sender=Quiz)
+@receiver(post_delete, sender=Quiz)
+def update_quiz_stats(sender, instance, signal, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    stats.apply_change(instance, created=created, deleted=signal is post_delete)
+    invalidate_outline(instance.course_id)
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def update_enrollment_stats(sender, instance, signal, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    stats.apply_change(instance, created=created, deleted=signal is post_delete)
+    invalidate_enrollments(instance.student_id)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def update_quiz_version_for_question(sender, instance, raw=False, **kwargs):
+    """Đổi version đáp án của quiz khi câu hỏi thay đổi"""
+    if raw:
+        return
+    touch_quiz(instance.quiz_id)
+
+
+@receiver(post_save, sender=Answer)
+@receiver(post_delete, sender=Answer)
+def update_quiz_version_for_answer(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    quiz_id = Question.objects.filter(pk=instance.question_id).values_list('quiz_id', flat=True).first()
+    if quiz_id is not None:
+        touch_quiz(quiz_id)
+
+
+@receiver(post_init, sender=Lesson)
+@receiver(post_init, sender=Assignment)
+@receiver(post_init, sender=Quiz)
+@receiver(post_init, sender=Enrollment)
+def remember_counted_values(sender, instance, **kwargs):
+    stats.remember_values(instance)
+
+
+@receiver(post_init, sender=Enrollment)
+def remember_enrollment_status(sender, instance, **kwargs):
+    # Không truy cập instance.status để tránh tải trường bị defer
+    instance._loaded_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=Enrollment)
+def record_enrollment_analytics(sender, instance, created, raw=False, **kwargs):
+    """Ghi nhận đăng ký mới / hoàn thành / bỏ học vào thống kê theo ngày"""
+    if raw:
+        return
+    if created:
+        analytics.record_event(instance.course_id, instance.enrolled_at, new_enrollments=1)
+    elif instance.status != instance._loaded_status:
+        if instance.status == 'completed':
+            analytics.record_event(instance.course_id, instance.completed_at, completions=1)
+        elif instance.status == 'dropped':
+            analytics.record_event(instance.course_id, drops=1)
+    instance._loaded_status = instance.status
+
+
+@receiver(post_save, sender=Submission)
+def record_submission_analytics(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    course_id = Assignment.objects.filter(pk=instance.assignment_id).values_list('course_id', flat=True).first()
+    if course_id is not None:
+        analytics.record_event(course_id, instance.submitted_at, submissions=1)
@@ -0,0 +1,153 @@
+"""
+Thống kê lưu sẵn trên Course (số bài học, số học viên, ...).
+
+Khi Lesson/Assignment/Quiz/Enrollment được tạo, sửa hoặc xóa, signals gọi
+apply_change(): bộ đếm được cộng/trừ đúng phần thay đổi bằng
+UPDATE ... SET x = x + n. Không đếm lại nên hai lần đăng ký đồng thời không
+ghi đè kết quả của nhau, và không có COUNT trên toàn bộ đăng ký của khóa học
+trong lúc giữ khóa dòng Course. Giá trị cũ (khóa học, thời lượng, trạng
+thái) được nhớ lúc tải instance (post_init) để tính phần thay đổi.
+
+Các hàm refresh_* tính lại bộ đếm của một khóa học bằng một truy vấn tổng
+hợp; dùng khi sửa lệch (lệnh `rebuild_course_stats`), sau khi nhập hàng loạt
+và khi không biết giá trị cũ. Mọi ghi đều bằng UPDATE, nên không kích hoạt
+post_save của Course và không đổi updated_at.
+"""
+from collections import Counter, defaultdict
+
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+
+from .models import Assignment, Course, Enrollment, Lesson, Quiz
+
+
+def refresh_lesson_stats(course_id):
+    stats = Lesson.objects.filter(course_id=course_id).aggregate(
+        count=Count('id'),
+        minutes=Sum('duration_minutes'),
+    )
+    Course.objects.filter(pk=course_id).update(
+        lesson_count=stats['count'],
+        total_lesson_minutes=stats['minutes'] or 0,
+    )
+
+
+def refresh_assignment_stats(course_id):
+    Course.objects.filter(pk=course_id).update(
+        assignment_count=Assignment.objects.filter(course_id=course_id).count(),
+    )
+
+
+def refresh_quiz_stats(course_id):
+    Course.objects.filter(pk=course_id).update(
+        quiz_count=Quiz.objects.filter(course_id=course_id).count(),
+    )
+
+
+def refresh_enrollment_stats(course_id):
+    stats = Enrollment.objects.filter(course_id=course_id).aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(status='active')),
+        completed=Count('id', filter=Q(status='completed')),
+        dropped=Count('id', filter=Q(status='dropped')),
+    )
+    Course.objects.filter(pk=course_id).update(
+        enrollment_count=stats['total'],
+        active_enrollment_count=stats['active'],
+        completed_enrollment_count=stats['completed'],
+        dropped_enrollment_count=stats['dropped'],
+    )
+
+
+def refresh_course_stats(course_id):
+    refresh_lesson_stats(course_id)
+    refresh_assignment_stats(course_id)
+    refresh_quiz_stats(course_id)
+    refresh_enrollment_stats(course_id)
+
+
+# Trường của từng model quyết định nó được đếm vào khóa học nào và thế nào
+TRACKED_FIELDS = {
+    Lesson: ('course_id', 'duration_minutes'),
+    Assignment: ('course_id',),
+    Quiz: ('course_id',),
+    Enrollment: ('course_id', 'status'),
+}
+
+ENROLLMENT_STATUS_COUNTERS = {
+    'active': 'active_enrollment_count',
+    'completed': 'completed_enrollment_count',
+    'dropped': 'dropped_enrollment_count',
+}
+
+_REFRESH = {
+    Lesson: refresh_lesson_stats,
+    Assignment: refresh_assignment_stats,
+    Quiz: refresh_quiz_stats,
+    Enrollment: refresh_enrollment_stats,
+}
+
+
+def remember_values(instance):
+    """Nhớ giá trị đã lưu của các trường được đếm (gọi từ post_init)"""
+    # Đọc __dict__ để không tải trường bị defer; trường chưa tải là None
+    instance._counted_values = {
+        name: instance.__dict__.get(name) for name in TRACKED_FIELDS[type(instance)]
+    }
+
+
+def apply_change(instance, created=False, deleted=False):
+    """Cộng/trừ bộ đếm của khóa học theo một lần lưu hoặc xóa `instance`"""
+    model = type(instance)
+    current = {name: getattr(instance, name) for name in TRACKED_FIELDS[model]}
+    previous = getattr(instance, '_counted_values', None)
+    deltas = defaultdict(Counter)
+
+    if created:
+        _add(deltas, model, current, 1)
+    elif previous is None or None in previous.values():
+        # Không biết giá trị cũ (trường bị defer): đếm lại các khóa học liên quan
+        course_ids = {current['course_id'], (previous or {}).get('course_id')} - {None}
+        for course_id in course_ids:
+            _REFRESH[model](course_id)
+    else:
+        _add(deltas, model, previous, -1)
+        if not deleted:
+            _add(deltas, model, current, 1)
+
+    for course_id, counts in deltas.items():
+        adjust_counts(course_id, counts)
+    instance._counted_values = current
+
+
+def _add(deltas, model, values, sign):
+    counts = deltas[values['course_id']]
+    if model is Lesson:
+        counts['lesson_count'] += sign
+        counts['total_lesson_minutes'] += sign * (values['duration_minutes'] or 0)
+    elif model is Assignment:
+        counts['assignment_count'] += sign
+    elif model is Quiz:
+        counts['quiz_count'] += sign
+    else:
+        counts['enrollment_count'] += sign
+        status_counter = ENROLLMENT_STATUS_COUNTERS.get(values['status'])
+        if status_counter is not None:
+            counts[status_counter] += sign
+
+
+def adjust_counts(course_id, counts):
+    """
+    Một UPDATE cộng `counts` ({trường: delta}) vào bộ đếm của khóa học, bỏ qua
+    delta 0. Bộ đếm không xuống dưới 0 (cột unsigned trên MySQL).
+    """
+    changes = {}
+    for name, delta in counts.items():
+        if delta > 0:
+            changes[name] = F(name) + delta
+        elif delta < 0:
+            changes[name] = Case(
+                When(**{f'{name}__gte': -delta}, then=F(name) - (-delta)),
+                default=Value(0),
+            )
+    if changes:
+        Course.objects.filter(pk=course_id).update(**changes)
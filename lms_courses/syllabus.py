@@ -0,0 +1,106 @@
+"""
+Cache đề cương (syllabus) của khóa học.
+
+Đề cương chỉ gồm các trường cần để hiển thị danh sách (id, tiêu đề, thứ tự,
+thời lượng, ...), không tải Lesson.content. Cache bị xóa khi bất kỳ
+Lesson/Assignment/Quiz nào của khóa học thay đổi và được dựng lại khi
+có request tiếp theo cần đến.
+
+Đề cương cũng lưu sẵn dãy khóa (order, id) của các bài học đã sắp xếp để tìm
+bài trước/bài sau bằng bisect thay vì hai truy vấn ORDER BY, và 'version'
+(hash nội dung) để tính ETag của trang (lms_courses.conditional).
+"""
+import hashlib
+from bisect import bisect_left
+
+from django.core.cache import cache
+from django.db import transaction
+
+from replicas.routing import primary
+
+from .models import Assignment, Lesson, Quiz
+
+CACHE_TIMEOUT = 24 * 60 * 60
+
+LESSON_FIELDS = ('id', 'title', 'order', 'duration_minutes', 'is_free')
+ASSIGNMENT_FIELDS = ('id', 'title', 'due_date', 'max_points')
+QUIZ_FIELDS = ('id', 'title', 'time_limit_minutes', 'max_attempts')
+
+
+def _cache_key(course_id):
+    return f'lms:syllabus:v3:{course_id}'
+
+
+def _make_outline(lessons, assignments, quizzes):
+    return {
+        'lessons': lessons,
+        'lesson_keys': [(lesson['order'], lesson['id']) for lesson in lessons],
+        'assignments': assignments,
+        'quizzes': quizzes,
+        'version': hashlib.sha1(repr((lessons, assignments, quizzes)).encode()).hexdigest()[:16],
+    }
+
+
+def build_outline(course_id):
+    return _make_outline(
+        list(Lesson.objects.filter(course_id=course_id).order_by('order', 'id').values(*LESSON_FIELDS)),
+        list(Assignment.objects.filter(course_id=course_id).values(*ASSIGNMENT_FIELDS)),
+        list(Quiz.objects.filter(course_id=course_id).values(*QUIZ_FIELDS)),
+    )
+
+
+def get_outline(course_id):
+    """Trả về dict {'lessons': [...], 'assignments': [...], 'quizzes': [...]}"""
+    key = _cache_key(course_id)
+    outline = cache.get(key)
+    if outline is None:
+        # Cache dùng chung cho mọi người nên dựng từ primary, không từ replica còn trễ
+        with primary():
+            outline = build_outline(course_id)
+        cache.set(key, outline, CACHE_TIMEOUT)
+    return outline
+
+
+async def abuild_outline(course_id):
+    return _make_outline(
+        [row async for row in Lesson.objects.filter(course_id=course_id).order_by('order', 'id').values(*LESSON_FIELDS)],
+        [row async for row in Assignment.objects.filter(course_id=course_id).values(*ASSIGNMENT_FIELDS)],
+        [row async for row in Quiz.objects.filter(course_id=course_id).values(*QUIZ_FIELDS)],
+    )
+
+
+async def aget_outline(course_id):
+    """Bản async của get_outline(), dùng chung cache"""
+    key = _cache_key(course_id)
+    outline = await cache.aget(key)
+    if outline is None:
+        with primary():
+            outline = await abuild_outline(course_id)
+        await cache.aset(key, outline, CACHE_TIMEOUT)
+    return outline
+
+
+def lesson_navigation(outline, lesson):
+    """
+    Trả về (bài trước, bài sau, vị trí bắt đầu từ 1, tổng số bài) của `lesson`
+    trong đề cương. Bài trước/sau là dict của đề cương hoặc None.
+    """
+    keys = outline['lesson_keys']
+    lessons = outline['lessons']
+    index = bisect_left(keys, (lesson.order, lesson.id))
+    if index >= len(keys) or keys[index] != (lesson.order, lesson.id):
+        # Đề cương chưa kịp cập nhật (ví dụ vừa đổi order), tìm theo id
+        ids = [lesson_id for _, lesson_id in keys]
+        if lesson.id not in ids:
+            return None, None, None, len(keys)
+        index = ids.index(lesson.id)
+    previous_lesson = lessons[index - 1] if index > 0 else None
+    next_lesson = lessons[index + 1] if index + 1 < len(lessons) else None
+    return previous_lesson, next_lesson, index + 1, len(keys)
+
+
+def invalidate_outline(course_id):
+    key = _cache_key(course_id)
+    cache.delete(key)
+    # Xóa thêm lần nữa sau commit để request đọc giữa chừng không cache lại dữ liệu cũ
+    transaction.on_commit(lambda: cache.delete(key))
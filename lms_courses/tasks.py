@@ -0,0 +1,20 @@
+from jobs.registry import job
+
+from .grading import grade_attempts, grade_quiz
+from .models import QuizAttempt
+from .stats import refresh_course_stats
+
+
+@job('lms_courses.grade_quiz')
+def grade_quiz_job(quiz_id, only_ungraded=False):
+    grade_quiz(quiz_id, only_ungraded=only_ungraded)
+
+
+@job('lms_courses.grade_attempts')
+def grade_attempts_job(attempt_ids):
+    grade_attempts(QuizAttempt.objects.filter(id__in=attempt_ids).only('id', 'quiz_id', 'score'))
+
+
+@job('lms_courses.refresh_course_stats')
+def refresh_course_stats_job(course_id):
+    refresh_course_stats(course_id)
@@ -1,3 +1,566 @@
+import base64
+import datetime
+import hashlib
+import io
+import json
+import tempfile
+from unittest import mock, skipUnless
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from . import analytics, enrollments, gradebook
+from .grading import grade_attempts
+from .importers import import_enrollments
+from blobstore.models import Blob
+from users.models import Profile
+from .models import (
+    Answer, Assignment, Category, Course, CourseDailyStats, Enrollment, Lesson, Question, Quiz, QuizAttempt,
+    QuizResponse, Submission,
+)
+from .pagination import NEXT, CursorPaginator, InvalidCursor, decode_cursor, encode_cursor
+from .query_plans import capture_plans
+from .search import search_courses
+from .stats import adjust_counts, apply_change, refresh_course_stats
+from .uploads import append_chunk, complete_upload, start_upload
+
+
+def _raw_cursor(payload):
+    """Con trỏ tự dựng như người dùng sửa tay tham số ?cursor="""
+    data = json.dumps(payload).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        instructor = User.objects.create_user('instructor', password='pw')
+        cls.courses = [
+            Course.objects.create(title=f'Khóa {i}', description='', instructor=instructor, status='published')
+            for i in range(5)
+        ]
+
+    def paginator(self):
+        return CursorPaginator(Course.objects.all(), 2)
+
+    def test_cursor_round_trip(self):
+        course = self.courses[0]
+        direction, values = decode_cursor(encode_cursor(NEXT, [course.created_at, course.id]))
+        self.assertEqual(direction, NEXT)
+        self.assertEqual(values, [course.created_at, course.id])
+
+    def test_pages_cover_every_row_once(self):
+        paginator = self.paginator()
+        page = paginator.get_page()
+        seen = [c.id for c in page]
+        while page.has_next():
+            page = paginator.get_page(page.next_cursor)
+            seen.extend(c.id for c in page)
+        self.assertEqual(seen, sorted((c.id for c in self.courses), reverse=True))
+
+        previous = paginator.get_page(page.previous_cursor)
+        self.assertEqual([c.id for c in previous], seen[-3:-1])
+
+    def test_cursor_on_annotation(self):
+        queryset = Course.objects.annotate(score=Count('id'))
+        paginator = CursorPaginator(queryset, 2, ordering=('score', 'created_at', 'id'))
+        page = paginator.get_page()
+        self.assertEqual(len(paginator.get_page(page.next_cursor)), 2)
+        self.assertEqual(len(paginator.get_page(_raw_cursor([NEXT, ['x', 1, 1]]))), 2)
+
+    def test_undecodable_cursor_raises_invalid_cursor(self):
+        for token in ['%%%', _raw_cursor({'a': 1}), _raw_cursor(['x', []]), _raw_cursor([NEXT, [{'dt': 'garbage'}]])]:
+            with self.subTest(token=token):
+                with self.assertRaises(InvalidCursor):
+                    decode_cursor(token)
+
+    def test_tampered_cursor_falls_back_to_first_page(self):
+        first_page = [c.id for c in self.paginator().get_page()]
+        valid_dt = {'dt': self.courses[2].created_at.isoformat()}
+        tampered = [
+            [NEXT, [{'dt': 'garbage'}, 1]],
+            [NEXT, ['không phải ngày', 1]],
+            [NEXT, [valid_dt, 'abc']],
+            [NEXT, [valid_dt, None]],
+            [NEXT, [valid_dt, [1]]],
+            [NEXT, [valid_dt]],
+            [NEXT, [valid_dt, 1, 2]],
+            [NEXT, [{'dt': '2024-01-01T00:00:00'}, 1]],
+            [NEXT, [{'dt': 1}, 1]],
+        ]
+        for payload in tampered:
+            with self.subTest(payload=payload):
+                page = self.paginator().get_page(_raw_cursor(payload))
+                self.assertEqual([c.id for c in page], first_page)
+                self.assertFalse(page.has_previous())
+
+
+COUNTERS = [
+    'lesson_count', 'total_lesson_minutes', 'assignment_count', 'quiz_count', 'enrollment_count',
+    'active_enrollment_count', 'completed_enrollment_count', 'dropped_enrollment_count',
+]
+
+
+class CourseStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = User.objects.create_user('instructor', password='pw')
+        cls.students = [User.objects.create_user(f'student{i}', password='pw') for i in range(3)]
+
+    def setUp(self):
+        self.course = self.create_course()
+
+    def create_course(self):
+        return Course.objects.create(title='Khóa', description='', instructor=self.instructor)
+
+    def counters(self, course):
+        return Course.objects.filter(pk=course.pk).values(*COUNTERS).get()
+
+    def assertCountersMatchRebuild(self, course, **expected):
+        counters = self.counters(course)
+        for name, value in expected.items():
+            self.assertEqual(counters[name], value, name)
+        refresh_course_stats(course.pk)
+        self.assertEqual(counters, self.counters(course))
+
+    def test_lesson_changes(self):
+        lesson = Lesson.objects.create(course=self.course, title='L1', content='x', order=1, duration_minutes=10)
+        Lesson.objects.create(course=self.course, title='L2', content='x', order=2, duration_minutes=5)
+        self.assertCountersMatchRebuild(self.course, lesson_count=2, total_lesson_minutes=15)
+
+        lesson = Lesson.objects.get(pk=lesson.pk)
+        lesson.duration_minutes = 30
+        lesson.save()
+        self.assertCountersMatchRebuild(self.course, lesson_count=2, total_lesson_minutes=35)
+
+        other = self.create_course()
+        lesson.course = other
+        lesson.save()
+        self.assertCountersMatchRebuild(self.course, lesson_count=1, total_lesson_minutes=5)
+        self.assertCountersMatchRebuild(other, lesson_count=1, total_lesson_minutes=30)
+
+        lesson.delete()
+        self.assertCountersMatchRebuild(other, lesson_count=0, total_lesson_minutes=0)
+
+    def test_assignment_and_quiz_changes(self):
+        assignment = Assignment.objects.create(course=self.course, title='A', description='d', due_date=timezone.now())
+        quiz = Quiz.objects.create(course=self.course, title='Q')
+        Quiz.objects.create(course=self.course, title='Q2')
+        self.assertCountersMatchRebuild(self.course, assignment_count=1, quiz_count=2)
+
+        assignment.delete()
+        quiz.delete()
+        self.assertCountersMatchRebuild(self.course, assignment_count=0, quiz_count=1)
+
+    def test_enrollment_changes(self):
+        enrollments = [Enrollment.objects.create(student=s, course=self.course) for s in self.students]
+        self.assertCountersMatchRebuild(self.course, enrollment_count=3, active_enrollment_count=3)
+
+        completed = Enrollment.objects.get(pk=enrollments[0].pk)
+        completed.status = 'completed'
+        completed.save()
+        enrollments[1].status = 'dropped'
+        enrollments[1].save()
+        self.assertCountersMatchRebuild(
+            self.course, enrollment_count=3, active_enrollment_count=1,
+            completed_enrollment_count=1, dropped_enrollment_count=1,
+        )
+
+        completed.delete()
+        self.assertCountersMatchRebuild(
+            self.course, enrollment_count=2, active_enrollment_count=1, completed_enrollment_count=0,
+        )
+
+    def test_enrollment_saved_with_deferred_status(self):
+        enrollment = Enrollment.objects.create(student=self.students[0], course=self.course)
+        deferred = Enrollment.objects.defer('status').get(pk=enrollment.pk)
+        deferred.status = 'completed'
+        deferred.save()
+        self.assertCountersMatchRebuild(self.course, active_enrollment_count=0, completed_enrollment_count=1)
+
+    def test_counters_do_not_go_negative(self):
+        enrollment = Enrollment.objects.create(student=self.students[0], course=self.course)
+        Course.objects.filter(pk=self.course.pk).update(enrollment_count=0, active_enrollment_count=0)
+        enrollment.delete()
+        counters = self.counters(self.course)
+        self.assertEqual((counters['enrollment_count'], counters['active_enrollment_count']), (0, 0))
+
+    def test_counters_change_without_counting(self):
+        enrollment = Enrollment(student=self.students[0], course=self.course)
+        with self.assertNumQueries(1):
+            apply_change(enrollment, created=True)
+        lesson = Lesson(course=self.course, title='L', content='x', order=1)
+        lesson.save()
+        lesson.title = 'Đổi tên'
+        with self.assertNumQueries(0):
+            apply_change(lesson)
+
+
+class QuizScoreAnalyticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        instructor = User.objects.create_user('instructor', password='pw')
+        cls.students = [User.objects.create_user(f'student{i}', password='pw') for i in range(3)]
+        cls.course = Course.objects.create(title='Khóa', description='', instructor=instructor)
+        cls.quiz = Quiz.objects.create(course=cls.course, title='Q')
+        cls.questions = []
+        for order in range(2):
+            question = Question.objects.create(quiz=cls.quiz, text=f'Câu {order}', points=5, order=order)
+            cls.questions.append((
+                question,
+                Answer.objects.create(question=question, text='Đúng', is_correct=True),
+                Answer.objects.create(question=question, text='Sai', is_correct=False),
+            ))
+
+    def attempt(self, student, completed_at, correct):
+        attempt = QuizAttempt.objects.create(quiz=self.quiz, student=student, completed_at=completed_at)
+        for question, right, wrong in self.questions:
+            QuizResponse.objects.create(attempt=attempt, question=question, answer=right if correct else wrong)
+        return attempt
+
+    def daily(self):
+        return {
+            row.date: (row.graded_attempts, row.quiz_score_total)
+            for row in CourseDailyStats.objects.filter(course=self.course)
+        }
+
+    def test_scores_bucketed_by_local_day(self):
+        # 18:30 UTC là 01:30 sáng hôm sau ở Asia/Ho_Chi_Minh
+        late_utc = datetime.datetime(2024, 3, 1, 18, 30, tzinfo=datetime.timezone.utc)
+        attempts = [
+            self.attempt(self.students[0], late_utc, correct=True),
+            self.attempt(self.students[1], late_utc - datetime.timedelta(hours=12), correct=False),
+        ]
+        grade_attempts(QuizAttempt.objects.filter(pk__in=[a.pk for a in attempts]))
+        expected = {datetime.date(2024, 3, 2): (1, 10), datetime.date(2024, 3, 1): (1, 0)}
+        self.assertEqual(self.daily(), expected)
+
+        analytics.rebuild([self.course.pk])
+        self.assertEqual(self.daily(), expected)
+
+    def test_regrading_adds_only_the_difference(self):
+        when = timezone.now()
+        attempt = self.attempt(self.students[0], when, correct=False)
+        grade_attempts([attempt])
+        QuizResponse.objects.filter(attempt=attempt).update(answer=None)
+        for question, right, _ in self.questions:
+            QuizResponse.objects.filter(attempt=attempt, question=question).update(answer=right)
+        grade_attempts([attempt])
+        grade_attempts([attempt])
+        self.assertEqual(self.daily(), {timezone.localdate(when): (1, 10)})
+
+    def test_grading_uses_fixed_number_of_queries(self):
+        now = timezone.now()
+        small = [self.attempt(self.students[0], now, correct=True)]
+        large = [
+            self.attempt(student, now - datetime.timedelta(days=day), correct=day % 2 == 0)
+            for student in self.students[1:] for day in range(5)
+        ]
+        # Lần đầu còn tải đáp án của quiz vào cache
+        grade_attempts([self.attempt(self.students[0], now, correct=False)])
+        with CaptureQueriesContext(connection) as small_queries:
+            grade_attempts(small)
+        with self.assertNumQueries(len(small_queries.captured_queries)):
+            grade_attempts(large)
+
+
+class GradebookExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        instructor = User.objects.create_user('instructor', password='pw')
+        students = [User.objects.create_user(f'student{i}', password='pw') for i in range(5)]
+        cls.course = Course.objects.create(title='Khóa', description='', instructor=instructor)
+        for a in range(2):
+            assignment = Assignment.objects.create(
+                course=cls.course, title=f'Bài {a}', description='', due_date=timezone.now(),
+            )
+            for student in reversed(students):
+                Submission.objects.create(assignment=assignment, student=student, content='x', points=a)
+        quiz = Quiz.objects.create(course=cls.course, title='Quiz')
+        started = timezone.now()
+        for student in students:
+            for n in range(2):
+                attempt = QuizAttempt.objects.create(quiz=quiz, student=student, score=n)
+                # Hai attempt cùng started_at: id phân định thứ tự
+                QuizAttempt.objects.filter(pk=attempt.pk).update(started_at=started)
+
+    def rows(self):
+        return list(gradebook.iter_gradebook_rows(self.course))[1:]
+
+    def test_rows_in_order_across_chunks(self):
+        with mock.patch.object(gradebook, 'CHUNK_SIZE', 3):
+            chunked = self.rows()
+        with mock.patch.object(gradebook, 'CHUNK_SIZE', 1000):
+            single = self.rows()
+        self.assertEqual(chunked, single)
+        self.assertEqual(len(chunked), 20)
+
+        submissions = [(row[1], row[2]) for row in chunked if row[0] == 'assignment']
+        self.assertEqual(submissions, sorted(submissions))
+        attempts = [(row[2], row[4]) for row in chunked if row[0] == 'quiz']
+        self.assertEqual(attempts, sorted(attempts))
+
+    def test_each_chunk_is_a_separate_query(self):
+        with mock.patch.object(gradebook, 'CHUNK_SIZE', 3):
+            with CaptureQueriesContext(connection) as queries:
+                self.rows()
+        # Bài tập, 2 x ceil(5/3) chunk bài nộp, quiz (kèm đáp án), ceil(10/3) chunk attempt
+        chunk_queries = [q for q in queries.captured_queries if 'LIMIT 3' in q['sql']]
+        self.assertEqual(len(chunk_queries), 2 * 2 + 4)
+
+
+class SearchCoursesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        instructor = User.objects.create_user('instructor', password='pw')
+
+        def course(title, description=''):
+            return Course.objects.create(title=title, description=description, instructor=instructor)
+
+        cls.python = course('Lập trình Python', 'Nhập môn cho người mới')
+        cls.django = course('Django nâng cao', 'Web với Python')
+        cls.design = course('Thiết kế đồ họa')
+
+    def search(self, query):
+        return set(search_courses(Course.objects.all(), query))
+
+    def test_accent_insensitive_whole_terms(self):
+        self.assertEqual(self.search('lap trinh'), {self.python})
+        self.assertEqual(self.search('Đồ họa'), {self.design})
+        self.assertEqual(self.search('python'), {self.python, self.django})
+
+    def test_last_term_matches_prefix(self):
+        self.assertEqual(self.search('pyth'), {self.python, self.django})
+        self.assertEqual(self.search('lap tri'), {self.python})
+        self.assertEqual(self.search('nang cao web'), {self.django})
+
+    def test_only_last_term_is_a_prefix(self):
+        self.assertEqual(self.search('pyth lap'), set())
+        self.assertEqual(self.search('lap pytho django'), set())
+
+    def test_single_character_matches_whole_term_only(self):
+        self.assertEqual(self.search('p'), set())
+
+    def test_query_without_terms(self):
+        for query in (' ', '!!', '+-'):
+            with self.subTest(query=query):
+                self.assertEqual(self.search(query), set())
+
+    def test_course_list_query_without_terms(self):
+        # search_score vẫn có để phân trang theo độ liên quan
+        for query in ('+', '!!'):
+            with self.subTest(query=query):
+                response = self.client.get('/courses/', {'search': query})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(list(response.context['courses']), [])
+
+    def test_ranked_by_weight(self):
+        results = list(search_courses(Course.objects.all(), 'pyt'))
+        self.assertEqual(results[0], self.python)
+
+
+class CourseDetailConditionalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        instructor = User.objects.create_user('instructor', password='pw')
+        cls.course = Course.objects.create(title='Khóa', description='', instructor=instructor, status='published')
+
+    def get(self, **headers):
+        return self.client.get(f'/course/{self.course.pk}/', headers=headers)
+
+    def test_not_modified_until_counters_change(self):
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(if_none_match=etag).status_code, 304)
+
+        # Bộ đếm đổi bằng update(): updated_at giữ nguyên
+        for name in ('lesson_count', 'assignment_count', 'quiz_count', 'enrollment_count'):
+            with self.subTest(name):
+                adjust_counts(self.course.pk, {name: 1})
+                response = self.get(if_none_match=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+                etag = response['ETag']
+
+
+class LessonDetailConditionalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        instructor = User.objects.create_user('instructor', password='pw')
+        cls.student = User.objects.create_user('student', password='pw')
+        course = Course.objects.create(title='Khóa', description='', instructor=instructor, status='published')
+        cls.lesson = Lesson.objects.create(course=course, title='L1', content='Nội dung', order=1)
+        Enrollment.objects.create(student=cls.student, course=course)
+
+    def setUp(self):
+        self.client.force_login(self.student)
+
+    def get(self, **headers):
+        return self.client.get(f'/course/{self.lesson.course_id}/lesson/{self.lesson.pk}/', headers=headers)
+
+    def test_rerendered_lesson_is_modified(self):
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(if_none_match=etag).status_code, 304)
+
+        # render_lessons ghi content_html bằng bulk_update: updated_at giữ nguyên
+        with mock.patch('lms_courses.rendering.RENDERER_VERSION', '2'):
+            call_command('render_lessons', force=True, stdout=io.StringIO())
+        response = self.get(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'kế hoạch của MySQL/PostgreSQL phụ thuộc kích thước bảng')
+class QueryPlanTests(TestCase):
+    """Các đường nóng của views, admin và job không quét toàn bộ bảng"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = User.objects.create_user('instructor', password='pw')
+        Profile.objects.create(user=cls.instructor, user_type='instructor')
+        cls.student = User.objects.create_user('student', password='pw')
+        cls.admin = User.objects.create_superuser('admin', password='pw')
+        category = Category.objects.create(name='Lập trình')
+        cls.course = Course.objects.create(
+            title='Lập trình Python', description='Nhập môn', instructor=cls.instructor,
+            category=category, status='published',
+        )
+        cls.lesson = Lesson.objects.create(course=cls.course, title='L1', content='x', order=1)
+        Lesson.objects.create(course=cls.course, title='L2', content='x', order=2)
+        assignment = Assignment.objects.create(
+            course=cls.course, title='Bài 1', description='', due_date=timezone.now(),
+        )
+        Submission.objects.create(assignment=assignment, student=cls.student, content='x')
+        quiz = Quiz.objects.create(course=cls.course, title='Quiz')
+        question = Question.objects.create(quiz=quiz, text='Câu 1', points=5, order=1)
+        answer = Answer.objects.create(question=question, text='Đúng', is_correct=True)
+        cls.attempt = QuizAttempt.objects.create(quiz=quiz, student=cls.student, completed_at=timezone.now())
+        QuizResponse.objects.create(attempt=cls.attempt, question=question, answer=answer)
+        Enrollment.objects.create(student=cls.student, course=cls.course)
+
+    def assertNoFullScans(self, run):
+        with capture_plans() as plans:
+            run()
+        self.assertTrue(plans)
+        scans = [
+            f'{plan.sql}\n{plan.plan}' for plan in plans
+            if plan.full_scans and not plan.reads_whole_table
+        ]
+        self.assertFalse(scans, '\n\n'.join(scans))
+
+    def get(self, user, *urls):
+        self.client.force_login(user)
+        for url in urls:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+
+    def test_course_pages(self):
+        next_page = encode_cursor(NEXT, [self.course.created_at, self.course.pk])
+        self.assertNoFullScans(lambda: self.get(
+            self.student,
+            '/',
+            '/courses/',
+            f'/courses/?cursor={next_page}',
+            f'/courses/?category={self.course.category_id}',
+            '/courses/?search=lap+tri',
+            f'/course/{self.course.pk}/',
+            f'/course/{self.course.pk}/lesson/{self.lesson.pk}/',
+            f'/course/{self.course.pk}/learn/',
+            '/my-courses/',
+        ))
+
+    def test_instructor_pages(self):
+        self.assertNoFullScans(lambda: self.get(
+            self.instructor,
+            '/instructor/',
+            f'/instructor/course/{self.course.pk}/gradebook.csv',
+        ))
+
+    def test_admin_changelists(self):
+        self.assertNoFullScans(lambda: self.get(
+            self.admin,
+            '/admin/lms_courses/course/?status__exact=published',
+            '/admin/lms_courses/enrollment/',
+            f'/admin/lms_courses/lesson/?course__id__exact={self.course.pk}',
+            '/admin/lms_courses/submission/',
+            '/admin/lms_courses/quizattempt/',
+            f'/admin/lms_courses/quizattempt/?quiz__id__exact={self.attempt.quiz_id}',
+        ))
+
+    def test_grading_and_stats(self):
+        def run():
+            grade_attempts(QuizAttempt.objects.filter(pk=self.attempt.pk))
+            enrollment = Enrollment.objects.get(student=self.student, course=self.course)
+            enrollment.status = 'completed'
+            enrollment.save()
+            refresh_course_stats(self.course.pk)
+
+        self.assertNoFullScans(run)
+
+
+class ChunkedUploadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        instructor = User.objects.create_user('instructor', password='pw')
+        cls.student = User.objects.create_user('student', password='pw')
+        course = Course.objects.create(title='Khóa', description='', instructor=instructor)
+        cls.assignment = Assignment.objects.create(
+            course=course, title='Bài 1', description='', due_date=timezone.now(),
+        )
+
+    def setUp(self):
+        media_root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(self.settings(MEDIA_ROOT=media_root, CHUNKED_UPLOAD_TEMP_DIR=f'{media_root}/tmp_uploads'))
+
+    def submit(self, data):
+        upload = start_upload(self.student, self.assignment, 'bai.pdf', len(data), hashlib.sha256(data).hexdigest())
+        append_chunk(upload.pk, self.student, f'bytes 0-{len(data) - 1}/{len(data)}', io.BytesIO(data))
+        with self.captureOnCommitCallbacks(execute=True):
+            return complete_upload(upload.pk, self.student)
+
+    def test_resubmission_deletes_previous_file(self):
+        first = self.submit(b'ban dau')
+        first_name = first.file_upload.name
+        storage = first.file_upload.storage
+
+        second = self.submit(b'nop lai')
+        self.assertEqual(second.pk, first.pk)
+        self.assertNotEqual(second.file_upload.name, first_name)
+        self.assertFalse(storage.exists(first_name))
+        with second.file_upload.open('rb') as f:
+            self.assertEqual(f.read(), b'nop lai')
+        self.assertEqual(list(Blob.objects.values_list('ref_count', flat=True)), [1])
+
+
+class ImportEnrollmentsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        instructor = User.objects.create_user('instructor', password='pw')
+        cls.course = Course.objects.create(title='Khóa', description='', instructor=instructor)
+        cls.students = [User.objects.create_user(f'student{i}', password='pw') for i in range(4)]
+        Enrollment.objects.create(student=cls.students[0], course=cls.course)
+
+    def test_counts_and_cache_invalidation_per_chunk(self):
+        lines = ['username,course_id'] + [f'student{i},{self.course.pk}' for i in range(4)] + [
+            f'student1,{self.course.pk}',
+            f'ghost,{self.course.pk}',
+        ]
+        with mock.patch.object(enrollments.cache, 'delete_many') as delete_many:
+            result = import_enrollments(lines, chunk_size=3)
 
-# Create your tests here.
+        self.assertEqual((result.attempted, result.skipped, result.invalid), (3, 2, 1))
+        self.assertEqual(Enrollment.objects.filter(course=self.course).count(), 4)
+        self.assertEqual(Course.objects.get(pk=self.course.pk).enrollment_count, 4)
+        # Mỗi lô một lần xóa cho mọi học viên mới của lô (lần sau commit không
+        # chạy trong TestCase)
+        invalidated = [set(call.args[0]) for call in delete_many.call_args_list]
+        self.assertEqual(invalidated, [
+            {enrollments._cache_key(self.students[1].pk), enrollments._cache_key(self.students[2].pk)},
+            {enrollments._cache_key(self.students[3].pk)},
+        ])
@@ -0,0 +1,165 @@
+"""
+Tải file bài nộp theo từng phần, có thể tiếp tục khi bị ngắt.
+
+Giao thức (JSON):
+  1. POST   assignment/<id>/upload/          filename, size, sha256 -> {id, offset}
+  2. PUT    upload/<id>/  + Content-Range: bytes start-end/total   -> {offset}
+     GET    upload/<id>/                     -> {offset} (để tiếp tục)
+  3. POST   upload/<id>/complete/            -> {submission_id}
+
+Mỗi phần được nhận vào file riêng rồi nối vào file tạm; khi hoàn tất, SHA-256 của file được kiểm
+tra rồi file được gắn vào Submission.file_upload. Mỗi request chỉ mang một
+phần nhỏ nên worker gunicorn không bị giữ suốt thời gian tải file lớn.
+"""
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+
+from .models import ChunkedUpload, Submission
+
+READ_SIZE = 64 * 1024
+
+_CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def temp_path(upload):
+    return os.path.join(settings.CHUNKED_UPLOAD_TEMP_DIR, f'{upload.pk}.part')
+
+
+def start_upload(user, assignment, filename, total_size, checksum):
+    filename = os.path.basename(filename or '').strip()
+    if not filename:
+        raise UploadError('Thiếu tên file')
+    if total_size <= 0 or total_size > settings.CHUNKED_UPLOAD_MAX_SIZE:
+        raise UploadError('Kích thước file không hợp lệ')
+    if not re.fullmatch(r'[0-9a-f]{64}', checksum or ''):
+        raise UploadError('Checksum SHA-256 không hợp lệ')
+    os.makedirs(settings.CHUNKED_UPLOAD_TEMP_DIR, exist_ok=True)
+    upload = ChunkedUpload.objects.create(
+        user=user, assignment=assignment, filename=filename[:255],
+        total_size=total_size, checksum=checksum,
+    )
+    open(temp_path(upload), 'wb').close()
+    return upload
+
+
+def parse_content_range(header):
+    match = _CONTENT_RANGE_RE.match(header or '')
+    if not match:
+        raise UploadError('Thiếu hoặc sai header Content-Range')
+    start, end, total = (int(value) for value in match.groups())
+    if end < start:
+        raise UploadError('Content-Range không hợp lệ')
+    return start, end, total
+
+
+def append_chunk(upload_id, user, content_range, stream):
+    """
+    Ghi nối một phần vào file tạm, trả về upload đã cập nhật offset.
+
+    Body được đọc hết vào file riêng của phần này trước, ngoài transaction:
+    client chậm chỉ giữ worker chứ không giữ kết nối database hay khóa dòng
+    ChunkedUpload. Sau đó mới khóa dòng, kiểm tra lại offset và nối phần đã
+    nhận vào file tạm (chép file cục bộ, nhanh).
+    """
+    start, end, total = parse_content_range(content_range)
+    length = end - start + 1
+    if length > settings.CHUNKED_UPLOAD_MAX_CHUNK:
+        raise UploadError('Phần tải lên quá lớn', status=413)
+
+    # Kiểm tra sớm (không khóa) để không nhận cả phần rồi mới báo lỗi
+    upload = ChunkedUpload.objects.filter(pk=upload_id, user=user).first()
+    _check_chunk(upload, start, end, total)
+
+    chunk = tempfile.NamedTemporaryFile(dir=settings.CHUNKED_UPLOAD_TEMP_DIR, suffix='.chunk')
+    with chunk:
+        written = 0
+        while written < length:
+            data = stream.read(min(READ_SIZE, length - written))
+            if not data:
+                break
+            chunk.write(data)
+            written += len(data)
+        if written != length:
+            raise UploadError('Phần tải lên bị thiếu dữ liệu')
+        chunk.flush()
+        chunk.seek(0)
+
+        with transaction.atomic():
+            upload = ChunkedUpload.objects.select_for_update().filter(pk=upload_id, user=user).first()
+            # Request khác có thể đã nối phần này trong lúc đang nhận
+            _check_chunk(upload, start, end, total)
+            with open(temp_path(upload), 'r+b') as part:
+                part.seek(upload.offset)
+                shutil.copyfileobj(chunk, part, READ_SIZE)
+                part.truncate(upload.offset + written)
+            upload.offset += written
+            upload.save(update_fields=['offset', 'updated_at'])
+    return upload
+
+
+def _check_chunk(upload, start, end, total):
+    if upload is None:
+        raise UploadError('Không tìm thấy phiên tải lên', status=404)
+    if upload.status != 'uploading':
+        raise UploadError('Phiên tải lên đã hoàn tất', status=409)
+    if total != upload.total_size or end >= upload.total_size:
+        raise UploadError('Content-Range không khớp kích thước file')
+    if start != upload.offset:
+        raise UploadError(f'Cần gửi từ byte {upload.offset}', status=409)
+
+
+def complete_upload(upload_id, user):
+    """Kiểm tra checksum và gắn file vào Submission, trả về Submission"""
+    with transaction.atomic():
+        upload = ChunkedUpload.objects.select_for_update().filter(pk=upload_id, user=user).first()
+        if upload is None:
+            raise UploadError('Không tìm thấy phiên tải lên', status=404)
+        if upload.status != 'uploading':
+            raise UploadError('Phiên tải lên đã hoàn tất', status=409)
+        if upload.offset != upload.total_size:
+            raise UploadError(f'File chưa tải xong ({upload.offset}/{upload.total_size})', status=409)
+
+        path = temp_path(upload)
+        digest = hashlib.sha256()
+        with open(path, 'rb') as part:
+            for data in iter(lambda: part.read(READ_SIZE), b''):
+                digest.update(data)
+        if digest.hexdigest() != upload.checksum:
+            raise UploadError('Checksum không khớp, vui lòng tải lại', status=422)
+
+        submission, _ = Submission.objects.select_for_update().get_or_create(
+            assignment_id=upload.assignment_id, student=user, defaults={'content': ''},
+        )
+        old_name = submission.file_upload.name
+        with open(path, 'rb') as part:
+            submission.file_upload.save(upload.filename, File(part), save=True)
+        if old_name and old_name != submission.file_upload.name:
+            # Nộp lại: bỏ file cũ (với blobstore là giảm tham chiếu của blob),
+            # chỉ sau khi bài nộp đã trỏ sang file mới
+            storage = submission.file_upload.storage
+            transaction.on_commit(lambda: storage.delete(old_name))
+        upload.status = 'complete'
+        upload.save(update_fields=['status', 'updated_at'])
+    discard_temp_file(upload)
+    return submission
+
+
+def discard_temp_file(upload):
+    try:
+        os.remove(temp_path(upload))
+    except FileNotFoundError:
+        pass
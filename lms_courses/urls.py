@@ -1,13 +1,21 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
+
+# Dưới ASGI các trang chỉ đọc dùng bản async (lms_courses.async_views)
+read_views = async_views if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
-    path('', views.home, name='home'),
-    path('courses/', views.course_list, name='course_list'),
-    path('course/<int:course_id>/', views.course_detail, name='course_detail'),
+    path('', read_views.home, name='home'),
+    path('courses/', read_views.course_list, name='course_list'),
+    path('course/<int:course_id>/', read_views.course_detail, name='course_detail'),
     path('course/<int:course_id>/enroll/', views.enroll_course, name='enroll_course'),
     path('my-courses/', views.my_courses, name='my_courses'),
     path('course/<int:course_id>/learn/', views.course_learning, name='course_learning'),
-    path('course/<int:course_id>/lesson/<int:lesson_id>/', views.lesson_detail, name='lesson_detail'),
+    path('course/<int:course_id>/lesson/<int:lesson_id>/', read_views.lesson_detail, name='lesson_detail'),
     path('instructor/', views.instructor_dashboard, name='instructor_dashboard'),
+    path('instructor/course/<int:course_id>/gradebook.csv', views.gradebook_export, name='gradebook_export'),
+    path('assignment/<int:assignment_id>/upload/', views.submission_upload_start, name='submission_upload_start'),
+    path('upload/<uuid:upload_id>/', views.submission_upload_chunk, name='submission_upload_chunk'),
+    path('upload/<uuid:upload_id>/complete/', views.submission_upload_complete, name='submission_upload_complete'),
 ]
@@ -1,13 +1,26 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, authenticate
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_http_methods, require_POST
 from django.contrib import messages
-from django.http import JsonResponse
-from django.core.paginator import Paginator
-from django.db.models import Q
-from .models import Course, Category, Enrollment, Lesson, Assignment, Quiz
+from django.http import HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.db.models import Sum
+from monitoring.query_budget import query_budget
+from replicas.routing import read_alias, replica_reads
+from .models import Course, Category, Enrollment, Lesson, Assignment, Quiz, ChunkedUpload
+from .analytics import instructor_course_summary
+from .conditional import add_validators, course_detail_parts, not_modified, page_etag
+from .enrollments import get_enrollment_status
+from .gradebook import gradebook_filename, iter_gradebook_csv
+from .pagination import CursorPaginator
+from .rendering import highlight_css
+from .search import search_courses
+from .syllabus import get_outline, lesson_navigation
+from .uploads import UploadError, append_chunk, complete_upload, start_upload
 
 
+@replica_reads
+@query_budget(5)
 def home(request):
     """Trang chủ"""
     featured_courses = Course.objects.filter(status='published')[:6]
@@ -20,9 +33,11 @@ def home(request):
     return render(request, 'lms_courses/home.html', context)
 
 
+@replica_reads
+@query_budget(5)
 def course_list(request):
     """Danh sách khóa học"""
-    courses = Course.objects.filter(status='published')
+    courses = Course.objects.filter(status='published').select_related('category')
     categories = Category.objects.all()
     
     # Lọc theo danh mục
@@ -32,54 +47,60 @@ def course_list(request):
     
     # Tìm kiếm
     search_query = request.GET.get('search')
+    ordering = ('created_at', 'id')
     if search_query:
-        courses = courses.filter(
-            Q(title__icontains=search_query) | 
-            Q(description__icontains=search_query)
-        )
+        courses = search_courses(courses, search_query)
+        ordering = ('search_score', 'created_at', 'id')
+    
+    # Phân trang theo con trỏ
+    paginator = CursorPaginator(courses, 12, ordering=ordering)
+    courses = paginator.get_page(request.GET.get('cursor'))
     
-    # Phân trang
-    paginator = Paginator(courses, 12)
-    page_number = request.GET.get('page')
-    courses = paginator.get_page(page_number)
+    query_params = request.GET.copy()
+    query_params.pop('cursor', None)
+    query_params.pop('page', None)
     
     context = {
         'courses': courses,
         'categories': categories,
         'current_category': category_id,
         'search_query': search_query,
+        'query_string': query_params.urlencode(),
     }
     return render(request, 'lms_courses/course_list.html', context)
 
 
+@replica_reads
+@query_budget(7)
 def course_detail(request, course_id):
     """Chi tiết khóa học"""
-    course = get_object_or_404(Course, id=course_id, status='published')
-    lessons = course.lessons.all()
-    assignments = course.assignments.all()
-    quizzes = course.quizzes.all()
+    course = get_object_or_404(
+        Course.objects.select_related('instructor', 'category'), id=course_id, status='published'
+    )
+    outline = get_outline(course.id)
     
     # Kiểm tra xem user đã đăng ký chưa
-    is_enrolled = False
-    enrollment = None
-    if request.user.is_authenticated:
-        try:
-            enrollment = Enrollment.objects.get(student=request.user, course=course)
-            is_enrolled = True
-        except Enrollment.DoesNotExist:
-            pass
+    enrollment_status = get_enrollment_status(request.user, course.id)
+
+    # Trình duyệt đã có đúng trang này thì trả 304, không render
+    etag = page_etag(request, course_detail_parts(course), outline['version'], enrollment_status)
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
     
     context = {
         'course': course,
-        'lessons': lessons,
-        'assignments': assignments,
-        'quizzes': quizzes,
-        'is_enrolled': is_enrolled,
-        'enrollment': enrollment,
+        'lessons': outline['lessons'],
+        'assignments': outline['assignments'],
+        'quizzes': outline['quizzes'],
+        'is_enrolled': enrollment_status is not None,
+        'enrollment_status': enrollment_status,
     }
-    return render(request, 'lms_courses/course_detail.html', context)
+    response = render(request, 'lms_courses/course_detail.html', context)
+    return add_validators(response, etag, course.updated_at)
 
 
+@query_budget(16)
 @login_required
 def enroll_course(request, course_id):
     """Đăng ký khóa học"""
@@ -100,6 +121,8 @@ def enroll_course(request, course_id):
     return redirect('course_detail', course_id=course_id)
 
 
+@replica_reads
+@query_budget(5)
 @login_required
 def my_courses(request):
     """Khóa học của tôi"""
@@ -111,32 +134,38 @@ def my_courses(request):
     return render(request, 'lms_courses/my_courses.html', context)
 
 
+@replica_reads
+@query_budget(6)
 @login_required
 def course_learning(request, course_id):
     """Trang học khóa học"""
     course = get_object_or_404(Course, id=course_id)
     
     # Kiểm tra xem user có đăng ký khóa học này không
-    try:
-        enrollment = Enrollment.objects.get(student=request.user, course=course)
-    except Enrollment.DoesNotExist:
+    enrollment_status = get_enrollment_status(request.user, course.id)
+    if enrollment_status is None:
         messages.error(request, 'Bạn chưa đăng ký khóa học này')
         return redirect('course_detail', course_id=course_id)
     
-    lessons = course.lessons.all()
-    assignments = course.assignments.all()
-    quizzes = course.quizzes.all()
+    outline = get_outline(course.id)
+    etag = page_etag(request, course.pk, course.updated_at, outline['version'], enrollment_status)
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
     
     context = {
         'course': course,
-        'enrollment': enrollment,
-        'lessons': lessons,
-        'assignments': assignments,
-        'quizzes': quizzes,
+        'enrollment_status': enrollment_status,
+        'lessons': outline['lessons'],
+        'assignments': outline['assignments'],
+        'quizzes': outline['quizzes'],
     }
-    return render(request, 'lms_courses/course_learning.html', context)
+    response = render(request, 'lms_courses/course_learning.html', context)
+    return add_validators(response, etag, course.updated_at)
 
 
+@replica_reads
+@query_budget(7)
 @login_required
 def lesson_detail(request, course_id, lesson_id):
     """Chi tiết bài học"""
@@ -144,31 +173,40 @@ def lesson_detail(request, course_id, lesson_id):
     lesson = get_object_or_404(Lesson, id=lesson_id, course=course)
     
     # Kiểm tra xem user có đăng ký khóa học này không
-    try:
-        enrollment = Enrollment.objects.get(student=request.user, course=course)
-    except Enrollment.DoesNotExist:
+    enrollment_status = get_enrollment_status(request.user, course.id)
+    if enrollment_status is None:
         messages.error(request, 'Bạn chưa đăng ký khóa học này')
         return redirect('course_detail', course_id=course_id)
     
-    # Lấy bài học trước và sau
-    previous_lesson = Lesson.objects.filter(
-        course=course, order__lt=lesson.order
-    ).order_by('-order').first()
-    
-    next_lesson = Lesson.objects.filter(
-        course=course, order__gt=lesson.order
-    ).order_by('order').first()
+    # Lấy bài học trước và sau từ đề cương đã cache
+    outline = get_outline(course.id)
+
+    etag = page_etag(
+        request, course.pk, course.updated_at, lesson.pk, lesson.updated_at, lesson.content_hash,
+        outline['version'], enrollment_status,
+    )
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
+    previous_lesson, next_lesson, lesson_position, lesson_total = lesson_navigation(outline, lesson)
     
     context = {
         'course': course,
         'lesson': lesson,
-        'enrollment': enrollment,
+        'lessons': outline['lessons'],
+        'enrollment_status': enrollment_status,
         'previous_lesson': previous_lesson,
         'next_lesson': next_lesson,
+        'lesson_position': lesson_position,
+        'lesson_total': lesson_total,
+        'highlight_css': highlight_css(),
     }
-    return render(request, 'lms_courses/lesson_detail.html', context)
+    response = render(request, 'lms_courses/lesson_detail.html', context)
+    return add_validators(response, etag, max(course.updated_at, lesson.updated_at))
 
 
+@replica_reads
+@query_budget(7)
 @login_required
 def instructor_dashboard(request):
     """Dashboard cho giảng viên"""
@@ -177,10 +215,107 @@ def instructor_dashboard(request):
         return redirect('home')
     
     courses = Course.objects.filter(instructor=request.user)
-    total_students = Enrollment.objects.filter(course__instructor=request.user).count()
+    totals = courses.aggregate(
+        students=Sum('enrollment_count'),
+        completed=Sum('completed_enrollment_count'),
+        lessons=Sum('lesson_count'),
+    )
+    total_students = totals['students'] or 0
+    completion_rate = 0
+    if total_students:
+        completion_rate = round(100 * (totals['completed'] or 0) / total_students)
+    
+    # Thống kê 30 ngày gần nhất từ bảng CourseDailyStats
+    recent = instructor_course_summary(request.user, days=30)
+    courses = list(courses)
+    for course in courses:
+        course.recent_stats = recent.get(course.id)
+    recent_totals = {
+        name: sum(row[name] for row in recent.values())
+        for name in ('new_enrollments', 'completions', 'drops', 'submissions')
+    }
+    graded = sum(row['graded_attempts'] for row in recent.values())
+    recent_totals['average_quiz_score'] = (
+        sum(row['quiz_score_total'] for row in recent.values()) / graded if graded else None
+    )
     
     context = {
         'courses': courses,
         'total_students': total_students,
+        'total_lessons': totals['lessons'] or 0,
+        'completion_rate': completion_rate,
+        'recent_totals': recent_totals,
     }
-    return render(request, 'lms_courses/instructor_dashboard.html', context)
\ No newline at end of file
+    return render(request, 'lms_courses/instructor_dashboard.html', context)
+
+
+@replica_reads
+@query_budget(4)
+@login_required
+def gradebook_export(request, course_id):
+    """Xuất bảng điểm khóa học (CSV, stream từng dòng)"""
+    course = get_object_or_404(Course, id=course_id)
+    if course.instructor_id != request.user.id and not request.user.is_staff:
+        return HttpResponseForbidden('Bạn không có quyền xuất bảng điểm khóa học này')
+    
+    # Phần stream chạy sau khi middleware đã kết thúc: chốt database (replica
+    # nếu có) ngay trong view. Các truy vấn đó tăng theo số dòng / CHUNK_SIZE
+    # và nằm ngoài ngân sách truy vấn của view.
+    rows = iter_gradebook_csv(course, using=read_alias())
+    response = StreamingHttpResponse(rows, content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{gradebook_filename(course)}"'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@query_budget(8)
+@login_required
+@require_POST
+def submission_upload_start(request, assignment_id):
+    """Bắt đầu phiên tải file bài nộp theo từng phần"""
+    assignment = get_object_or_404(Assignment, id=assignment_id)
+    if get_enrollment_status(request.user, assignment.course_id) is None:
+        return JsonResponse({'error': 'Bạn chưa đăng ký khóa học này'}, status=403)
+    
+    try:
+        upload = start_upload(
+            request.user,
+            assignment,
+            filename=request.POST.get('filename'),
+            total_size=int(request.POST.get('size') or 0),
+            checksum=(request.POST.get('sha256') or '').lower(),
+        )
+    except ValueError:
+        return JsonResponse({'error': 'Kích thước file không hợp lệ'}, status=400)
+    except UploadError as exc:
+        return JsonResponse({'error': exc.message}, status=exc.status)
+    
+    return JsonResponse({'id': str(upload.pk), 'offset': upload.offset}, status=201)
+
+
+@query_budget(6)
+@login_required
+@require_http_methods(['GET', 'PUT'])
+def submission_upload_chunk(request, upload_id):
+    """Xem offset hiện tại (GET) hoặc gửi một phần file (PUT + Content-Range)"""
+    if request.method == 'GET':
+        upload = get_object_or_404(ChunkedUpload, pk=upload_id, user=request.user)
+        return JsonResponse({'offset': upload.offset, 'size': upload.total_size, 'status': upload.status})
+    
+    try:
+        upload = append_chunk(upload_id, request.user, request.headers.get('Content-Range'), request)
+    except UploadError as exc:
+        return JsonResponse({'error': exc.message}, status=exc.status)
+    return JsonResponse({'offset': upload.offset, 'size': upload.total_size})
+
+
+@query_budget(24)
+@login_required
+@require_POST
+def submission_upload_complete(request, upload_id):
+    """Kiểm tra checksum và gắn file vào bài nộp"""
+    try:
+        submission = complete_upload(upload_id, request.user)
+    except UploadError as exc:
+        return JsonResponse({'error': exc.message}, status=exc.status)
+    return JsonResponse({'submission_id': submission.pk, 'file': submission.file_upload.name})
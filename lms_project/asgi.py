@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'lms_project.settings')
+# Dùng bản async của các trang chỉ đọc (settings.ASYNC_VIEWS)
+os.environ.setdefault('LMS_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -39,10 +40,18 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'users',
     'lms_courses',
+    'jobs',
+    'thumbnails',
+    'blobstore',
+    'monitoring',
+    'replicas',
 ]
 
 MIDDLEWARE = [
+    'monitoring.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'replicas.middleware.ReplicaMiddleware',
+    'monitoring.middleware.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -55,7 +64,7 @@ ROOT_URLCONF = 'lms_project.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'monitoring.template_backend.InstrumentedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -95,6 +104,37 @@ DATABASES = {
 # }
 
 
+# Replica chỉ đọc (replicas.routing): thêm alias vào DATABASES rồi liệt kê ở
+# DATABASE_REPLICAS. Chỉ view đánh dấu @replica_reads mới đọc từ replica; ghi
+# luôn vào 'default'. Ví dụ:
+# DATABASES['replica'] = {**DATABASES['default'], 'HOST': 'replica-host', 'TEST': {'MIRROR': 'default'}}
+# DATABASE_REPLICAS = ['replica']
+DATABASE_REPLICAS = []
+DATABASE_ROUTERS = ['replicas.router.ReplicaRouter']
+# Sau một request có ghi, trình duyệt đọc từ primary trong chừng này giây
+# (lớn hơn REPLICA_MAX_LAG_SECONDS để luôn đọc được dữ liệu vừa ghi)
+REPLICA_PIN_SECONDS = 15
+REPLICA_PIN_COOKIE = 'lms_primary'
+# Replica trễ hơn mức này (hoặc replication dừng) bị bỏ qua; None để không kiểm tra
+REPLICA_MAX_LAG_SECONDS = 10
+REPLICA_HEALTH_CHECK_INTERVAL = 5
+
+
+# Cache
+# Redis dùng chung cho mọi worker và mọi server (đề cương khóa học, session,
+# user đã đăng nhập...). Redis cần maxmemory-policy allkeys-lru để khi đầy chỉ
+# loại bỏ key ít dùng nhất, xem DEPLOYMENT.md.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'monitoring.cache.InstrumentedRedisCache',
+        'LOCATION': os.environ.get('LMS_REDIS_URL', 'redis://127.0.0.1:6379/1'),
+        'TIMEOUT': 3600,
+        'KEY_PREFIX': 'lms',
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -113,6 +153,14 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# User đã đăng nhập (kèm profile) được tải từ cache, xem users.user_cache
+AUTHENTICATION_BACKENDS = ['users.backends.CachedModelBackend']
+
+# Session đọc từ cache, ghi database theo kiểu write-behind (users.sessions):
+# thay đổi không liên quan đăng nhập được ghi database nhiều nhất mỗi chừng này giây.
+SESSION_ENGINE = 'users.sessions'
+SESSION_DB_WRITE_INTERVAL = 5 * 60
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
@@ -135,6 +183,41 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# File upload được lưu theo nội dung, mỗi nội dung chỉ một bản (blobstore)
+STORAGES = {
+    'default': {
+        'BACKEND': 'blobstore.storage.DeduplicatingFileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
+# Tải file bài nộp theo từng phần (lms_courses.uploads)
+CHUNKED_UPLOAD_TEMP_DIR = BASE_DIR / 'tmp_uploads'
+CHUNKED_UPLOAD_MAX_SIZE = 100 * 1024 * 1024
+CHUNKED_UPLOAD_MAX_CHUNK = 8 * 1024 * 1024
+
+# Ngân sách truy vấn của view (monitoring.query_budget), bật khi DEBUG.
+# QUERY_BUDGET_RAISE = True để lỗi thay vì chỉ ghi log (dùng khi chạy test).
+QUERY_BUDGET_ENABLED = DEBUG
+QUERY_BUDGET_RAISE = False
+# Ngân sách theo tên URL cho view không tự khai báo bằng @query_budget (ví dụ admin)
+QUERY_BUDGETS = {}
+
+# Metrics Prometheus (monitoring.metrics), cộng dồn giữa các worker gunicorn
+# qua /dev/shm (xem gunicorn.conf.py).
+# Endpoint /internal/metrics/ chỉ mở cho các IP dưới đây và từ chối request đi
+# qua nginx (có X-Forwarded-For); nginx cũng chặn /internal/. Đặt
+# LMS_METRICS_TOKEN để Prometheus phải gửi thêm "Authorization: Bearer <token>".
+METRICS_ENABLED = True
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+METRICS_TOKEN = os.environ.get('LMS_METRICS_TOKEN')
+
+# Chạy dưới ASGI (lms_project/asgi.py đặt LMS_ASYNC_VIEWS=1): home, course_list,
+# course_detail và lesson_detail dùng bản async trong lms_courses.async_views
+ASYNC_VIEWS = os.environ.get('LMS_ASYNC_VIEWS') == '1'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
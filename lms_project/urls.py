@@ -7,6 +7,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('lms_courses.urls')),
     path('users/', include('users.urls')),
+    path('internal/', include('monitoring.urls')),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,18 @@
+"""
+Worker uvicorn cho gunicorn (gunicorn_asgi.conf.py).
+
+- Django không hỗ trợ giao thức lifespan của ASGI nên tắt đi.
+- Mỗi request đang chạy dưới ASGI giữ một kết nối database riêng, nên số
+  request đồng thời của một worker bị giới hạn bằng worker_connections
+  (uvicorn trả 503 khi vượt) để tổng kết nối không vượt max_connections
+  của MySQL.
+"""
+from uvicorn_worker import UvicornWorker
+
+
+class LMSUvicornWorker(UvicornWorker):
+    CONFIG_KWARGS = {**UvicornWorker.CONFIG_KWARGS, 'lifespan': 'off'}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.config.limit_concurrency = self.cfg.worker_connections
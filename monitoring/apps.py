@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class MonitoringConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'monitoring'
+
+    def ready(self):
+        from .query_budget import install_query_hook
+        connection_created.connect(install_query_hook, dispatch_uid='monitoring.install_query_hook')
@@ -0,0 +1,261 @@
+"""
+Benchmark các route của lms_courses.urls và users.urls trong cùng process.
+
+Mỗi route có một hoặc nhiều Case (vai trò người dùng + phương thức). Request
+được gửi qua django.test.Client (WSGI handler đầy đủ middleware, không qua
+mạng), mỗi case chạy vài lượt làm nóng rồi đo:
+
+- latency p50/p95/p99 và trung bình (ms),
+- số truy vấn database mỗi request (monitoring.query_budget.QueryRecorder),
+- bộ nhớ cấp phát đỉnh mỗi request (tracemalloc, chạy ở lượt riêng để không
+  làm sai lệch latency).
+
+Kết quả là dict có thể ghi ra JSON và so sánh với baseline đã lưu bằng
+compare(). Route mới chưa có Case sẽ bị báo trong results['missing_routes'].
+"""
+import hashlib
+import io
+import platform
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+import django
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from lms_courses import urls as course_urls
+from lms_courses.models import Assignment, Course, Enrollment
+from lms_courses.uploads import append_chunk, start_upload
+from users import urls as user_urls
+
+from .query_budget import QueryRecorder
+
+ANONYMOUS = 'anonymous'
+STUDENT = 'student'
+# Học viên chưa đăng ký khóa học của benchmark (đăng ký khóa học)
+NEW_STUDENT = 'new_student'
+INSTRUCTOR = 'instructor'
+
+UPLOAD_DATA = b'%PDF-1.4 benchmark\n' * 64
+
+
+@dataclass(frozen=True)
+class Case:
+    url_name: str
+    role: str = ANONYMOUS
+    method: str = 'get'
+    kwargs: tuple = ()
+    query: str = ''
+    data: tuple = ()
+    label: str = ''
+    # Method của _Runner chạy trước mỗi request (không tính vào số đo) để đưa
+    # dữ liệu về trạng thái route cần, ví dụ học viên chưa đăng ký
+    reset: str = ''
+
+    @property
+    def name(self):
+        suffix = f':{self.label}' if self.label else ''
+        return f'{self.url_name}{suffix}[{self.role}]'
+
+
+def _cases(url_name, roles=(ANONYMOUS, STUDENT), **options):
+    return [Case(url_name, role, **options) for role in roles]
+
+
+COURSE = (('course_id', 'course'),)
+UPLOAD = (('upload_id', 'upload'),)
+
+CASES = [
+    *_cases('home'),
+    *_cases('course_list'),
+    *_cases('course_list', query='?search=lap+trinh+python', label='search'),
+    *_cases('course_list', query='?category={category}', label='category'),
+    *_cases('course_detail', kwargs=COURSE),
+    *_cases('enroll_course', roles=(ANONYMOUS, NEW_STUDENT), method='post', kwargs=COURSE, reset='unenroll'),
+    *_cases('my_courses'),
+    *_cases('course_learning', kwargs=COURSE),
+    *_cases('lesson_detail', kwargs=COURSE + (('lesson_id', 'lesson'),)),
+    *_cases('instructor_dashboard', roles=(ANONYMOUS, STUDENT, INSTRUCTOR)),
+    *_cases('gradebook_export', roles=(ANONYMOUS, INSTRUCTOR), kwargs=COURSE),
+    *_cases('submission_upload_start', roles=(STUDENT,), method='post',
+            kwargs=(('assignment_id', 'assignment'),),
+            data=(('filename', 'bai.pdf'), ('size', '1024'), ('sha256', '0' * 64))),
+    *_cases('submission_upload_chunk', roles=(STUDENT,), kwargs=UPLOAD),
+    *_cases('submission_upload_complete', roles=(STUDENT,), method='post', kwargs=UPLOAD, reset='received_upload'),
+    *_cases('register', roles=(ANONYMOUS,)),
+    *_cases('login', roles=(ANONYMOUS,)),
+    *_cases('logout', roles=(ANONYMOUS,)),
+    *_cases('profile'),
+    *_cases('edit_profile'),
+]
+
+
+def route_names():
+    """Tên của mọi route cần benchmark"""
+    return [p.name for p in course_urls.urlpatterns + user_urls.urlpatterns if p.name]
+
+
+def build_context():
+    """Chọn đối tượng thật trong dataset cho tham số URL và người dùng"""
+    course = Course.objects.filter(status='published').order_by('-enrollment_count', 'id').first()
+    if course is None:
+        raise RuntimeError('Dataset không có khóa học đã xuất bản')
+    enrollment = (
+        Enrollment.objects.filter(course=course, status='active').select_related('student').order_by('id').first()
+    )
+    if enrollment is None:
+        raise RuntimeError('Khóa học phổ biến nhất không có học viên')
+    new_student = (
+        User.objects.filter(profile__user_type='student').exclude(enrollments__course=course).order_by('id').first()
+    )
+    if new_student is None:
+        raise RuntimeError('Mọi học viên đều đã đăng ký khóa học phổ biến nhất')
+    assignment = course.assignments.order_by('id').first()
+    if assignment is None:
+        assignment = Assignment.objects.create(
+            course=course, title='Bài tập benchmark', description='', due_date=course.created_at,
+        )
+    return {
+        'course': course.pk,
+        'lesson': course.lessons.order_by('order', 'id').values_list('id', flat=True).first(),
+        'category': course.category_id or '',
+        'assignment': assignment.pk,
+        'upload': _received_upload(enrollment.student, assignment).pk,
+        STUDENT: enrollment.student,
+        NEW_STUDENT: new_student,
+        INSTRUCTOR: course.instructor,
+    }
+
+
+def _received_upload(student, assignment):
+    """Phiên tải lên đã nhận đủ UPLOAD_DATA, chỉ còn chờ complete"""
+    size = len(UPLOAD_DATA)
+    upload = start_upload(student, assignment, 'bai.pdf', size, hashlib.sha256(UPLOAD_DATA).hexdigest())
+    return append_chunk(upload.pk, student, f'bytes 0-{size - 1}/{size}', io.BytesIO(UPLOAD_DATA))
+
+
+def _percentile(sorted_values, fraction):
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    return statistics.quantiles(sorted_values, n=100, method='inclusive')[round(fraction * 100) - 1]
+
+
+class _Runner:
+
+    def __init__(self, context):
+        self.context = context
+        self.clients = {ANONYMOUS: Client()}
+        for role in (STUDENT, NEW_STUDENT, INSTRUCTOR):
+            client = Client()
+            client.force_login(context[role])
+            self.clients[role] = client
+
+    def prepare(self, case):
+        if case.reset:
+            getattr(self, case.reset)()
+        url = reverse(case.url_name, kwargs={key: self.context[value] for key, value in case.kwargs})
+        url += case.query.format(**self.context)
+        return getattr(self.clients[case.role], case.method), url, dict(case.data)
+
+    def unenroll(self):
+        Enrollment.objects.filter(student=self.context[NEW_STUDENT], course_id=self.context['course']).delete()
+
+    def received_upload(self):
+        assignment = Assignment.objects.get(pk=self.context['assignment'])
+        self.context['upload'] = _received_upload(self.context[STUDENT], assignment).pk
+
+    @staticmethod
+    def send(request, url, data):
+        response = request(url, data) if data else request(url)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response
+
+
+def run_case(runner, case, iterations, warmup, alloc_iterations):
+    for _ in range(warmup):
+        response = runner.send(*runner.prepare(case))
+
+    latencies = []
+    queries = []
+    for _ in range(iterations):
+        request, url, data = runner.prepare(case)
+        with QueryRecorder(track_shapes=False) as recorder:
+            start = time.perf_counter()
+            response = runner.send(request, url, data)
+            latencies.append((time.perf_counter() - start) * 1000)
+        queries.append(recorder.count)
+
+    allocations = []
+    if alloc_iterations:
+        tracemalloc.start()
+        try:
+            for _ in range(alloc_iterations):
+                request, url, data = runner.prepare(case)
+                before = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                runner.send(request, url, data)
+                allocations.append(tracemalloc.get_traced_memory()[1] - before)
+        finally:
+            tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'url': url,
+        'status': response.status_code,
+        'p50_ms': round(_percentile(latencies, 0.50), 3),
+        'p95_ms': round(_percentile(latencies, 0.95), 3),
+        'p99_ms': round(_percentile(latencies, 0.99), 3),
+        'mean_ms': round(statistics.fmean(latencies), 3),
+        'queries': max(queries),
+        'alloc_peak_kb': round(statistics.median(allocations) / 1024, 1) if allocations else None,
+    }
+
+
+def run_benchmark(iterations=50, warmup=5, alloc_iterations=5, only=None, progress=None):
+    """Chạy mọi Case (hoặc các case có tên bắt đầu bằng một phần tử của `only`)"""
+    runner = _Runner(build_context())
+    covered = {case.url_name for case in CASES}
+    results = {
+        'meta': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'iterations': iterations,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'missing_routes': [name for name in route_names() if name not in covered],
+        'cases': {},
+    }
+    for case in CASES:
+        if only and not any(case.name.startswith(prefix) for prefix in only):
+            continue
+        results['cases'][case.name] = result = run_case(runner, case, iterations, warmup, alloc_iterations)
+        if progress:
+            progress(case.name, result)
+    return results
+
+
+def compare(results, baseline, tolerance=0.2, min_delta_ms=0.5):
+    """
+    So sánh với baseline. Trả về list (case, mô tả) các case có p50 chậm hơn
+    quá `tolerance` (và quá `min_delta_ms` để bỏ qua nhiễu) hoặc chạy nhiều
+    truy vấn hơn.
+    """
+    regressions = []
+    for name, result in results['cases'].items():
+        base = baseline.get('cases', {}).get(name)
+        if base is None:
+            continue
+        if result['queries'] > base['queries']:
+            regressions.append((name, f"truy vấn {base['queries']} -> {result['queries']}"))
+        # p95/p99 dao động nhiều giữa các lần chạy nên chỉ so p50
+        old, new = base['p50_ms'], result['p50_ms']
+        if new > old * (1 + tolerance) and new - old > min_delta_ms:
+            regressions.append((name, f'p50 {old} -> {new} ms (+{(new / old - 1) * 100:.0f}%)'))
+    return regressions
@@ -0,0 +1,28 @@
+"""
+Cache backend đếm số lần hit/miss (monitoring.metrics).
+
+get_or_set() của BaseCache đi qua get() nên cũng được đếm; RedisCache có
+get_many() riêng nên được đếm ở đây.
+"""
+from django.core.cache.backends.redis import RedisCache
+
+from . import metrics
+
+_MISSING = object()
+
+
+class InstrumentedRedisCache(RedisCache):
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        if value is _MISSING:
+            metrics.observe_cache(hits=0, misses=1)
+            return default
+        metrics.observe_cache(hits=1, misses=0)
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = super().get_many(keys, version)
+        metrics.observe_cache(hits=len(found), misses=len(keys) - len(found))
+        return found
@@ -0,0 +1,155 @@
+"""
+Đo khả năng phục vụ đồng thời của một server LMS đang chạy qua HTTP.
+
+Khác với monitoring.benchmark (đo từng request trong cùng process), ở đây
+nhiều client gửi request liên tục tới server thật ở các mức đồng thời khác
+nhau, để so sánh cùng một dataset khi chạy bằng gunicorn.conf.py (worker
+sync) và gunicorn_asgi.conf.py (uvicorn, view async):
+
+- throughput (request/giây), latency p50/p95/p99,
+- số request lỗi (mã >= 500, 503 khi vượt worker_connections, timeout).
+
+Mỗi client là một thread với kết nối keep-alive riêng, lần lượt gọi các
+trang chỉ đọc (home, course_list, course_detail, lesson_detail).
+"""
+import http.client
+import statistics
+import threading
+import time
+from collections import Counter
+from importlib import import_module
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.urls import reverse
+
+from lms_courses.models import Course, Enrollment
+
+
+def login_cookie(user):
+    """Tạo session đăng nhập cho `user` trong database, trả về header Cookie"""
+    store = import_module(settings.SESSION_ENGINE).SessionStore()
+    store[SESSION_KEY] = str(user.pk)
+    store[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    store[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    store.save()
+    return f'{settings.SESSION_COOKIE_NAME}={store.session_key}'
+
+
+def build_targets():
+    """[(tên, path, cookie)] trên khóa học phổ biến nhất của dataset"""
+    course = Course.objects.filter(status='published').order_by('-enrollment_count', 'id').first()
+    if course is None:
+        raise RuntimeError('Dataset không có khóa học đã xuất bản')
+    enrollment = (
+        Enrollment.objects.filter(course=course, status='active').select_related('student').order_by('id').first()
+    )
+    lesson_id = course.lessons.order_by('order', 'id').values_list('id', flat=True).first()
+    targets = [
+        ('home', reverse('home'), None),
+        ('course_list', reverse('course_list'), None),
+        ('course_detail', reverse('course_detail', args=[course.pk]), None),
+    ]
+    if enrollment is not None and lesson_id is not None:
+        path = reverse('lesson_detail', args=[course.pk, lesson_id])
+        targets.append(('lesson_detail', path, login_cookie(enrollment.student)))
+    return targets
+
+
+class _Client(threading.Thread):
+
+    def __init__(self, base_url, targets, offset, deadline, timeout):
+        super().__init__(daemon=True)
+        parts = urlsplit(base_url)
+        self.connection_class = (
+            http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        )
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.targets = targets
+        self.offset = offset
+        self.deadline = deadline
+        self.timeout = timeout
+        self.latencies = []
+        self.statuses = Counter()
+
+    def run(self):
+        connection = None
+        i = self.offset
+        while time.perf_counter() < self.deadline:
+            _, path, cookie = self.targets[i % len(self.targets)]
+            i += 1
+            headers = {'Cookie': cookie} if cookie else {}
+            if connection is None:
+                connection = self.connection_class(self.netloc, timeout=self.timeout)
+            start = time.perf_counter()
+            try:
+                connection.request('GET', self.prefix + path, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+                if response.will_close:
+                    connection.close()
+                    connection = None
+            except (OSError, http.client.HTTPException):
+                status = 'error'
+                connection.close()
+                connection = None
+            self.latencies.append((time.perf_counter() - start) * 1000)
+            self.statuses[status] += 1
+        if connection is not None:
+            connection.close()
+
+
+def _percentile(sorted_values, fraction):
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    return statistics.quantiles(sorted_values, n=100, method='inclusive')[round(fraction * 100) - 1]
+
+
+def run_level(base_url, targets, concurrency, duration, timeout=30):
+    """Chạy `concurrency` client trong `duration` giây"""
+    deadline = time.perf_counter() + duration
+    clients = [_Client(base_url, targets, i, deadline, timeout) for i in range(concurrency)]
+    start = time.perf_counter()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for client in clients for latency in client.latencies)
+    statuses = Counter()
+    for client in clients:
+        statuses.update(client.statuses)
+    failed = sum(n for status, n in statuses.items() if status == 'error' or status >= 500)
+    if not latencies:
+        return {'concurrency': concurrency, 'requests': 0, 'failed': 0, 'statuses': {}}
+    return {
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(_percentile(latencies, 0.50), 2),
+        'p95_ms': round(_percentile(latencies, 0.95), 2),
+        'p99_ms': round(_percentile(latencies, 0.99), 2),
+        'failed': failed,
+        'statuses': {str(status): n for status, n in sorted(statuses.items(), key=str)},
+    }
+
+
+def run_load_test(base_url, levels=(1, 10, 50, 100), duration=15, timeout=30, progress=None):
+    targets = build_targets()
+    results = {
+        'base_url': base_url,
+        'duration': duration,
+        'targets': [name for name, _, _ in targets],
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'levels': [],
+    }
+    for concurrency in levels:
+        result = run_level(base_url, targets, concurrency, duration, timeout)
+        results['levels'].append(result)
+        if progress:
+            progress(result)
+    return results
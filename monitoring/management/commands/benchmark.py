@@ -0,0 +1,102 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    override_settings, setup_databases, setup_test_environment, teardown_databases, teardown_test_environment,
+)
+
+from lms_courses.dataset import DatasetConfig, generate_dataset
+from lms_courses.models import Course
+from monitoring.benchmark import compare, run_benchmark
+
+# Dataset cố định để kết quả giữa các lần chạy so sánh được với nhau
+BENCHMARK_DATASET = DatasetConfig(users=3000, courses=200, enrollments=20000, quiz_responses=60000, seed=2024)
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'baseline.json'
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark mọi route của lms_courses và users trên database test với dataset cố định; '
+        'ghi kết quả JSON và so sánh với baseline'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('only', nargs='*', help='Chỉ chạy các case có tên bắt đầu bằng chuỗi này')
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--alloc-iterations', type=int, default=5, help='0 để bỏ đo bộ nhớ')
+        parser.add_argument('--output', help='Ghi kết quả JSON ra file')
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE))
+        parser.add_argument('--save-baseline', action='store_true', help='Ghi kết quả làm baseline mới')
+        parser.add_argument('--tolerance', type=float, default=0.2, help='Mức chậm đi cho phép (0.2 = 20%%)')
+        parser.add_argument('--keepdb', action='store_true', help='Giữ database test (và dataset) cho lần sau')
+
+    def handle(self, *args, **options):
+        verbosity = options['verbosity']
+        setup_test_environment(debug=False)
+        old_config = setup_databases(verbosity=verbosity, interactive=False, keepdb=options['keepdb'])
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                with override_settings(**self.isolated_settings(tmp)):
+                    if not Course.objects.exists():
+                        self.stdout.write('Đang sinh dataset benchmark...')
+                        generate_dataset(BENCHMARK_DATASET)
+                    results = run_benchmark(
+                        iterations=options['iterations'],
+                        warmup=options['warmup'],
+                        alloc_iterations=options['alloc_iterations'],
+                        only=options['only'],
+                        progress=self.report,
+                    )
+        finally:
+            teardown_databases(old_config, verbosity=verbosity, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        for name in results['missing_routes']:
+            self.stderr.write(self.style.WARNING(f'Route chưa có case benchmark: {name}'))
+        if options['output']:
+            self.write_json(options['output'], results)
+        if options['save_baseline']:
+            self.write_json(options['baseline'], results)
+            self.stdout.write(self.style.SUCCESS(f'Đã lưu baseline vào {options["baseline"]}'))
+            return
+
+        baseline_path = Path(options['baseline'])
+        if not baseline_path.exists():
+            self.stdout.write(f'Chưa có baseline ({baseline_path}), chạy lại với --save-baseline để tạo')
+            return
+        baseline = json.loads(baseline_path.read_text())
+        for name in sorted(results['cases'].keys() - baseline.get('cases', {}).keys()):
+            self.stderr.write(self.style.WARNING(f'{name}: chưa có trong baseline, không so sánh được'))
+        regressions = compare(results, baseline, tolerance=options['tolerance'])
+        for name, message in regressions:
+            self.stdout.write(self.style.ERROR(f'{name}: {message}'))
+        if regressions:
+            raise CommandError(f'{len(regressions)} chỉ số chậm đi so với baseline')
+        self.stdout.write(self.style.SUCCESS('Không có case nào chậm đi so với baseline'))
+
+    @staticmethod
+    def isolated_settings(tmp):
+        """Key cache và file tạm riêng để không đụng dữ liệu của server đang chạy"""
+        return {
+            'CACHES': {'default': {**settings.CACHES['default'], 'KEY_PREFIX': f'benchmark-{Path(tmp).name}'}},
+            'MEDIA_ROOT': str(Path(tmp) / 'media'),
+            'CHUNKED_UPLOAD_TEMP_DIR': str(Path(tmp) / 'uploads'),
+            'QUERY_BUDGET_ENABLED': False,
+        }
+
+    def report(self, name, result):
+        self.stdout.write(
+            f"{name:<55} {result['status']:>3}  p50 {result['p50_ms']:>8.2f}  p95 {result['p95_ms']:>8.2f}  "
+            f"p99 {result['p99_ms']:>8.2f} ms  {result['queries']:>3} q  "
+            f"{result['alloc_peak_kb'] if result['alloc_peak_kb'] is not None else '-':>8} KB"
+        )
+
+    @staticmethod
+    def write_json(path, results):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(results, indent=2, ensure_ascii=False) + '\n')
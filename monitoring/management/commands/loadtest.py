@@ -0,0 +1,59 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from monitoring.loadtest import run_load_test
+
+
+class Command(BaseCommand):
+    help = (
+        'Tải đồng thời các trang chỉ đọc của một server đang chạy (cùng database với lệnh này); '
+        'dùng để so sánh gunicorn sync với ASGI'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('base_url', nargs='?', default='http://127.0.0.1:8001')
+        parser.add_argument('--concurrency', default='1,10,50,100', help='Các mức đồng thời, cách nhau bởi dấu phẩy')
+        parser.add_argument('--duration', type=float, default=15, help='Số giây cho mỗi mức')
+        parser.add_argument('--timeout', type=float, default=30)
+        parser.add_argument('--output', help='Ghi kết quả JSON ra file')
+        parser.add_argument('--compare', help='File JSON của lần chạy khác (ví dụ server sync) để đặt cạnh nhau')
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(n) for n in options['concurrency'].split(',') if n.strip()]
+        except ValueError:
+            raise CommandError('--concurrency phải là danh sách số nguyên, ví dụ 1,10,50')
+        if not levels or min(levels) < 1:
+            raise CommandError('--concurrency phải là danh sách số nguyên dương')
+
+        other = None
+        if options['compare']:
+            other = {level['concurrency']: level for level in json.loads(Path(options['compare']).read_text())['levels']}
+
+        self.stdout.write(f"{'đồng thời':>9}  {'req/s':>8}  {'p50':>8}  {'p95':>8}  {'p99':>8}  {'lỗi':>6}")
+        results = run_load_test(
+            options['base_url'], levels=levels, duration=options['duration'], timeout=options['timeout'],
+            progress=lambda result: self.report(result, other),
+        )
+        if options['output']:
+            path = Path(options['output'])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(results, indent=2, ensure_ascii=False) + '\n')
+
+    def report(self, result, other):
+        if not result['requests']:
+            self.stdout.write(self.style.ERROR(f"{result['concurrency']:>9}  không có request nào hoàn thành"))
+            return
+        self.stdout.write(
+            f"{result['concurrency']:>9}  {result['rps']:>8.1f}  {result['p50_ms']:>8.1f}  "
+            f"{result['p95_ms']:>8.1f}  {result['p99_ms']:>8.1f}  {result['failed']:>6}"
+        )
+        base = other.get(result['concurrency']) if other else None
+        if base and base.get('requests'):
+            self.stdout.write(
+                f"{'so với':>9}  {base['rps']:>8.1f}  {base['p50_ms']:>8.1f}  "
+                f"{base['p95_ms']:>8.1f}  {base['p99_ms']:>8.1f}  {base['failed']:>6}"
+                f"   ({result['rps'] / base['rps']:.2f}x req/s)"
+            )
@@ -0,0 +1,83 @@
+"""
+Metrics theo định dạng Prometheus.
+
+Khi chạy dưới gunicorn, biến môi trường PROMETHEUS_MULTIPROC_DIR
+(/dev/shm/lms_metrics, đặt trong gunicorn.conf.py) bật chế độ multiprocess
+của prometheus_client: mỗi worker ghi giá trị của mình vào file mmap riêng,
+endpoint /internal/metrics/ cộng dồn file của mọi worker nên worker nào trả
+lời scrape cũng cho cùng một kết quả. Không có biến này (runserver, lệnh
+manage.py) thì metrics chỉ nằm trong bộ nhớ của process.
+
+Latency được lưu dưới dạng histogram; p50/p95/p99 theo route tính bằng PromQL:
+
+    histogram_quantile(0.95, sum by (view, le) (
+        rate(lms_http_request_duration_seconds_bucket[5m])))
+"""
+import os
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess
+from prometheus_client.exposition import CONTENT_TYPE_LATEST
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.25, 0.5, 0.75, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+REQUESTS = Counter(
+    'lms_http_requests_total', 'Số request theo view và mã trạng thái',
+    ['view', 'method', 'status'],
+)
+REQUEST_LATENCY = Histogram(
+    'lms_http_request_duration_seconds', 'Thời gian xử lý request',
+    ['view', 'method'], buckets=LATENCY_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    'lms_db_queries_per_request', 'Số truy vấn database mỗi request',
+    ['view'], buckets=QUERY_COUNT_BUCKETS,
+)
+DB_TIME = Histogram(
+    'lms_db_duration_seconds', 'Tổng thời gian database mỗi request',
+    ['view'], buckets=LATENCY_BUCKETS,
+)
+TEMPLATE_RENDER_TIME = Histogram(
+    'lms_template_render_duration_seconds', 'Thời gian render template',
+    ['template'], buckets=LATENCY_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    'lms_cache_requests_total', 'Số lần đọc cache theo kết quả (hit/miss)',
+    ['result'],
+)
+
+UNRESOLVED_VIEW = '<unresolved>'
+
+
+def view_label(request):
+    """Tên URL của view (không dùng path để số nhãn không tăng theo id)"""
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else UNRESOLVED_VIEW
+
+
+def observe_request(view, method, status, duration, query_count, db_time):
+    REQUESTS.labels(view, method, str(status)).inc()
+    REQUEST_LATENCY.labels(view, method).observe(duration)
+    DB_QUERIES.labels(view).observe(query_count)
+    DB_TIME.labels(view).observe(db_time)
+
+
+def observe_template(name, duration):
+    TEMPLATE_RENDER_TIME.labels(name or '<string>').observe(duration)
+
+
+def observe_cache(hits, misses):
+    if hits:
+        CACHE_REQUESTS.labels('hit').inc(hits)
+    if misses:
+        CACHE_REQUESTS.labels('miss').inc(misses)
+
+
+def render_metrics():
+    """Trả về (nội dung, content type) của metrics đã cộng dồn từ mọi worker"""
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,115 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import metrics
+from .query_budget import Budget, QueryBudgetExceeded, QueryRecorder, get_budget
+
+logger = logging.getLogger('monitoring.query_budget')
+
+KNOWN_METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+
+class QueryBudgetMiddleware:
+    """
+    Đếm truy vấn và thời gian database của mỗi request, so với ngân sách của
+    view. Vượt ngân sách hoặc có N+1 thì ghi log, hoặc raise
+    QueryBudgetExceeded nếu settings.QUERY_BUDGET_RAISE (dùng khi test).
+
+    Đặt trước SessionMiddleware để tính cả truy vấn session/user, và sau
+    ReplicaMiddleware để lần chạy lại trên primary có ngân sách riêng.
+    Response dạng stream chỉ được tính phần chạy trước khi trả về.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.enabled = getattr(settings, 'QUERY_BUDGET_ENABLED', settings.DEBUG)
+        self.raise_errors = getattr(settings, 'QUERY_BUDGET_RAISE', False)
+        default = getattr(settings, 'QUERY_BUDGET_DEFAULT', None)
+        self.default_budget = Budget(default) if default is not None else None
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+        return self.check(request, response, recorder)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        with QueryRecorder() as recorder:
+            response = await self.get_response(request)
+        return self.check(request, response, recorder)
+
+    def check(self, request, response, recorder):
+        response['Server-Timing'] = f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries"'
+
+        match = getattr(request, 'resolver_match', None)
+        budget = get_budget(match) or self.default_budget
+        if budget is None:
+            return response
+        problems = recorder.problems(budget)
+        if problems:
+            view_name = match.view_name if match else request.path
+            message = f'{view_name}: ' + '; '.join(problems)
+            if self.raise_errors:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message, extra={
+                'view_name': view_name,
+                'query_count': recorder.count,
+                'db_time': recorder.duration,
+            })
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Ghi latency, số truy vấn và thời gian database của mỗi request vào
+    monitoring.metrics. Đặt đầu tiên trong MIDDLEWARE để đo cả các middleware khác.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        start = time.perf_counter()
+        with QueryRecorder(track_shapes=False) as recorder:
+            response = self.get_response(request)
+        return self.observe(request, response, start, recorder)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        with QueryRecorder(track_shapes=False) as recorder:
+            response = await self.get_response(request)
+        return self.observe(request, response, start, recorder)
+
+    @staticmethod
+    def observe(request, response, start, recorder):
+        method = request.method if request.method in KNOWN_METHODS else 'OTHER'
+        metrics.observe_request(
+            metrics.view_label(request), method, response.status_code,
+            time.perf_counter() - start, recorder.count, recorder.duration,
+        )
+        return response
@@ -0,0 +1,135 @@
+"""
+Ngân sách truy vấn (query budget) cho từng view và phát hiện N+1.
+
+QueryRecorder đếm số truy vấn,
+tổng thời gian và gom các câu SQL theo "hình dạng" (SQL đã bỏ tham số, danh
+sách IN được rút gọn). Cùng một hình dạng chạy nhiều lần trong một request
+thường là dấu hiệu của N+1 (ví dụ truy cập course.category trong vòng lặp).
+
+Ngân sách được khai báo ngay cạnh view bằng decorator:
+
+    @query_budget(8)
+    def course_list(request):
+        ...
+
+hoặc theo tên URL trong settings.QUERY_BUDGETS (dùng cho view của bên thứ ba
+như admin). QueryBudgetMiddleware kiểm tra ngân sách sau mỗi request.
+"""
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from django.conf import settings
+
+# Số lần lặp lại của cùng một hình dạng SQL được coi là N+1
+DEFAULT_DUPLICATE_LIMIT = 3
+
+_IN_LIST_RE = re.compile(r'\((?:%s,\s*)+%s\)')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def sql_shape(sql):
+    """SQL đã bỏ tham số; IN (%s, %s, ...) được rút gọn để so sánh các truy vấn"""
+    sql = _IN_LIST_RE.sub('(%s, ...)', sql)
+    return _WHITESPACE_RE.sub(' ', sql).strip()
+
+
+@dataclass(frozen=True)
+class Budget:
+    max_queries: int
+    max_duplicates: int = DEFAULT_DUPLICATE_LIMIT
+
+
+def query_budget(max_queries, max_duplicates=DEFAULT_DUPLICATE_LIMIT):
+    """Khai báo số truy vấn tối đa của một view (tính cả session/user của middleware)"""
+    def decorator(view_func):
+        view_func.query_budget = Budget(max_queries, max_duplicates)
+        return view_func
+    return decorator
+
+
+def get_budget(resolver_match):
+    """Ngân sách của view ứng với resolver_match, None nếu không khai báo"""
+    if resolver_match is None:
+        return None
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    if resolver_match.view_name in budgets:
+        value = budgets[resolver_match.view_name]
+        return value if isinstance(value, Budget) else Budget(value)
+    func = resolver_match.func
+    # View dạng class: decorator được đặt trên class
+    return getattr(func, 'query_budget', None) or getattr(getattr(func, 'view_class', None), 'query_budget', None)
+
+
+@dataclass
+class QueryRecorder:
+    """Ghi lại các truy vấn chạy trong khối `with`"""
+    count: int = 0
+    duration: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+    track_shapes: bool = True
+    _token: object = field(default=None, repr=False)
+
+    def __enter__(self):
+        self._token = _active_recorders.set(_active_recorders.get() + (self,))
+        return self
+
+    def __exit__(self, *exc_info):
+        _active_recorders.reset(self._token)
+
+    def record(self, sql, duration):
+        self.duration += duration
+        self.count += 1
+        if self.track_shapes:
+            self.shapes[sql_shape(sql)] += 1
+
+    def duplicates(self, limit=DEFAULT_DUPLICATE_LIMIT):
+        """Các hình dạng SQL lặp lại nhiều hơn `limit` lần: [(sql, số lần), ...]"""
+        return [(sql, n) for sql, n in self.shapes.most_common() if n > limit]
+
+    def problems(self, budget):
+        """Danh sách vi phạm ngân sách `budget` (rỗng nếu đạt)"""
+        problems = []
+        if self.count > budget.max_queries:
+            problems.append(f'{self.count} truy vấn (ngân sách {budget.max_queries})')
+        for sql, n in self.duplicates(budget.max_duplicates):
+            problems.append(f'N+1: {n} lần {sql[:200]}')
+        return problems
+
+    def check(self, budget, label=''):
+        problems = self.problems(budget)
+        if problems:
+            prefix = f'{label}: ' if label else ''
+            raise QueryBudgetExceeded(prefix + '; '.join(problems))
+
+
+# Các QueryRecorder đang mở. Dùng ContextVar thay vì gắn execute_wrapper vào
+# kết nối khi vào khối `with`: kết nối của Django là riêng cho từng thread,
+# còn view async chạy truy vấn trong thread của sync_to_async, nơi context
+# (và do đó recorder của request) được sao chép sang.
+_active_recorders = ContextVar('query_recorders', default=())
+
+
+def _record_queries(execute, sql, params, many, context):
+    recorders = _active_recorders.get()
+    if not recorders:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start
+        for recorder in recorders:
+            recorder.record(sql, duration)
+
+
+def install_query_hook(sender, connection, **kwargs):
+    """Nối vào signal connection_created (MonitoringConfig.ready)"""
+    if _record_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _record_queries)
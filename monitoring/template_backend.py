@@ -0,0 +1,37 @@
+"""
+Template backend Django có đo thời gian render (monitoring.metrics).
+
+Dùng thay cho django.template.backends.django.DjangoTemplates trong
+settings.TEMPLATES; chỉ template được render trực tiếp (render(),
+TemplateResponse) được đo, {% include %} tính vào template cha.
+"""
+import time
+
+from django.template.backends.django import DjangoTemplates
+
+from . import metrics
+
+
+class InstrumentedTemplate:
+
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            metrics.observe_template(self.template.origin.template_name, time.perf_counter() - start)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return InstrumentedTemplate(super().get_template(template_name))
@@ -0,0 +1,42 @@
+"""
+Trợ giúp cho test: kiểm tra số truy vấn của một request theo ngân sách đã
+khai báo cạnh view.
+
+    from monitoring.testing import assert_within_budget
+
+    class CourseViewsTest(TestCase):
+        def test_course_list_budget(self):
+            assert_within_budget(self.client, reverse('course_list'))
+
+    with assert_max_queries(5):
+        grade_quiz(quiz.id)
+"""
+from contextlib import contextmanager
+
+from django.urls import resolve
+
+from .query_budget import Budget, DEFAULT_DUPLICATE_LIMIT, QueryRecorder, get_budget
+
+
+def assert_within_budget(client, path, method='get', budget=None, **kwargs):
+    """
+    Gửi request bằng test client và raise QueryBudgetExceeded nếu vượt ngân
+    sách của view (hoặc `budget` truyền vào). Trả về response.
+    """
+    match = resolve(path.split('?')[0])
+    budget = budget or get_budget(match)
+    if budget is None:
+        raise AssertionError(f'{match.view_name} chưa khai báo query_budget')
+    with QueryRecorder() as recorder:
+        response = getattr(client, method)(path, **kwargs)
+    recorder.check(budget, label=match.view_name)
+    return response
+
+
+@contextmanager
+def assert_max_queries(max_queries, max_duplicates=DEFAULT_DUPLICATE_LIMIT):
+    """Khối code bên trong không được chạy quá `max_queries` truy vấn hoặc có N+1"""
+    with QueryRecorder() as recorder:
+        yield recorder
+    recorder.check(Budget(max_queries, max_duplicates))
+
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+from .metrics import render_metrics
+
+# Header nginx thêm khi proxy (nginx-lms-*.conf): request có các header này đi
+# qua nginx, REMOTE_ADDR khi đó luôn là 127.0.0.1 nên không dùng để lọc được
+PROXY_HEADERS = ('HTTP_X_FORWARDED_FOR', 'HTTP_X_REAL_IP')
+
+
+def metrics(request):
+    """Metrics Prometheus của mọi worker (chỉ cho Prometheus scrape thẳng gunicorn)"""
+    if not _scrape_allowed(request):
+        return HttpResponseForbidden()
+    body, content_type = render_metrics()
+    return HttpResponse(body, content_type=content_type)
+
+
+def _scrape_allowed(request):
+    if any(header in request.META for header in PROXY_HEADERS):
+        return False
+    allowed_ips = getattr(settings, 'METRICS_ALLOWED_IPS', None)
+    if allowed_ips and request.META.get('REMOTE_ADDR') not in allowed_ips:
+        return False
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token:
+        return constant_time_compare(request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}')
+    return True
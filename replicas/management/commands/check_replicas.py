@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from replicas.routing import check_replica, replica_aliases
+
+
+class Command(BaseCommand):
+    help = 'Kiểm tra kết nối và độ trễ replication của các replica trong settings.DATABASE_REPLICAS'
+
+    def handle(self, *args, **options):
+        aliases = replica_aliases()
+        if not aliases:
+            self.stdout.write('Chưa cấu hình replica (settings.DATABASE_REPLICAS)')
+            return
+        failed = []
+        for alias in aliases:
+            healthy, lag, error = check_replica(alias)
+            detail = error or f'trễ {lag if lag is not None else "?"}s'
+            if healthy:
+                self.stdout.write(self.style.SUCCESS(f'{alias}: khỏe ({detail})'))
+            else:
+                self.stdout.write(self.style.ERROR(f'{alias}: không khỏe ({detail})'))
+                failed.append(alias)
+        if failed:
+            raise CommandError(f'Replica không khỏe: {", ".join(failed)}')
@@ -0,0 +1,88 @@
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, InterfaceError
+
+from . import routing
+
+logger = logging.getLogger('replicas')
+
+SAFE_METHODS = {'GET', 'HEAD', 'OPTIONS', 'TRACE'}
+
+
+class ReplicaMiddleware:
+    """
+    Mở phạm vi định tuyến (replicas.routing) cho mỗi request và ghim trình
+    duyệt vào primary REPLICA_PIN_SECONDS giây sau request có ghi.
+
+    Đặt trước SessionMiddleware để lần lưu session (ví dụ khi đăng nhập)
+    cũng được tính là ghi.
+
+    Request an toàn (GET...) chưa ghi gì mà hỏng vì replica lỗi giữa chừng
+    được chạy lại một lần trên primary thay vì trả về 500; vì vậy đặt trước
+    QueryBudgetMiddleware để lần chạy hỏng không bị tính vào ngân sách.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not routing.replica_aliases():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with routing.request_scope(request, pinned=self.is_pinned(request)) as state:
+            response = self.get_response(request)
+        if self.should_retry(request, state):
+            with routing.request_scope(request, pinned=True) as state:
+                response = self.get_response(request)
+        return self.pin(request, response, state)
+
+    async def __acall__(self, request):
+        with routing.request_scope(request, pinned=self.is_pinned(request)) as state:
+            response = await self.get_response(request)
+        if self.should_retry(request, state):
+            with routing.request_scope(request, pinned=True) as state:
+                response = await self.get_response(request)
+        return self.pin(request, response, state)
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, (DatabaseError, InterfaceError)):
+            return
+        state = routing.current_state()
+        # Lỗi không cho biết đến từ kết nối nào: kiểm tra lại ngay các replica
+        # request đã dùng. Replica còn khỏe thì lỗi là của primary (chờ khóa,
+        # deadlock...) hoặc của chính truy vấn, không đánh dấu replica hỏng.
+        for alias in state.used if state else ():
+            healthy, lag, error = routing.check_replica(alias)
+            if not healthy:
+                logger.warning('Replica %s lỗi giữa request %s: %s', alias, request.path, error or f'trễ {lag}s')
+                routing.mark_unhealthy(alias)
+                state.replica_failed = True
+
+    @staticmethod
+    def should_retry(request, state):
+        return state.replica_failed and not state.wrote and request.method in SAFE_METHODS
+
+    @staticmethod
+    def is_pinned(request):
+        return settings.REPLICA_PIN_COOKIE in request.COOKIES
+
+    @staticmethod
+    def pin(request, response, state):
+        if state.wrote or request.method not in SAFE_METHODS:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+                secure=settings.SESSION_COOKIE_SECURE,
+            )
+        return response
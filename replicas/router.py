@@ -0,0 +1,23 @@
+from django.db import DEFAULT_DB_ALIAS
+
+from . import routing
+
+
+class ReplicaRouter:
+    """
+    Ghi luôn vào primary; đọc theo routing.read_alias(). Bản sao dùng chung
+    schema với primary nên quan hệ giữa các object ở primary/replica là hợp lệ.
+    """
+
+    def db_for_read(self, model, **hints):
+        return routing.read_alias()
+
+    def db_for_write(self, model, **hints):
+        routing.record_write()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *routing.replica_aliases()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
@@ -0,0 +1,224 @@
+"""
+Chọn database cho truy vấn đọc: primary ('default') hay một replica.
+
+Chỉ các view được đánh dấu @replica_reads (danh mục khóa học, bài học,
+dashboard) mới đọc từ replica, và chỉ khi:
+
+- request không bị "ghim" vào primary: trong REPLICA_PIN_SECONDS sau một
+  request có ghi (POST, hoặc GET có ghi database) trình duyệt gửi cookie
+  REPLICA_PIN_COOKIE, để người vừa đăng ký khóa học đọc lại được chính dữ
+  liệu mình vừa ghi dù replica còn trễ,
+- request chưa ghi gì (sau lần ghi đầu tiên mọi truy vấn đọc về primary),
+- không ở trong transaction.atomic() trên primary,
+- có replica khỏe: kết nối được, đã có mọi migration của code đang chạy và
+  độ trễ replication không quá REPLICA_MAX_LAG_SECONDS. Kết quả kiểm tra được
+  nhớ REPLICA_HEALTH_CHECK_INTERVAL giây trong mỗi process; replica lỗi giữa
+  chừng bị đánh dấu hỏng ngay và request được chạy lại trên primary (xem
+  ReplicaMiddleware).
+
+Mỗi request chỉ dùng một replica để các truy vấn thấy cùng một trạng thái.
+Trạng thái request nằm trong ContextVar nên view async (truy vấn chạy trong
+thread của sync_to_async) cũng dùng được.
+"""
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger('replicas')
+
+_request_state = ContextVar('replica_request_state', default=None)
+_force_primary = ContextVar('replica_force_primary', default=False)
+
+# alias -> (thời điểm kiểm tra theo time.monotonic(), còn khỏe)
+_health = {}
+
+
+def replica_reads(view_func):
+    """Cho phép truy vấn đọc của view đi tới replica"""
+    view_func.replica_reads = True
+    return view_func
+
+
+def replica_aliases():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+@dataclass
+class RequestState:
+    request: object
+    pinned: bool = False
+    wrote: bool = False
+    replica: str = None
+    used: set = field(default_factory=set)
+    replica_failed: bool = False
+
+    @property
+    def replica_reads(self):
+        # resolver_match có trước khi view chạy; truy vấn của middleware chạy
+        # trước đó luôn đi primary
+        match = getattr(self.request, 'resolver_match', None)
+        return match is not None and getattr(match.func, 'replica_reads', False)
+
+
+def current_state():
+    return _request_state.get()
+
+
+@contextmanager
+def request_scope(request, pinned=False):
+    state = RequestState(request, pinned=pinned)
+    token = _request_state.set(state)
+    try:
+        yield state
+    finally:
+        _request_state.reset(token)
+
+
+@contextmanager
+def primary():
+    """Mọi truy vấn đọc trong khối đi primary (ví dụ khi dựng lại cache)"""
+    token = _force_primary.set(True)
+    try:
+        yield
+    finally:
+        _force_primary.reset(token)
+
+
+def read_alias():
+    """Alias database cho truy vấn đọc hiện tại"""
+    state = _request_state.get()
+    if state is None or state.pinned or state.wrote or _force_primary.get():
+        return DEFAULT_DB_ALIAS
+    if not state.replica_reads or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return DEFAULT_DB_ALIAS
+    if state.replica is None:
+        state.replica = choose_replica() or DEFAULT_DB_ALIAS
+    if state.replica != DEFAULT_DB_ALIAS:
+        state.used.add(state.replica)
+    return state.replica
+
+
+def record_write():
+    state = _request_state.get()
+    if state is not None:
+        state.wrote = True
+
+
+def choose_replica():
+    """Một replica khỏe ngẫu nhiên, None nếu không có"""
+    candidates = replica_aliases()
+    random.shuffle(candidates)
+    for alias in candidates:
+        if is_healthy(alias):
+            return alias
+    return None
+
+
+def is_healthy(alias):
+    now = time.monotonic()
+    checked = _health.get(alias)
+    if checked is not None and now - checked[0] < settings.REPLICA_HEALTH_CHECK_INTERVAL:
+        return checked[1]
+    healthy, lag, error = check_replica(alias)
+    if not healthy:
+        logger.warning('Replica %s không khỏe: %s', alias, error or f'trễ {lag}s')
+    _health[alias] = (now, healthy)
+    return healthy
+
+
+def mark_unhealthy(alias):
+    _health[alias] = (time.monotonic(), False)
+
+
+def check_replica(alias):
+    """
+    Kiểm tra kết nối, schema và độ trễ replication. Trả về (khỏe, độ trễ giây
+    hoặc None nếu không biết, lỗi).
+    """
+    connection = connections[alias]
+    try:
+        with raw_cursor(connection) as cursor:
+            missing = missing_migrations(connection, cursor)
+            lag = _query_lag(connection, cursor)
+    except DatabaseError as exc:
+        connection.close()
+        return False, None, str(exc)
+    if missing:
+        names = ', '.join(f'{app}.{name}' for app, name in sorted(missing))
+        return False, lag, f'thiếu migration {names}'
+    max_lag = settings.REPLICA_MAX_LAG_SECONDS
+    if max_lag is not None and (lag is None or lag > max_lag):
+        return False, lag, None
+    return True, lag, None
+
+
+@contextmanager
+def raw_cursor(connection):
+    """
+    Cursor thô của driver: truy vấn kiểm tra không đi qua execute_wrappers
+    nên không bị tính vào ngân sách truy vấn của request
+    """
+    connection.ensure_connection()
+    with connection.wrap_database_errors:
+        cursor = connection.connection.cursor()
+    try:
+        yield cursor
+    finally:
+        cursor.close()
+
+
+@lru_cache(maxsize=None)
+def expected_migrations():
+    """Migration cuối của mỗi app theo code đang chạy"""
+    from django.db.migrations.loader import MigrationLoader
+
+    return frozenset(MigrationLoader(None, ignore_no_migrations=True).graph.leaf_nodes())
+
+
+def missing_migrations(connection, cursor):
+    """
+    Các migration của code chưa có trên replica (file replica trống, hay
+    replica chưa nhận schema mới sau deploy): đọc từ replica đó sẽ lỗi.
+    """
+    with connection.wrap_database_errors:
+        cursor.execute('SELECT app, name FROM django_migrations')
+        applied = {tuple(row) for row in cursor.fetchall()}
+    return expected_migrations() - applied
+
+
+def _query_lag(connection, cursor):
+    """Độ trễ replication (giây) của replica, None nếu replication đã dừng"""
+    if connection.vendor == 'mysql':
+        try:
+            with connection.wrap_database_errors:
+                cursor.execute('SHOW REPLICA STATUS')
+            column = 'Seconds_Behind_Source'
+        except DatabaseError:
+            # MySQL < 8.0.22 / MariaDB
+            with connection.wrap_database_errors:
+                cursor.execute('SHOW SLAVE STATUS')
+            column = 'Seconds_Behind_Master'
+        row = cursor.fetchone()
+        if row is None:
+            # Không phải replica (ví dụ môi trường dev trỏ về cùng server)
+            return 0
+        columns = [col[0] for col in cursor.description]
+        return row[columns.index(column)]
+    with connection.wrap_database_errors:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT CASE WHEN pg_is_in_recovery() '
+                'THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) '
+                'ELSE 0 END'
+            )
+            return float(cursor.fetchone()[0])
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+    return 0
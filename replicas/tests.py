@@ -0,0 +1,141 @@
+import os
+import sqlite3
+import tempfile
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connection, connections
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TransactionTestCase
+
+from lms_courses.models import Course
+
+from . import routing
+from .middleware import ReplicaMiddleware
+
+REPLICA = 'test_replica'
+
+
+@skipUnless(connection.vendor == 'sqlite', 'replica thử là bản chép của database test SQLite')
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Replica là một file SQLite thứ hai, "replication" bằng cách chép database
+    test (như hướng dẫn trong SETUP.md). TransactionTestCase vì trong
+    transaction.atomic() mọi truy vấn đọc đều đi primary.
+    """
+
+    def setUp(self):
+        self.instructor = User.objects.create_user('instructor', password='pw')
+        self.student = User.objects.create_user('student', password='pw')
+        self.old_course = self.course('Khóa đã sao chép')
+
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        self.replica_path = os.path.join(directory, 'replica.sqlite3')
+        self.add_replica_alias()
+        self.replicate()
+        self.new_course = self.course('Khóa chỉ có ở primary')
+
+        self.enterContext(self.settings(DATABASE_REPLICAS=[REPLICA]))
+        routing._health.clear()
+        self.addCleanup(routing._health.clear)
+
+    def course(self, title):
+        return Course.objects.create(title=title, description='', instructor=self.instructor, status='published')
+
+    def add_replica_alias(self):
+        # Alias thêm sau setUpClass nên không bị chặn như database ngoài `databases`
+        databases = {DEFAULT_DB_ALIAS: dict(connections.settings[DEFAULT_DB_ALIAS])}
+        databases[REPLICA] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': self.replica_path}
+        connections.settings[REPLICA] = connections.configure_settings(databases)[REPLICA]
+        self.addCleanup(self.remove_replica_alias)
+
+    def remove_replica_alias(self):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+
+    def replicate(self):
+        """Chép toàn bộ primary sang file replica"""
+        connections[REPLICA].close()
+        connection.ensure_connection()
+        target = sqlite3.connect(self.replica_path)
+        try:
+            connection.connection.backup(target)
+        finally:
+            target.close()
+
+    def titles(self, client, url='/courses/'):
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return {course.title for course in response.context['courses']}
+
+    def test_replica_reads_views_read_from_replica(self):
+        self.assertEqual(self.titles(Client()), {self.old_course.title})
+        self.assertEqual(routing._health, {REPLICA: (routing._health[REPLICA][0], True)})
+
+        self.replicate()
+        self.assertEqual(self.titles(Client()), {self.old_course.title, self.new_course.title})
+
+    def test_pinned_to_primary_after_post(self):
+        client = Client()
+        client.force_login(self.student)
+        self.assertEqual(self.titles(client), {self.old_course.title})
+
+        response = client.post(f'/course/{self.new_course.pk}/enroll/')
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('lms_primary', response.cookies)
+        self.assertEqual(self.titles(client), {self.old_course.title, self.new_course.title})
+
+        # Hết thời gian ghim (cookie hết hạn): lại đọc replica
+        del client.cookies['lms_primary']
+        self.assertEqual(self.titles(client), {self.old_course.title})
+
+    def test_safe_request_without_write_is_not_pinned(self):
+        response = Client().get('/courses/')
+        self.assertNotIn('lms_primary', response.cookies)
+
+    def test_missing_replica_falls_back_to_primary(self):
+        connections[REPLICA].close()
+        os.remove(self.replica_path)
+        with self.assertLogs('replicas', 'WARNING'):
+            titles = self.titles(Client())
+        self.assertEqual(titles, {self.old_course.title, self.new_course.title})
+        self.assertFalse(routing._health[REPLICA][1])
+
+    def test_replica_missing_migrations_falls_back_to_primary(self):
+        with sqlite3.connect(self.replica_path) as replica:
+            replica.execute("DELETE FROM django_migrations WHERE app = 'lms_courses'")
+        healthy, _, error = routing.check_replica(REPLICA)
+        self.assertFalse(healthy)
+        self.assertIn('thiếu migration lms_courses.', error)
+        with self.assertLogs('replicas', 'WARNING'):
+            self.assertEqual(self.titles(Client()), {self.old_course.title, self.new_course.title})
+
+    def test_get_retried_on_primary_when_replica_fails_mid_request(self):
+        client = Client(raise_request_exception=False)
+        self.assertEqual(self.titles(client), {self.old_course.title})
+
+        # Replica hỏng trong lúc kết quả kiểm tra sức khỏe vẫn còn được nhớ
+        connections[REPLICA].close()
+        os.remove(self.replica_path)
+        with self.assertLogs('replicas', 'WARNING') as logs:
+            titles = self.titles(client)
+        self.assertEqual(titles, {self.old_course.title, self.new_course.title})
+        self.assertIn('lỗi giữa request /courses/', logs.output[0])
+        self.assertFalse(routing._health[REPLICA][1])
+
+    def test_primary_error_does_not_mark_replica_down(self):
+        def view(request):
+            routing.current_state().used.add(REPLICA)
+            raise OperationalError('database is locked')
+
+        request = RequestFactory().get('/courses/')
+        middleware = ReplicaMiddleware(lambda request: HttpResponse())
+        with routing.request_scope(request) as state:
+            try:
+                view(request)
+            except OperationalError as exc:
+                middleware.process_exception(request, exc)
+        self.assertFalse(state.replica_failed)
+        self.assertNotIn(REPLICA, routing._health)
+        self.assertFalse(ReplicaMiddleware.should_retry(request, state))
@@ -0,0 +1,28 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from thumbnails.pipeline import _registry, generate_variants
+from thumbnails.tasks import generate_variants_job
+
+
+class Command(BaseCommand):
+    help = 'Dựng ảnh thu nhỏ cho các ảnh chưa có (hoặc tất cả với --force)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true')
+        parser.add_argument('--sync', action='store_true', help='Dựng ngay thay vì đưa vào hàng đợi')
+
+    def handle(self, *args, **options):
+        total = 0
+        for label, (field_name, variants_field, _) in _registry.items():
+            model = apps.get_model(label)
+            rows = model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+            for pk, name, variants in rows.values_list('pk', field_name, variants_field).iterator():
+                if not options['force'] and (variants or {}).get('source') == name:
+                    continue
+                if options['sync']:
+                    generate_variants(label, pk, name)
+                else:
+                    generate_variants_job.delay(model=label, pk=pk, source=name)
+                total += 1
+        self.stdout.write(self.style.SUCCESS(f'Đã xử lý {total} ảnh'))
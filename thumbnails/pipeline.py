@@ -0,0 +1,136 @@
+"""
+Sinh ảnh thu nhỏ (WebP + JPEG) cho ImageField.
+
+Mỗi app đăng ký trường ảnh bằng register(); khi ảnh gốc thay đổi, một job nền
+được tạo để dựng các kích thước, song song trong một process pool. Ảnh
+được lưu cạnh ảnh gốc (`ten__w320.webp`, `ten__w320.jpg`) và danh sách kích
+thước đã dựng được ghi vào trường JSON `variants_field` của model, nên template
+không cần truy vấn thêm hay kiểm tra file khi hiển thị.
+
+Process pool dùng start method forkserver: process con không được fork từ
+worker đang có nhiều luồng, kết nối database và lock của logging (fork lúc
+đó có thể deadlock). run_jobs tạo pool ở luồng chính khi khởi động
+(signal worker_started).
+"""
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models.signals import post_save
+
+FORMATS = (
+    ('webp', 'WEBP', 'image/webp'),
+    ('jpg', 'JPEG', 'image/jpeg'),
+)
+QUALITY = {'WEBP': 80, 'JPEG': 82}
+POOL_SIZE = 2
+
+_registry = {}
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def register(model, field_name, variants_field, widths):
+    """Đăng ký trường ảnh cần sinh ảnh thu nhỏ"""
+    key = model._meta.label
+    _registry[key] = (field_name, variants_field, tuple(sorted(widths)))
+    post_save.connect(_on_save, sender=model, dispatch_uid=f'thumbnails:{key}')
+
+
+def variant_name(name, width, extension):
+    root, _ = os.path.splitext(name)
+    return f'{root}__w{width}.{extension}'
+
+
+def _on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    field_name, variants_field, _ = _registry[sender._meta.label]
+    image = getattr(instance, field_name)
+    variants = getattr(instance, variants_field) or {}
+    if not image:
+        if variants:
+            sender.objects.filter(pk=instance.pk).update(**{variants_field: {}})
+        return
+    if variants.get('source') == image.name:
+        return
+
+    from .tasks import generate_variants_job
+    transaction.on_commit(lambda: generate_variants_job.delay(
+        model=sender._meta.label, pk=instance.pk, source=image.name,
+    ))
+
+
+def start_pool():
+    """Tạo process pool (nếu chưa có); gọi từ luồng chính khi worker khởi động"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            context = multiprocessing.get_context(
+                'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            )
+            _pool = ProcessPoolExecutor(max_workers=POOL_SIZE, mp_context=context)
+        return _pool
+
+
+def _get_pool():
+    return _pool or start_pool()
+
+
+def render_variant(data, width, pil_format):
+    """Thu nhỏ ảnh về chiều rộng `width` (chạy trong process con)"""
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        if pil_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height), Image.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, pil_format, quality=QUALITY[pil_format], optimize=True)
+        return output.getvalue()
+
+
+def generate_variants(model_label, pk, source):
+    """Dựng ảnh thu nhỏ cho một bản ghi, trả về danh sách chiều rộng đã dựng"""
+    from PIL import Image
+
+    model = apps.get_model(model_label)
+    field_name, variants_field, widths = _registry[model_label]
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return []
+    image = getattr(instance, field_name)
+    if not image or image.name != source:
+        # Ảnh đã bị thay tiếp; job của ảnh mới sẽ xử lý
+        return []
+
+    storage = image.storage
+    with storage.open(image.name, 'rb') as original:
+        data = original.read()
+    with Image.open(io.BytesIO(data)) as probe:
+        original_width = probe.width
+    targets = [w for w in widths if w < original_width] or [min(original_width, widths[0])]
+
+    pool = _get_pool()
+    futures = {
+        (width, extension): pool.submit(render_variant, data, width, pil_format)
+        for width in targets
+        for extension, pil_format, _ in FORMATS
+    }
+    for (width, extension), future in futures.items():
+        name = variant_name(image.name, width, extension)
+        if storage.exists(name):
+            storage.delete(name)
+        storage.save(name, ContentFile(future.result()))
+
+    model.objects.filter(pk=pk).update(**{
+        variants_field: {'source': image.name, 'widths': targets},
+    })
+    return targets
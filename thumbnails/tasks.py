@@ -0,0 +1,16 @@
+from django.dispatch import receiver
+
+from jobs.registry import job
+from jobs.signals import worker_started
+
+from .pipeline import generate_variants, start_pool
+
+
+@job('thumbnails.generate_variants')
+def generate_variants_job(model, pk, source):
+    generate_variants(model, pk, source)
+
+
+@receiver(worker_started)
+def start_thumbnail_pool(sender, **kwargs):
+    start_pool()
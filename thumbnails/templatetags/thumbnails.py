@@ -0,0 +1,40 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from ..pipeline import FORMATS, variant_name
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(image, variants, alt='', sizes='100vw', **attrs):
+    """
+    <picture> với srcset WebP/JPEG từ ảnh thu nhỏ đã dựng; nếu chưa có thì
+    dùng ảnh gốc.
+
+        {% responsive_image course.thumbnail course.thumbnail_variants alt=course.title sizes="400px" class="card-img-top" %}
+    """
+    if not image:
+        return ''
+    attributes = format_html_join(' ', '{}="{}"', sorted(attrs.items()))
+    variants = variants or {}
+    widths = variants.get('widths') if variants.get('source') == image.name else None
+    if not widths:
+        return format_html('<img src="{}" alt="{}" loading="lazy" {}>', image.url, alt, attributes)
+
+    storage = image.storage
+    sources = []
+    fallback = None
+    for extension, _, mime_type in FORMATS:
+        srcset = ', '.join(
+            f'{storage.url(variant_name(image.name, width, extension))} {width}w' for width in widths
+        )
+        if extension == 'jpg':
+            fallback = (storage.url(variant_name(image.name, widths[-1], extension)), srcset)
+        else:
+            sources.append(format_html('<source type="{}" srcset="{}" sizes="{}">', mime_type, srcset, sizes))
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" alt="{}" loading="lazy" {}></picture>',
+        format_html_join('', '{}', ((source,) for source in sources)),
+        fallback[0], fallback[1], sizes, alt, attributes,
+    )
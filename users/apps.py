@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from thumbnails.pipeline import register
+        from . import signals  # noqa: F401
+        from .models import Profile
+
+        register(Profile, 'avatar', 'avatar_variants', widths=(64, 150, 300))
@@ -0,0 +1,11 @@
+from django.contrib.auth.backends import ModelBackend
+
+from .user_cache import get_cached_user
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend tải user đã đăng nhập từ cache (users.user_cache)"""
+
+    def get_user(self, user_id):
+        user = get_cached_user(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
@@ -6,6 +6,7 @@ class Profile(models.Model):
     """Mở rộng User model với thông tin bổ sung"""
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     avatar = models.ImageField(upload_to='avatars/', blank=True, null=True)
+    avatar_variants = models.JSONField(default=dict, blank=True, editable=False)
     phone = models.CharField(max_length=15, blank=True)
     address = models.TextField(blank=True)
     bio = models.TextField(max_length=500, blank=True)
@@ -0,0 +1,89 @@
+"""
+Session engine đọc từ cache, ghi database theo kiểu write-behind
+(SESSION_ENGINE = 'users.sessions').
+
+Giống django.contrib.sessions.backends.cached_db ở đường đọc: session có
+trong cache thì không truy vấn django_session. Khác ở đường ghi: cached_db
+ghi database mỗi lần session thay đổi, còn ở đây cache luôn được cập nhật
+nhưng database chỉ được ghi khi
+
+- tạo session mới (đăng nhập, cycle_key),
+- thông tin đăng nhập trong session đổi (user, backend, hash mật khẩu),
+- bản trong database đã cũ hơn SESSION_DB_WRITE_INTERVAL giây.
+
+Các thay đổi khác (ví dụ messages tràn khỏi cookie) chỉ nằm trong cache cho
+tới lần ghi database kế tiếp; nếu cache mất entry trước đó, session quay về
+bản trong database, nhiều nhất cũ SESSION_DB_WRITE_INTERVAL giây. Đăng xuất
+xóa ở cả hai nơi ngay lập tức.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+
+from replicas.routing import primary
+
+KEY_PREFIX = 'lms.sessions.'
+AUTH_KEYS = (SESSION_KEY, BACKEND_SESSION_KEY, HASH_SESSION_KEY)
+
+# Session tạo trước khi dùng CachedModelBackend vẫn giữ đăng nhập
+LEGACY_BACKENDS = {
+    'django.contrib.auth.backends.ModelBackend': 'users.backends.CachedModelBackend',
+}
+
+
+def _auth_state(data):
+    return tuple(data.get(key) for key in AUTH_KEYS)
+
+
+class SessionStore(CachedDBStore):
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        # (thời điểm ghi database gần nhất, thông tin đăng nhập đã ghi)
+        self._persisted = None
+
+    def load(self):
+        try:
+            entry = self._cache.get(self.cache_key)
+        except Exception:
+            # Một số backend raise với key không hợp lệ, coi như không có session
+            entry = None
+        if entry is not None:
+            self._persisted = entry['persisted']
+            return entry['data']
+
+        # Cache dùng chung nên nạp từ primary, không từ replica còn trễ
+        with primary():
+            s = self._get_session_from_db()
+        if not s:
+            self._persisted = None
+            return {}
+        data = self.decode(s.session_data)
+        backend = LEGACY_BACKENDS.get(data.get(BACKEND_SESSION_KEY))
+        if backend in settings.AUTHENTICATION_BACKENDS:
+            data[BACKEND_SESSION_KEY] = backend
+        self._persisted = (time.time(), _auth_state(data))
+        self._cache_set(data, self.get_expiry_age(expiry=s.expire_date))
+        return data
+
+    def save(self, must_create=False):
+        data = self._get_session(no_load=must_create)
+        if must_create or self._needs_db_write(data):
+            DBStore.save(self, must_create)
+            self._persisted = (time.time(), _auth_state(data))
+        self._cache_set(data, self.get_expiry_age())
+
+    def _needs_db_write(self, data):
+        if self._persisted is None:
+            return True
+        persisted_at, auth_state = self._persisted
+        if auth_state != _auth_state(data):
+            return True
+        return time.time() - persisted_at >= settings.SESSION_DB_WRITE_INTERVAL
+
+    def _cache_set(self, data, timeout):
+        self._cache.set(self.cache_key, {'data': data, 'persisted': self._persisted}, timeout)
@@ -1,3 +1,192 @@
-from django.test import TestCase
+import datetime
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.contrib.sessions.models import Session
+from django.test import TestCase, override_settings
+
+from . import sessions
+from .models import Profile
+from .sessions import SessionStore
+from .user_cache import get_cached_user
+
+# Cache riêng cho mỗi test thay vì Redis dùng chung
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+BACKEND = 'users.backends.CachedModelBackend'
+
+
+@override_settings(CACHES=LOCMEM_CACHES, SESSION_DB_WRITE_INTERVAL=300)
+class SessionStoreTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('student', password='pw')
+        Profile.objects.create(user=self.user)
+        self.other = User.objects.create_user('other', password='pw')
+
+    def login_session(self, user, backend=BACKEND):
+        store = SessionStore()
+        store[SESSION_KEY] = str(user.pk)
+        store[BACKEND_SESSION_KEY] = backend
+        store[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        store.create()
+        return store.session_key
+
+    def db_data(self, session_key):
+        return DBStore().decode(Session.objects.get(pk=session_key).session_data)
+
+    def test_db_written_on_create(self):
+        session_key = self.login_session(self.user)
+        self.assertEqual(self.db_data(session_key)[SESSION_KEY], str(self.user.pk))
+
+    def test_other_changes_only_go_to_cache(self):
+        session_key = self.login_session(self.user)
+        store = SessionStore(session_key)
+        store['cart'] = [1, 2]
+        with self.assertNumQueries(0):
+            store.save()
+        self.assertNotIn('cart', self.db_data(session_key))
+        with self.assertNumQueries(0):
+            self.assertEqual(SessionStore(session_key)['cart'], [1, 2])
+
+    def test_db_written_when_auth_keys_change(self):
+        session_key = self.login_session(self.user)
+        store = SessionStore(session_key)
+        store[SESSION_KEY] = str(self.other.pk)
+        store[HASH_SESSION_KEY] = self.other.get_session_auth_hash()
+        store.save()
+        self.assertEqual(self.db_data(session_key)[SESSION_KEY], str(self.other.pk))
+
+    def test_db_written_after_interval(self):
+        session_key = self.login_session(self.user)
+        now = time.time()
+        with mock.patch.object(sessions, 'time') as clock:
+            clock.time.return_value = now + 299
+            store = SessionStore(session_key)
+            store['cart'] = [1]
+            store.save()
+            self.assertNotIn('cart', self.db_data(session_key))
+
+            clock.time.return_value = now + 300
+            store = SessionStore(session_key)
+            store['cart'] = [1, 2]
+            store.save()
+            self.assertEqual(self.db_data(session_key)['cart'], [1, 2])
+
+            # Lần ghi database vừa rồi được nhớ trong cache: lại đợi đủ khoảng thời gian
+            store = SessionStore(session_key)
+            store['cart'] = [1, 2, 3]
+            with self.assertNumQueries(0):
+                store.save()
+
+    def test_cache_miss_falls_back_to_db_row(self):
+        session_key = self.login_session(self.user)
+        store = SessionStore(session_key)
+        store['cart'] = [1]
+        store.save()
+        store._cache.clear()
+
+        store = SessionStore(session_key)
+        with self.assertNumQueries(1):
+            self.assertEqual(store[SESSION_KEY], str(self.user.pk))
+        self.assertNotIn('cart', store)
+        # Bản vừa nạp được đưa lại vào cache và coi như mới ghi database
+        store['cart'] = [2]
+        with self.assertNumQueries(0):
+            store.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(SessionStore(session_key)['cart'], [2])
+
+    def test_missing_session_is_empty(self):
+        store = SessionStore('x' * 32)
+        self.assertEqual(dict(store.items()), {})
+        self.assertIsNone(store._persisted)
+
+    def test_legacy_model_backend_session_is_mapped(self):
+        # Session được ghi khi settings còn dùng ModelBackend mặc định
+        store = DBStore()
+        store[SESSION_KEY] = str(self.user.pk)
+        store[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+        store[HASH_SESSION_KEY] = self.user.get_session_auth_hash()
+        store.create()
+
+        self.assertEqual(SessionStore(store.session_key)[BACKEND_SESSION_KEY], BACKEND)
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = store.session_key
+        response = self.client.get('/users/profile/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['user'], self.user)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CachedUserTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('student', password='pw')
+        Profile.objects.create(user=self.user, user_type='instructor')
+        self.client.force_login(self.user)
+
+    def assertLoggedIn(self):
+        response = self.client.get('/users/profile/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['user'], self.user)
+
+    def assertLoggedOut(self):
+        response = self.client.get('/users/profile/')
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response.url.startswith(settings.LOGIN_URL))
+
+    def test_user_and_profile_cached(self):
+        get_cached_user(self.user.pk)
+        with self.assertNumQueries(0):
+            user = get_cached_user(self.user.pk)
+            self.assertEqual(user.profile.user_type, 'instructor')
+        self.assertIsNone(get_cached_user(0))
+
+    def test_profile_change_invalidates(self):
+        get_cached_user(self.user.pk)
+        profile = Profile.objects.get(user=self.user)
+        profile.user_type = 'student'
+        profile.save()
+        self.assertEqual(get_cached_user(self.user.pk).profile.user_type, 'student')
+
+    def test_password_change_invalidates(self):
+        self.assertLoggedIn()
+        self.user.set_password('new')
+        self.user.save()
+        # Bản cũ trong cache còn hash mật khẩu cũ, khớp với session
+        self.assertLoggedOut()
+
+    def test_deactivation_invalidates(self):
+        self.assertLoggedIn()
+        self.user.is_active = False
+        self.user.save()
+        self.assertLoggedOut()
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class EditProfileTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('student', password='pw')
+        self.profile = Profile.objects.create(user=self.user)
+        self.client.force_login(self.user)
+
+    def test_saves_only_edited_fields_of_cached_user(self):
+        self.client.get('/users/profile/')
+        # Thay đổi bằng update() không xóa cache: request.user sau đây là bản cũ
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+        Profile.objects.filter(pk=self.profile.pk).update(date_of_birth=datetime.date(2000, 1, 2))
+
+        response = self.client.post('/users/profile/edit/', {
+            'first_name': 'An', 'last_name': 'Nguyễn', 'email': 'an@example.com',
+            'bio': 'Xin chào', 'user_type': 'student',
+        })
+        self.assertEqual(response.status_code, 302)
+
+        user = User.objects.get(pk=self.user.pk)
+        self.assertEqual((user.first_name, user.last_name, user.email), ('An', 'Nguyễn', 'an@example.com'))
+        self.assertTrue(user.is_staff)
+        self.assertTrue(user.check_password('pw'))
+        profile = Profile.objects.get(pk=self.profile.pk)
+        self.assertEqual(profile.bio, 'Xin chào')
+        self.assertEqual(profile.date_of_birth, datetime.date(2000, 1, 2))
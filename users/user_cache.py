@@ -0,0 +1,49 @@
+"""
+Cache User kèm Profile theo id.
+
+AuthenticationMiddleware tải request.user từ CachedModelBackend.get_user():
+một lần đọc cache thay cho truy vấn auth_user, và request.user.profile
+(user_type trong menu, instructor_dashboard, ...) đã có sẵn nhờ
+select_related('profile') được pickle cùng User. Signals của User/Profile
+xóa cache khi lưu hoặc xóa.
+
+Cache phải dùng chung giữa các server (Redis trong CACHES) để việc xóa khi
+đổi mật khẩu hay khóa tài khoản có hiệu lực ở mọi nơi.
+
+Thay đổi bằng queryset.update() không đi qua signals (ví dụ job ảnh thu nhỏ
+ghi Profile.avatar_variants), nên trang cần Profile mới nhất để hiển thị hoặc
+sửa thì đọc lại từ database thay vì dùng request.user.profile. Vì cùng lý do,
+request.user có thể cũ tới CACHE_TIMEOUT: lưu nó luôn phải kèm update_fields,
+không bao giờ save() cả dòng. Code đổi User bằng update() phải tự gọi
+invalidate_user().
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+
+from replicas.routing import primary
+
+CACHE_TIMEOUT = 15 * 60
+
+
+def _cache_key(user_id):
+    return f'lms:user:v1:{user_id}'
+
+
+def get_cached_user(user_id):
+    """User (kèm profile) theo id, None nếu không tồn tại"""
+    key = _cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        with primary():
+            user = get_user_model()._default_manager.select_related('profile').filter(pk=user_id).first()
+        if user is None:
+            return None
+        cache.set(key, user, CACHE_TIMEOUT)
+    return user
+
+
+def invalidate_user(user_id):
+    key = _cache_key(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
@@ -6,9 +6,11 @@ from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.views import LoginView
 from django.urls import reverse_lazy
 from django.contrib.auth import logout
+from monitoring.query_budget import query_budget
 from .models import Profile
 
 
+@query_budget(6)
 def register(request):
     """Đăng ký tài khoản"""
     if request.method == 'POST':
@@ -25,31 +27,31 @@ def register(request):
     return render(request, 'users/register.html', {'form': form})
 
 
+@query_budget(4)
 @login_required
 def profile(request):
     """Trang profile của user"""
-    try:
-        profile = request.user.profile
-    except Profile.DoesNotExist:
-        profile = Profile.objects.create(user=request.user)
+    # Đọc từ database: request.user.profile lấy từ cache (users.user_cache)
+    profile, _ = Profile.objects.get_or_create(user=request.user)
     
     return render(request, 'users/profile.html', {'profile': profile})
 
 
+@query_budget(8)
 @login_required
 def edit_profile(request):
     """Chỉnh sửa profile"""
-    try:
-        profile = request.user.profile
-    except Profile.DoesNotExist:
-        profile = Profile.objects.create(user=request.user)
+    # Sửa bản mới nhất trong database, không phải bản trong cache
+    profile, _ = Profile.objects.get_or_create(user=request.user)
     
     if request.method == 'POST':
         # Cập nhật thông tin User
         request.user.first_name = request.POST.get('first_name', '')
         request.user.last_name = request.POST.get('last_name', '')
         request.user.email = request.POST.get('email', '')
-        request.user.save()
+        # request.user là bản trong cache (có thể cũ tới CACHE_TIMEOUT): chỉ ghi
+        # các trường vừa sửa để không ghi đè mật khẩu, is_active, last_login...
+        request.user.save(update_fields=['first_name', 'last_name', 'email'])
         
         # Cập nhật thông tin Profile
         profile.phone = request.POST.get('phone', '')